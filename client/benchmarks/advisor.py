@@ -0,0 +1,86 @@
+"""
+Expectimax pick advisor: latency, search depth and pick quality.
+
+Run from the `client` directory:
+    python -m benchmarks.advisor [--games N] [--budget SECONDS] [--seed S]
+
+Random players (as in benchmarks.selfplay) play N matches, except that
+one seat, alternating per match, makes its picks with Advisor.rank().
+Reports ranking latency (median / p99 / max), the depth reached, the
+memo table hit rate and the advised seat's win rate (50% = no effect).
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+
+from benchmarks.selfplay import MAX_TURNS
+from src.game.advisor import Advisor
+from src.game.engine import GameEngine
+
+
+def play_match(advisor: Advisor, advised: int, rng: random.Random,
+               latencies: list, depths: Counter):
+    """Play one match; return the winner or None."""
+    engine = GameEngine(first_seat=0, rng=rng)
+
+    def settle_picks():
+        for seat in (0, 1):
+            while engine.pending[seat] > 0:
+                cards = engine.candidates()
+                if seat == advised:
+                    start = time.perf_counter()
+                    index = advisor.rank(engine, seat, cards)[0][0]
+                    latencies.append(time.perf_counter() - start)
+                    depths[advisor.last_depth] += 1
+                else:
+                    index = int(rng.random() * len(cards))
+                engine.give(seat, cards[index])
+
+    engine.start()
+    settle_picks()
+    turns = 0
+    while not engine.is_over() and turns < MAX_TURNS:
+        seat = engine.turn
+        while not engine.is_over():
+            options = engine.playable_indices(seat)
+            if not options or rng.random() < 0.2:
+                break
+            engine.play(seat, options[int(rng.random() * len(options))])
+            settle_picks()
+        if engine.is_over():
+            break
+        engine.end_turn(seat)
+        settle_picks()
+        turns += 1
+    return engine.winner
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=40)
+    parser.add_argument("--budget", type=float, default=0.016, help="seconds per ranking")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    advisor = Advisor(budget=args.budget)
+    latencies, depths = [], Counter()
+    wins = 0
+    for game in range(args.games):
+        wins += play_match(advisor, game % 2, rng, latencies, depths) == game % 2
+
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(f"{len(latencies)} rankings: median {p(0.5):.1f} ms, p99 {p(0.99):.1f} ms, "
+          f"max {latencies[-1] * 1000:.1f} ms")
+    print("depth reached: " + ", ".join(f"{d}: {n}" for d, n in sorted(depths.items())))
+    cache = advisor.cache
+    print(f"memo table: {len(cache):,} entries, hit rate "
+          f"{cache.hits / max(1, cache.hits + cache.misses):.0%}")
+    print(f"advised seat wins {wins / args.games:.0%} of {args.games} games")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Balance sweep over game constants with the vectorized batch simulator.
+
+Run from the `client` directory:
+    python -m benchmarks.balance [--games N] [--health 20 25 30]
+        [--regen 1 2 3] [--init-cost 3 4] [--value PCARDITEM_DAMAGE=2,3,4 ...]
+        [--play random|greedy] [--choose random|weakest]
+
+Every combination of --health, --regen and --init-cost is simulated once
+with the live CARD_ITEM_VALUES and once per --value override (an item
+constant name from src/game/constants.py and its three power levels).
+--play / --choose set seat 0's policies; seat 1 always plays randomly, so
+with the defaults the first-seat advantage is what is measured.
+
+Reports per configuration: seat 0 win rate, average turns, matches cut
+at the turn limit and games/sec.
+"""
+
+import argparse
+import itertools
+import time
+
+import src.game.constants as gconstants
+from src.game.batchsim import (
+    SimConfig, simulate, random_play_policy, greedy_damage_play_policy,
+    random_choose_policy, weakest_choose_policy,
+)
+
+PLAY_POLICIES = {"random": random_play_policy(), "greedy": greedy_damage_play_policy}
+CHOOSE_POLICIES = {"random": random_choose_policy, "weakest": weakest_choose_policy}
+
+
+def parse_value(text: str) -> tuple:
+    """'PCARDITEM_DAMAGE=2,3,4' -> (label, {PCARDITEM_DAMAGE: [2, 3, 4]})."""
+    name, _, levels = text.partition("=")
+    item = getattr(gconstants, name.strip(), None)
+    if item not in gconstants.CARD_ITEM_VALUES:
+        raise argparse.ArgumentTypeError(f"unknown card item {name!r}")
+    values = [int(v) for v in levels.split(",")]
+    if len(values) != len(gconstants.ITEM_POWER_LIST):
+        raise argparse.ArgumentTypeError(f"{name}: need {len(gconstants.ITEM_POWER_LIST)} values")
+    return f"{name.strip()}={levels}", {item: values}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--health", type=int, nargs="+", default=[gconstants.PLAYER_MAX_HEALTH])
+    parser.add_argument("--regen", type=int, nargs="+", default=[gconstants.TURN_COST_REGEN])
+    parser.add_argument("--init-cost", type=int, nargs="+", default=[gconstants.PLAYER_INIT_COST])
+    parser.add_argument("--value", type=parse_value, action="append", default=[],
+                        help="card item override, e.g. PCARDITEM_DAMAGE=2,3,4")
+    parser.add_argument("--play", choices=PLAY_POLICIES, default="random")
+    parser.add_argument("--choose", choices=CHOOSE_POLICIES, default="random")
+    args = parser.parse_args()
+
+    play = (PLAY_POLICIES[args.play], PLAY_POLICIES["random"])
+    choose = (CHOOSE_POLICIES[args.choose], CHOOSE_POLICIES["random"])
+    print(f"{args.games} games per configuration, seat 0 plays {args.play}/{args.choose}")
+    print(f"{'hp':>3} {'regen':>5} {'cost':>4}  {'values':<30} {'seat0':>6} {'turns':>6} "
+          f"{'cut':>5} {'games/s':>9}")
+    for health, regen, init_cost, (label, values) in itertools.product(
+            args.health, args.regen, args.init_cost, [("live", None)] + args.value):
+        config = SimConfig(card_values=values, max_health=health,
+                           init_cost=init_cost, turn_regen=regen)
+        start = time.perf_counter()
+        result = simulate(args.games, config, play, choose, seed=args.seed)
+        elapsed = time.perf_counter() - start
+        print(f"{health:>3} {regen:>5} {init_cost:>4}  {label:<30} {result.win_rate(0):>6.1%} "
+              f"{result.avg_turns():>6.1f} {result.unfinished:>5} "
+              f"{args.games / elapsed:>9,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+MCTS bot strength and move latency.
+
+Run from the `client` directory:
+    python -m benchmarks.bot [--games N] [--budget SECONDS] [--iterations N]
+                             [--workers W] [--seed S]
+
+The bot plays N matches through GameEngine against the random player of
+benchmarks.selfplay, alternating seats. Every bot decision (play, end
+turn or pick) is timed. Reports the bot's win rate, move latency
+(median / p99 / max), iterations per move and the transposition table
+hit rate.
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.selfplay import MAX_TURNS
+from src.game.engine import GameEngine
+from src.game.mcts import MCTS
+
+
+def play_match(bot: MCTS, bot_seat: int, rng: random.Random, latencies: list, iterations: list):
+    """Play one match; return (winner or None, turns)."""
+    engine = GameEngine(first_seat=0, rng=rng)
+
+    def timed(decide, *args):
+        start = time.perf_counter()
+        result = decide(engine, *args)
+        latencies.append(time.perf_counter() - start)
+        iterations.append(bot.last_iterations)
+        return result
+
+    def settle_picks():
+        for seat in (0, 1):
+            while engine.pending[seat] > 0:
+                cards = engine.candidates()
+                if seat == bot_seat:
+                    index = timed(bot.choose_pick, seat, cards)
+                else:
+                    index = int(rng.random() * len(cards))
+                engine.give(seat, cards[index])
+
+    engine.start()
+    settle_picks()
+    turns = 0
+    while not engine.is_over() and turns < MAX_TURNS:
+        seat = engine.turn
+        while not engine.is_over():
+            if seat == bot_seat:
+                bot.last_iterations = 0
+                card = timed(bot.choose_play, seat)
+                if card is None:
+                    break
+                engine.play(seat, engine.players[seat].hand.ordered().index(card))
+            else:
+                options = engine.playable_indices(seat)
+                if not options or rng.random() < 0.2:
+                    break
+                engine.play(seat, options[int(rng.random() * len(options))])
+            settle_picks()
+        if engine.is_over():
+            break
+        engine.end_turn(seat)
+        settle_picks()
+        turns += 1
+    return engine.winner, turns
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--budget", type=float, default=0.08, help="seconds per move")
+    parser.add_argument("--iterations", type=int, default=None, help="iterations per move")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    latencies, iterations = [], []
+    wins = unfinished = 0
+    start = time.perf_counter()
+    with MCTS(iterations=args.iterations, time_budget=args.budget,
+              workers=args.workers, seed=args.seed) as bot:
+        for game in range(args.games):
+            bot_seat = game % 2
+            winner, _ = play_match(bot, bot_seat, rng, latencies, iterations)
+            if winner is None:
+                unfinished += 1
+            wins += winner == bot_seat
+        table = bot.table
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(f"{args.games} games in {elapsed:.1f}s: bot wins {wins / args.games:.0%} "
+          f"against random, unfinished {unfinished}")
+    print(f"{len(latencies)} bot moves: median {p(0.5):.1f} ms, p99 {p(0.99):.1f} ms, "
+          f"max {latencies[-1] * 1000:.1f} ms, {sum(iterations) / len(iterations):,.0f} iterations/move")
+    lookups = table.hits + table.misses
+    if lookups:
+        print(f"transposition table: {len(table):,} nodes, hit rate {table.hits / lookups:.0%}")
+
+
+if __name__ == "__main__":
+    main()
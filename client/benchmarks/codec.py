@@ -0,0 +1,63 @@
+"""
+Wire size and encode/decode cost: JSON vs the compact codec.
+
+Run from the `client` directory:
+    python -m benchmarks.codec [--iterations N]
+
+For each typical game message the benchmark prints body bytes and
+microseconds per encode/decode for both codecs (framing overhead is the
+same 4 bytes for either, so it is left out).
+"""
+
+import argparse
+import timeit
+
+import src.game.constants as gconstants
+from src.network.utils import JSON_CODEC, COMPACT_CODEC, decode_body
+
+CARD = {
+    "item_power": 2,
+    "pcarditem_type": gconstants.PCARDITEM_DAMAGE,
+    "ncarditem_type": gconstants.NCARDITEM_COST_USAGE,
+    "card_effect": gconstants.STATUS_CARD_NO_EFFECT,
+}
+
+MESSAGES = {
+    "card_played": {"type": gconstants.EVENT_CARD_PLAYED, "card": CARD,
+                    "param": None, "player": "remote"},
+    "card_drawn": {"type": gconstants.EVENT_CARD_DRAWN, "card": CARD,
+                   "player": "remote", "sender_turn_end": True},
+    "turn_end": {"type": gconstants.EVENT_TURN_END, "player": "remote"},
+    "ping": {"type": "ping"},
+    "rpc_response": {"type": "rpc_response",
+                     "request_id": "0f8fad5b-d9cb-469f-a165-70867728950e",
+                     "payload": {"status": "ok", "hand": [CARD] * 5}},
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    print(f"{'message':<13} {'json B':>7} {'compact B':>10} {'ratio':>6}  "
+          f"{'json enc/dec us':>16}  {'compact enc/dec us':>19}")
+    for name, msg in MESSAGES.items():
+        row = [name]
+        sizes = []
+        times = []
+        for codec in (JSON_CODEC, COMPACT_CODEC):
+            body = codec.encode(msg)
+            assert decode_body(body) == msg
+            sizes.append(len(body))
+            enc = timeit.timeit(lambda: codec.encode(msg), number=n) / n * 1e6
+            dec = timeit.timeit(lambda: decode_body(body), number=n) / n * 1e6
+            times.append(f"{enc:6.2f} / {dec:6.2f}")
+        row += [sizes[0], sizes[1], sizes[1] / sizes[0]]
+        print(f"{row[0]:<13} {row[1]:>7} {row[2]:>10} {row[3]:>6.2f}  "
+              f"{times[0]:>16}  {times[1]:>19}")
+
+
+if __name__ == "__main__":
+    main()
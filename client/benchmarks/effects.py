@@ -0,0 +1,136 @@
+"""
+Card resolution throughput: compiled effects vs. per-play table lookups.
+
+Run from the `client` directory:
+    python -m benchmarks.effects [--plays N] [--seed S]
+
+Both variants resolve the same random sequence of catalog cards against a
+pair of players that is reset whenever a game would end, and check
+playability first like GameEngine.play does:
+  * lookup   – the previous resolver: match on the item types and read
+               CARD_ITEM_VALUES[type][power] on every check and play
+  * compiled – GameEngine.can_play / _resolve on the precompiled
+               (can_pay, pay, reward) closures of each card
+Reports the best plays/sec of --repeat runs for each.
+"""
+
+import argparse
+import random
+import time
+
+import src.game.constants as gconstants
+from src.game.card import CARD_CATALOG
+from src.game.constants import CARD_ITEM_VALUES as gValues
+from src.game.engine import GameEngine, opponent
+from src.game.player import Player
+
+
+def legacy_can_play(engine: GameEngine, seat: int, card) -> bool:
+    player = engine.players[seat]
+    ncard = card.getNcarditem()
+    match ncard:
+        case gconstants.NCARDITEM_SELF_DAMAGE:
+            return player.health > gValues[ncard][card.getItemPower()]
+        case gconstants.NCARDITEM_CARD_DISCARD:
+            return len(player.hand) > gValues[ncard][card.getItemPower()]
+        case gconstants.NCARDITEM_COST_USAGE:
+            return player.cost >= gValues[ncard][card.getItemPower()]
+        case _:
+            return True
+
+
+def legacy_resolve(engine: GameEngine, seat: int, card) -> list:
+    me = engine.players[seat]
+    other = opponent(seat)
+    power = card.getItemPower()
+    events = [{"type": gconstants.EVENT_CARD_PLAYED, "seat": seat, "card": card}]
+
+    ncard = card.getNcarditem()
+    match ncard:
+        case gconstants.NCARDITEM_SELF_DAMAGE:
+            damage = gValues[ncard][power]
+            me.takeDamage(damage)
+            events.append({"type": gconstants.EVENT_PLAYER_DAMAGE, "seat": seat,
+                           "amount": damage, "health": me.health})
+        case gconstants.NCARDITEM_CARD_DISCARD:
+            for _ in range(gValues[ncard][power]):
+                if me.hand:
+                    events.append({"type": gconstants.EVENT_CARD_DISCARDED,
+                                   "seat": seat, "card": me.hand.pop(0)})
+        case gconstants.NCARDITEM_COST_USAGE:
+            cost = gValues[ncard][power]
+            me.costUsage(cost)
+            events.append({"type": gconstants.EVENT_COST_CHANGED, "seat": seat,
+                           "amount": -cost, "cost": me.cost})
+        case _:
+            pass
+
+    pcard = card.getPcarditem()
+    match pcard:
+        case gconstants.PCARDITEM_HEAL:
+            heal = gValues[pcard][power]
+            me.takeHeal(heal)
+            events.append({"type": gconstants.EVENT_PLAYER_HEAL, "seat": seat,
+                           "amount": heal, "health": me.health})
+        case gconstants.PCARDITEM_CARD_DRAW:
+            events.append(engine._owe(other, gValues[pcard][power]))
+        case gconstants.PCARDITEM_DAMAGE:
+            damage = gValues[pcard][power]
+            engine.players[other].takeDamage(damage)
+            events.append({"type": gconstants.EVENT_PLAYER_DAMAGE, "seat": other,
+                           "amount": damage, "health": engine.players[other].health})
+        case gconstants.PCARDITEM_COST_RECOVER:
+            events.append(engine._regen(seat, gValues[pcard][power]))
+        case _:
+            pass
+
+    if engine.players[other].isDefeated():
+        engine.winner = seat
+    elif me.isDefeated():
+        engine.winner = other
+    if engine.winner is not None:
+        events.append({"type": gconstants.EVENT_GAME_END, "winner": engine.winner})
+    return events
+
+
+def run(cards: list, can_play, resolve) -> float:
+    """Resolve every card in `cards`; return plays/sec."""
+    engine = GameEngine()
+    filler = CARD_CATALOG[0]
+    start = time.perf_counter()
+    for i, card in enumerate(cards):
+        seat = i & 1
+        if engine.winner is not None:
+            engine.players = [Player(), Player()]
+            engine.winner = None
+        me = engine.players[seat]
+        if len(me.hand) < 3:
+            me.hand.extend((filler, filler))
+        if me.cost < 3:
+            me.cost = gconstants.PLAYER_COST_LIMIT
+        if can_play(engine, seat, card):
+            resolve(engine, seat, card)
+    return len(cards) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--plays", type=int, default=500_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cards = [rng.choice(CARD_CATALOG) for _ in range(args.plays)]
+    variants = {
+        "lookup": (legacy_can_play, legacy_resolve),
+        "compiled": (GameEngine.can_play, GameEngine._resolve),
+    }
+    print(f"{args.plays} plays")
+    for name, (can_play, resolve) in variants.items():
+        best = max(run(cards, can_play, resolve) for _ in range(args.repeat))
+        print(f"{name:<9} {best:>12,.0f} plays/s")
+
+
+if __name__ == "__main__":
+    main()
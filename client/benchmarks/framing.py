@@ -0,0 +1,107 @@
+"""
+Receive-path throughput for the two wire framing modes.
+
+Run from the `client` directory:
+    python -m benchmarks.framing [--messages N]
+
+A sender thread pushes N typical `card_played` messages through a
+socketpair; the receiver parses them with
+  * legacy  – the old str-decode + split("\\n", 1) loop (given an
+              incremental UTF-8 decoder, otherwise it crashes as soon as a
+              Chinese character straddles a recv() boundary)
+  * line    – LineReader (newline framing, bytes buffer)
+  * length  – FrameReader (length-prefixed framing)
+and reports messages/sec for each.
+"""
+
+import argparse
+import codecs
+import socket
+import threading
+import time
+
+from src.game.constants import (
+    EVENT_CARD_PLAYED, PCARDITEM_DAMAGE, NCARDITEM_COST_USAGE, STATUS_CARD_NO_EFFECT,
+)
+from src.network.utils import (
+    pack, pack_frame, unpack, LineReader, FrameReader,
+)
+
+SAMPLE_MSG = {
+    "type": EVENT_CARD_PLAYED,
+    "card": {
+        "item_power": 2,
+        "pcarditem_type": PCARDITEM_DAMAGE,
+        "ncarditem_type": NCARDITEM_COST_USAGE,
+        "card_effect": STATUS_CARD_NO_EFFECT,
+    },
+    "param": None,
+    "player": "remote",
+}
+
+
+def _sender(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(payload)
+    sock.shutdown(socket.SHUT_WR)
+
+
+def _legacy_receive(sock: socket.socket) -> int:
+    count = 0
+    buffer = ""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    while True:
+        raw = sock.recv(4096)
+        if not raw:
+            return count
+        data = decoder.decode(raw)
+        buffer += data
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            unpack(line)
+            count += 1
+
+
+def _reader_receive(sock: socket.socket, reader) -> int:
+    count = 0
+    while reader.recv_from(sock):
+        count += len(reader.messages())
+    return count
+
+
+def run(mode: str, n: int, pad: int = 0) -> float:
+    """Return messages/sec for one framing mode."""
+    packer = pack_frame if mode == "length" else pack
+    msg = dict(SAMPLE_MSG, pad="牌" * pad) if pad else SAMPLE_MSG
+    payload = packer(msg) * n
+    rx, tx = socket.socketpair()
+    t = threading.Thread(target=_sender, args=(tx, payload), daemon=True)
+    start = time.perf_counter()
+    t.start()
+    if mode == "legacy":
+        got = _legacy_receive(rx)
+    elif mode == "line":
+        got = _reader_receive(rx, LineReader())
+    else:
+        got = _reader_receive(rx, FrameReader())
+    elapsed = time.perf_counter() - start
+    t.join()
+    rx.close()
+    tx.close()
+    assert got == n, f"{mode}: expected {n} messages, got {got}"
+    return n / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--pad", type=int, default=0,
+                        help="extra Chinese characters per message (large-burst case)")
+    args = parser.parse_args()
+
+    for mode in ("legacy", "line", "length"):
+        rate = run(mode, args.messages, args.pad)
+        print(f"{mode:>7}: {rate:12,.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Host scalability: thread-per-peer vs selectors reactor.
+
+Run from the `client` directory:
+    python -m benchmarks.reactor [--peers N] [--active A] [--messages K]
+
+For each host mode the benchmark
+  1. connects N idle raw client sockets and waits until all are accepted,
+  2. lets A of them send K small messages each,
+and reports accept time, host thread count and received messages/sec.
+"""
+
+import argparse
+import resource
+import socket
+import threading
+import time
+
+from src.network.core import Network
+from src.network.utils import make_packer, FRAMING_LENGTH
+
+PORT = 5590
+
+
+def _raise_fd_limit(needed: int) -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, needed), hard))
+
+
+def _wait(pred, timeout: float) -> bool:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if pred():
+            return True
+        time.sleep(0.005)
+    return pred()
+
+
+def run(reactor: bool, peers: int, active: int, messages: int, framing: str) -> dict:
+    received = 0
+    lock = threading.Lock()
+
+    def on_message(_msg):
+        nonlocal received
+        with lock:
+            received += 1
+
+    host = Network(is_host=True, host_ip="127.0.0.1", port=PORT,
+                   framing=framing, reactor=reactor)
+    host._hb_timeout = 3600.0          # raw benchmark sockets never pong
+    host.on_message = on_message
+    host.start()
+    base_threads = threading.active_count()
+
+    start = time.perf_counter()
+    clients = []
+    for _ in range(peers):
+        s = socket.create_connection(("127.0.0.1", PORT))
+        clients.append(s)
+    ok = _wait(lambda: host.get_peer_count() == peers, 30.0)
+    accept_time = time.perf_counter() - start
+    threads = threading.active_count()
+
+    raw = make_packer(framing)({"type": "card_played", "param": None, "player": "remote"})
+    start = time.perf_counter()
+    for _ in range(messages):
+        for s in clients[:active]:
+            s.sendall(raw)
+    total = active * messages
+    _wait(lambda: received >= total, 60.0)
+    elapsed = time.perf_counter() - start
+
+    for s in clients:
+        s.close()
+    host.close()
+    time.sleep(0.2)
+    return {
+        "accepted": ok,
+        "accept_s": accept_time,
+        "threads": threads - base_threads + 1,
+        "msg_rate": received / elapsed if elapsed else 0.0,
+        "received": received,
+        "expected": total,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--peers", type=int, default=1000)
+    parser.add_argument("--active", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--framing", default=FRAMING_LENGTH)
+    parser.add_argument("--modes", default="threaded,reactor")
+    args = parser.parse_args()
+    _raise_fd_limit(args.peers * 2 + 64)
+
+    active = min(args.active, args.peers)
+
+    results = {}
+    for mode in args.modes.split(","):
+        results[mode] = run(mode == "reactor", args.peers, active,
+                            args.messages, args.framing)
+
+    print(f"peers={args.peers} active={active} messages/peer={args.messages}")
+    for mode, r in results.items():
+        print(f"{mode:>9}: accept {r['accept_s']:6.2f}s  threads {r['threads']:5d}  "
+              f"{r['msg_rate']:10,.0f} msg/s  ({r['received']}/{r['expected']})")
+
+
+if __name__ == "__main__":
+    main()
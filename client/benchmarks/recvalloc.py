@@ -0,0 +1,176 @@
+"""
+Memory churn of the receive path, measured with tracemalloc.
+
+Run from the `client` directory:
+    python -m benchmarks.recvalloc [--messages N] [--chunk BYTES]
+
+A fake socket hands out a pre-built stream of N `card_played` messages in
+fixed-size chunks, the way the kernel would, so only the parsing side is
+measured. Compared:
+  * legacy  – recv(4096) -> bytes, decode to str, buffer.split("\\n", 1)
+  * line    – LineReader: recv_into a reusable buffer, memoryview frames
+  * length  – FrameReader, JSON bodies
+  * compact – FrameReader, compact codec bodies
+
+For each variant it reports
+  * framing B/msg – with body decoding replaced by a no-op: tracemalloc
+                    peak of each recv + parse cycle above what is still
+                    allocated afterwards (recv buffers, str copies, slices
+                    thrown away), summed over cycles and divided by the
+                    messages; json.loads' own scratch memory is the same for
+                    every variant and would hide the difference
+  * blocks/msg    – memory blocks still allocated after the run (decoded
+                    messages released) per message: buffer growth, leaks;
+                    ~0 is the goal
+  * us/msg        – parse time with tracing off
+"""
+
+import argparse
+import codecs
+import json
+import time
+import tracemalloc
+
+from src.game.constants import (
+    EVENT_CARD_PLAYED, PCARDITEM_DAMAGE, NCARDITEM_COST_USAGE, STATUS_CARD_NO_EFFECT,
+)
+import src.network.utils as netutils
+from src.network.utils import (
+    FRAMING_LENGTH, FRAMING_LINE, JSON_CODEC, COMPACT_CODEC, frame, make_reader,
+)
+
+SAMPLE_MSG = {
+    "type": EVENT_CARD_PLAYED,
+    "card": {
+        "item_power": 2,
+        "pcarditem_type": PCARDITEM_DAMAGE,
+        "ncarditem_type": NCARDITEM_COST_USAGE,
+        "card_effect": STATUS_CARD_NO_EFFECT,
+    },
+    "param": None,
+    "player": "remote",
+}
+
+
+class FakeSocket:
+    """Serves a byte stream in `chunk`-sized pieces via recv / recv_into."""
+
+    def __init__(self, data: bytes, chunk: int) -> None:
+        self._data = memoryview(data)
+        self._pos = 0
+        self._chunk = chunk
+
+    def recv(self, bufsize: int) -> bytes:
+        n = min(bufsize, self._chunk, len(self._data) - self._pos)
+        out = self._data[self._pos:self._pos + n].tobytes()
+        self._pos += n
+        return out
+
+    def recv_into(self, buffer) -> int:
+        n = min(len(buffer), self._chunk, len(self._data) - self._pos)
+        buffer[:n] = self._data[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+
+def legacy_cycles(sock: FakeSocket, loads=json.loads):
+    """The original _recv_loop body, one recv per iteration."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    while True:
+        data = sock.recv(4096)
+        if not data:
+            return
+        buffer += decoder.decode(data)
+        msgs = []
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            if line.strip():
+                msgs.append(loads(line))
+        yield msgs
+
+
+def reader_cycles(sock: FakeSocket, framing: str):
+    reader = make_reader(framing)
+    while reader.recv_from(sock):
+        yield reader.messages()
+
+
+def churn_per_message(make_cycles):
+    """Transient bytes per message, see the module docstring."""
+    tracemalloc.start()
+    base_blocks = len(tracemalloc.take_snapshot().traces)
+    churn = 0
+    counted = 0
+    kept = []
+    cycles = make_cycles()
+    first = True
+    while True:
+        tracemalloc.reset_peak()
+        try:
+            msgs = next(cycles)
+        except StopIteration:
+            break
+        after, peak = tracemalloc.get_traced_memory()
+        if not first:              # skip buffer set-up
+            churn += peak - after
+            counted += len(msgs)
+        first = False
+        kept.append(msgs)
+    del cycles
+    kept.clear()          # drop the decoded dicts; what is left is overhead
+    blocks_left = len(tracemalloc.take_snapshot().traces) - base_blocks
+    tracemalloc.stop()
+    return churn / max(counted, 1), blocks_left
+
+
+def measure(make_cycles, n: int):
+    # Timing pass, tracing off
+    start = time.perf_counter()
+    count = sum(len(m) for m in make_cycles())
+    elapsed = time.perf_counter() - start
+    assert count == n, count
+
+    _, blocks_left = churn_per_message(make_cycles)
+    real_decode = netutils.decode_body
+    netutils.decode_body = len
+    try:
+        framing_churn, _ = churn_per_message(lambda: make_cycles(len))
+    finally:
+        netutils.decode_body = real_decode
+    return framing_churn, blocks_left / n, elapsed / n * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--chunk", type=int, default=16384,
+                        help="bytes the fake kernel delivers per recv")
+    args = parser.parse_args()
+    n = args.messages
+
+    line_data = b"".join(frame(JSON_CODEC.encode(SAMPLE_MSG), FRAMING_LINE) for _ in range(n))
+    length_data = b"".join(frame(JSON_CODEC.encode(SAMPLE_MSG), FRAMING_LENGTH) for _ in range(n))
+    compact_data = b"".join(frame(COMPACT_CODEC.encode(SAMPLE_MSG), FRAMING_LENGTH)
+                            for _ in range(n))
+
+    # make_cycles(loads=None): None -> real decoding, else the no-op
+    variants = {
+        "legacy": lambda loads=None: legacy_cycles(FakeSocket(line_data, args.chunk),
+                                                   loads or json.loads),
+        "line": lambda loads=None: reader_cycles(FakeSocket(line_data, args.chunk),
+                                                 FRAMING_LINE),
+        "length": lambda loads=None: reader_cycles(FakeSocket(length_data, args.chunk),
+                                                   FRAMING_LENGTH),
+        "compact": lambda loads=None: reader_cycles(FakeSocket(compact_data, args.chunk),
+                                                    FRAMING_LENGTH),
+    }
+    print(f"{n} messages, {args.chunk} B per recv")
+    print(f"{'variant':<9} {'framing B/msg':>14} {'blocks/msg':>11} {'us/msg':>8}")
+    for name, make_cycles in variants.items():
+        framing, blocks, us = measure(make_cycles, n)
+        print(f"{name:<9} {framing:>14.1f} {blocks:>11.3f} {us:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Journal replay throughput and seek latency.
+
+Run from the `client` directory:
+    python -m benchmarks.replay [--matches N] [--seeks S] [--every K] [--seed S]
+
+Builds an archive of N journals from random self-play (same players as
+benchmarks.selfplay, every event and candidate set recorded through
+MatchJournal) in a temporary directory, then:
+  * replay – reads every journal and replays it with verification;
+             reports replayed records/sec across the archive
+  * seek   – random seek_turn() calls on the replays, once with a snapshot
+             every K records and once with a single snapshot at the start
+             (every seek replays from the beginning)
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.selfplay import MAX_TURNS
+from src.game.engine import GameEngine
+from src.game.journal import JournalReader, MatchJournal
+from src.game.replay import DEFAULT_SNAPSHOT_EVERY, Replay
+
+
+def record_match(journal: MatchJournal, rng: random.Random) -> None:
+    """Play one random match, recording it in `journal`."""
+    engine = GameEngine(first_seat=int(rng.random() * 2), rng=rng)
+    players = engine.players
+
+    def settle_picks():
+        for seat in (0, 1):
+            while engine.pending[seat] > 0:
+                cards = engine.candidates()
+                journal.record_candidates(seat, cards, players)
+                journal.record_events(engine.give(seat, cards[int(rng.random() * 3)]), players)
+
+    journal.record_events(engine.start(), players)
+    settle_picks()
+    turns = 0
+    while not engine.is_over() and turns < MAX_TURNS:
+        seat = engine.turn
+        while not engine.is_over():
+            options = engine.playable_indices(seat)
+            if not options or rng.random() < 0.2:
+                break
+            journal.record_events(engine.play(seat, options[int(rng.random() * len(options))]),
+                                  players)
+            settle_picks()
+        if engine.is_over():
+            break
+        journal.record_events(engine.end_turn(seat), players)
+        settle_picks()
+        turns += 1
+
+
+def build_archive(directory: str, matches: int, rng: random.Random) -> list[str]:
+    paths = []
+    for i in range(matches):
+        journal = MatchJournal(os.path.join(directory, f"match-{i:05d}.fcj"), commit_interval=0)
+        record_match(journal, rng)
+        journal.close()
+        paths.append(journal.path)
+    return paths
+
+
+def time_seeks(replays: list[Replay], seeks: int, rng: random.Random) -> float:
+    """Return the mean seconds per random seek_turn()."""
+    targets = []
+    for _ in range(seeks):
+        replay = replays[int(rng.random() * len(replays))]
+        targets.append((replay, int(rng.random() * (replay.turns + 1))))
+    start = time.perf_counter()
+    for replay, turn in targets:
+        replay.seek_turn(turn)
+    return (time.perf_counter() - start) / seeks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--matches", type=int, default=300)
+    parser.add_argument("--seeks", type=int, default=5000)
+    parser.add_argument("--every", type=int, default=DEFAULT_SNAPSHOT_EVERY)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        paths = build_archive(directory, args.matches, rng)
+        size = sum(os.path.getsize(path) for path in paths)
+        print(f"archive: {len(paths)} journals, {size / 1024:,.0f} KiB")
+
+        start = time.perf_counter()
+        replays = []
+        for path in paths:
+            with JournalReader(path) as reader:
+                replays.append(Replay(reader, args.every))
+        elapsed = time.perf_counter() - start
+        records = sum(len(replay.records) for replay in replays)
+        print(f"replay: {records:,} records in {elapsed:.2f}s: "
+              f"{records / elapsed:,.0f} records/s, {len(paths) / elapsed:,.0f} journals/s")
+
+    with_snaps = time_seeks(replays, args.seeks, random.Random(args.seed))
+    for replay in replays:
+        # 只留开头的快照：每次定位都从头重放
+        del replay._snap_positions[1:], replay._snaps[1:]
+        replay.snapshot_every = len(replay.records) + 1
+    without = time_seeks(replays, args.seeks, random.Random(args.seed))
+    print(f"seek:   {with_snaps * 1e6:,.1f} us with a snapshot every {args.every} records, "
+          f"{without * 1e6:,.1f} us from the start ({without / with_snaps:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Headless match throughput of the rules engine.
+
+Run from the `client` directory:
+    python -m benchmarks.selfplay [--games N] [--seed S]
+
+Two random players play N complete matches against each other through
+GameEngine alone (no Tk, no sockets): each turn the active seat plays
+random playable cards until it has none or decides to stop, every owed
+pick takes a random candidate. Reports games/sec, average turns and the
+first seat's win rate.
+"""
+
+import argparse
+import random
+import time
+
+from src.game.engine import GameEngine
+
+MAX_TURNS = 500
+
+
+def settle_picks(engine: GameEngine, rng: random.Random) -> None:
+    for seat in (0, 1):
+        while engine.pending[seat] > 0:
+            engine.give(seat, engine.candidates()[int(rng.random() * 3)])
+
+
+def play_match(rng: random.Random) -> tuple:
+    """Play one match; return (winner or None, turns)."""
+    engine = GameEngine(first_seat=0, rng=rng)
+    engine.start()
+    settle_picks(engine, rng)
+    turns = 0
+    while not engine.is_over() and turns < MAX_TURNS:
+        seat = engine.turn
+        while not engine.is_over():
+            options = engine.playable_indices(seat)
+            if not options or rng.random() < 0.2:
+                break
+            engine.play(seat, options[int(rng.random() * len(options))])
+            settle_picks(engine, rng)
+        if engine.is_over():
+            break
+        engine.end_turn(seat)
+        settle_picks(engine, rng)
+        turns += 1
+    return engine.winner, turns
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    wins = [0, 0]
+    unfinished = 0
+    total_turns = 0
+    start = time.perf_counter()
+    for _ in range(args.games):
+        winner, turns = play_match(rng)
+        total_turns += turns
+        if winner is None:
+            unfinished += 1
+        else:
+            wins[winner] += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.games} games in {elapsed:.2f}s: {args.games / elapsed:,.0f} games/s")
+    print(f"avg turns {total_turns / args.games:.1f}, first seat wins "
+          f"{wins[0] / max(1, wins[0] + wins[1]):.1%}, unfinished {unfinished}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Endgame tablebase build, open and lookup cost.
+
+Run from the `client` directory:
+    python -m benchmarks.tablebase [--hand K] [--lookups N] [--seed S]
+
+Builds a table for hands of up to K cards in a temporary directory, then:
+  * open   – Tablebase() on the file (header read and mmap), best of 20
+  * lookup – N lookups of random in-table positions; reports lookups/sec
+             and how many of them were lethal
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from src.game.card import CARD_COUNT
+from src.game.tablebase import DEFAULT_HAND, Tablebase, build_table
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hand", type=int, default=DEFAULT_HAND)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "endgame.fctb")
+        start = time.perf_counter()
+        build_table(path, args.hand)
+        build = time.perf_counter() - start
+        print(f"build: K={args.hand} in {build:.1f}s, {os.path.getsize(path) / 1e6:.1f} MB")
+
+        opens = []
+        for _ in range(20):
+            start = time.perf_counter()
+            table = Tablebase(path)
+            opens.append(time.perf_counter() - start)
+            table.close()
+        print(f"open: {min(opens) * 1e6:.0f} µs")
+
+        table = Tablebase(path)
+        positions = [([int(rng.random() * CARD_COUNT) for _ in range(1 + int(rng.random() * table.hand))],
+                      1 + int(rng.random() * table.max_hp),
+                      1 + int(rng.random() * table.max_opp_hp),
+                      int(rng.random() * (table.max_cost + 1)))
+                     for _ in range(args.lookups)]
+        lethal = 0
+        start = time.perf_counter()
+        for position in positions:
+            lethal += table.lookup(*position).lethal
+        elapsed = time.perf_counter() - start
+        table.close()
+    print(f"lookup: {args.lookups / elapsed:,.0f} lookups/sec, {lethal / args.lookups:.1%} lethal")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Tournament throughput against the number of worker processes.
+
+Run from the `client` directory:
+    python -m benchmarks.tournament [--games N] [--chunk C] [--workers 1 2 4 ...]
+                                    [--strategies SPEC ...] [--seed S]
+
+Runs the same round-robin (src.game.tournament) once per worker count and
+reports matches/sec and the speedup over the first count. Results must
+not depend on the worker count; each run's win matrix is checked against
+the first.
+"""
+
+import argparse
+import os
+
+from src.game.tournament import run_tournament
+
+DEFAULT_STRATEGIES = ["random", "greedy", "greedy/weakest"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=1000, help="matches per pair")
+    parser.add_argument("--chunk", type=int, default=100)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, os.cpu_count() or 1}))
+    parser.add_argument("--strategies", nargs="+", default=DEFAULT_STRATEGIES)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} cores, strategies {' '.join(args.strategies)}, "
+          f"{args.games} matches per pair")
+    base = reference = None
+    for workers in args.workers:
+        result = run_tournament(args.strategies, args.games, workers, args.chunk, args.seed)
+        base = base or result.throughput()
+        reference = reference or result.wins
+        same = "" if result.wins == reference else "  RESULTS DIFFER"
+        print(f"{workers:>3} workers: {result.matches} matches in {result.elapsed:.1f}s, "
+              f"{result.throughput():>9,.0f} matches/s, {result.throughput() / base:.2f}x{same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Makes `src` and `benchmarks` importable when pytest is run from this directory.
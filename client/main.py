@@ -1,19 +1,24 @@
 from src.game.process import GameState
+from src.game.journal import journal_dir_from_env
 from src.game.player import Player
 from src.graphic.UI import MainApp
 from src.network.core import Network
+from src.log import configure as configure_logging, dump_recent
 import gc, time
 SCREEN_SIZE = (800, 600)
 
 def main():    
+    configure_logging()
     flag = False
     while True:
         try:
             localPlayer, remotePlayer = Player(), Player()
-            gs = GameState(local_player= localPlayer, remote_player=remotePlayer, NetworkManager=Network())
+            gs = GameState(local_player= localPlayer, remote_player=remotePlayer, NetworkManager=Network(),
+                           journal_dir=journal_dir_from_env())
             app = MainApp()
             app.setState(gs)
             app.mainloop()
+            gs.closeJournal()
 
             should_restart = app.should_restart if hasattr(app, 'should_restart') else False
             print(f"[Main] 保存标志: should_restart = {should_restart}")
@@ -36,6 +41,7 @@ def main():
                 print("[Main] 检测到退出→ 结束")
                 break        
         except KeyboardInterrupt:
+            dump_recent()
             if app:
                 try:
                     app.destroy_app()
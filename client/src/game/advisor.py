@@ -0,0 +1,239 @@
+"""Expectimax advisor for draft picks.
+
+When a seat must give its opponent one of the candidates, the advisor
+ranks them by the expected outcome of a depth-limited expectimax over
+GameEngine:
+
+  * play nodes   the seat to act plays one of its distinct playable
+                 cards or ends the turn, and picks the best for itself;
+  * pick nodes   a seat owes a pick from DRAFT_CANDIDATES uniform random
+                 catalog cards and gives the one worst for its opponent.
+                 The expected best of k iid draws is exact from the
+                 sorted values of all catalog cards:
+                     sum over rank r of v(r) * ((r/n)^k - ((r-1)/n)^k)
+  * leaves       hp difference plus a little for cost and cards in hand.
+
+Values are memoized in a bounded LRU table keyed by a compact state tuple
+(hp, cost, hand counts, turn, owed picks) and the remaining depth, kept
+across requests. Search deepens iteratively until the time budget runs
+out and returns the deepest complete ranking, so an answer always comes
+back within the budget.
+
+`rank()` searches on the calling thread (bots); `request()` queues the
+search for the advisor's worker thread and calls back with the ranking,
+so the Tk thread never waits on it.
+
+Example:
+    advisor = Advisor()
+    ranking = advisor.rank(engine, seat, cards)          # [(index, value), ...]
+    advisor.request(engine, seat, cards, on_ranked)      # from the UI
+"""
+
+import queue
+import threading
+import time
+from typing import Callable
+
+import src.game.constants as gconstants
+from src.game.card import CARD_CATALOG, Card
+from src.game.engine import GameEngine, payable_ids
+from src.game.mcts import TranspositionTable, gc_paused
+from src.game.tablebase import Tablebase, get_tablebase
+from src.log import get_logger
+
+log = get_logger("game.advisor")
+
+DEFAULT_BUDGET = 0.016          # seconds: one frame at 60 Hz
+DEFAULT_MAX_DEPTH = 6
+DEFAULT_CACHE_SIZE = 100_000
+WIN_VALUE = 100.0
+COST_WEIGHT = 0.25
+HAND_WEIGHT = 0.5
+
+_DRAWS = gconstants.DRAFT_CANDIDATES
+_N = len(CARD_CATALOG)
+# 按从小到大排序后第 r 个值成为 k 张候选中最优者的概率
+_BEST_OF_WEIGHTS = tuple(((r + 1) / _N) ** _DRAWS - (r / _N) ** _DRAWS for r in range(_N))
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+def state_key(engine: GameEngine) -> tuple:
+    """Compact, hashable description of a position."""
+    p0, p1 = engine.players
+    return (p0.health, p1.health, p0.cost, p1.cost,
+            p0.hand.snapshot(), p1.hand.snapshot(),
+            engine.turn, engine.pending[0], engine.pending[1])
+
+
+def evaluate(engine: GameEngine) -> float:
+    """Static value of a position for seat 0 (negate for seat 1)."""
+    if engine.winner is not None:
+        return WIN_VALUE if engine.winner == 0 else -WIN_VALUE
+    p0, p1 = engine.players
+    return (p0.health - p1.health
+            + COST_WEIGHT * (p0.cost - p1.cost)
+            + HAND_WEIGHT * (len(p0.hand) - len(p1.hand)))
+
+
+class Advisor:
+    """Ranks draft candidates by depth-limited expectimax.
+
+    Args:
+        budget (float): Seconds per ranking.
+        max_depth (int): Deepest iteration (decisions after the pick).
+        cache_size (int): Memo table capacity.
+        tablebase (Tablebase | None): Endgame table; a play node it shows
+            as a forced win is scored as won. Defaults to get_tablebase().
+
+    Attributes:
+        cache (TranspositionTable): (state key, depth) -> value for seat 0.
+        last_depth (int): Depth of the last ranking returned.
+    """
+
+    def __init__(self, budget: float = DEFAULT_BUDGET, max_depth: int = DEFAULT_MAX_DEPTH,
+                 cache_size: int = DEFAULT_CACHE_SIZE, tablebase: Tablebase | None = None):
+        self.budget = budget
+        self.max_depth = max_depth
+        self.cache = TranspositionTable(cache_size)
+        self.last_depth = 0
+        self.tablebase = tablebase if tablebase is not None else get_tablebase()
+        self._sim = GameEngine()
+        self._lock = threading.Lock()
+        self._deadline = 0.0
+        self._requests: queue.Queue = queue.Queue()
+        self._worker: threading.Thread | None = None
+
+    # ---------------- Ranking ----------------------
+    # -----------------------------------------------
+
+    def rank(self, engine: GameEngine, seat: int, cards: list[Card],
+             budget: float | None = None) -> list[tuple[int, float]]:
+        """Rank giving each of `cards` to `seat`'s opponent, best first.
+
+        Args:
+            engine (GameEngine): The position; it is not modified.
+            seat (int): The seat making the pick.
+            cards (list[Card]): The candidates offered.
+            budget (float | None): Seconds to search; `self.budget` if None.
+
+        Returns:
+            list[tuple[int, float]]: (index into cards, expected value for
+                `seat`) sorted from the best pick to the worst.
+        """
+        return self._rank(engine.snapshot(), seat, cards, budget)
+
+    def request(self, engine: GameEngine, seat: int, cards: list[Card],
+                callback: Callable[[list[tuple[int, float]]], None],
+                budget: float | None = None) -> None:
+        """Rank on the advisor's thread and pass the ranking to `callback`.
+
+        The position is copied before returning. `callback` runs on the
+        advisor's thread; UI code should hand it to its own thread.
+        """
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, daemon=True, name="advisor")
+            self._worker.start()
+        self._requests.put((engine.snapshot(), seat, list(cards), callback, budget))
+
+    def close(self) -> None:
+        """Stop the worker thread after the queued requests."""
+        if self._worker is not None:
+            self._requests.put(None)
+            self._worker.join(timeout=1.0)
+            self._worker = None
+
+    # ---------------- Internals --------------------
+    # -----------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            item = self._requests.get()
+            if item is None:
+                return
+            snapshot, seat, cards, callback, budget = item
+            try:
+                callback(self._rank(snapshot, seat, cards, budget))
+            except Exception as e:
+                log.error("选牌建议计算失败: %s", e)
+
+    def _rank(self, snapshot: tuple, seat: int, cards: list[Card],
+              budget: float | None) -> list[tuple[int, float]]:
+        with self._lock, gc_paused():
+            start = time.perf_counter()
+            self._deadline = start + (self.budget if budget is None else budget)
+            sign = 1.0 if seat == 0 else -1.0
+            # 深度 0 一定算完：只看递出后的静态局面
+            values = self._root_values(snapshot, seat, cards, 0)
+            self.last_depth = 0
+            for depth in range(1, self.max_depth + 1):
+                try:
+                    values = self._root_values(snapshot, seat, cards, depth)
+                except _OutOfTime:
+                    break
+                self.last_depth = depth
+            ranking = [(i, sign * v) for i, v in enumerate(values)]
+            ranking.sort(key=lambda item: -item[1])
+            return ranking
+
+    def _root_values(self, snapshot: tuple, seat: int, cards: list[Card], depth: int) -> list[float]:
+        sim = self._sim
+        values = []
+        for card in cards:
+            sim.restore(snapshot)
+            sim.give(seat, card)
+            values.append(self._value(depth))
+        return values
+
+    def _forced_win(self, sim: GameEngine) -> bool:
+        if self.tablebase is None:
+            return False
+        result = self.tablebase.lookup_engine(sim, sim.turn)
+        return result is not None and result.lethal
+
+    def _value(self, depth: int) -> float:
+        """Expectimax value for seat 0 of the position in `self._sim`."""
+        sim = self._sim
+        if depth == 0 or sim.winner is not None:
+            return evaluate(sim)
+        key = (state_key(sim), depth)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        if time.perf_counter() > self._deadline:
+            raise _OutOfTime
+
+        snapshot = sim.snapshot()
+        picker = next((s for s in (0, 1) if sim.pending[s] > 0), None)
+        if picker is not None:
+            # 机会节点：k 张随机候选，递出对对手最不利的一张
+            children = []
+            for card in CARD_CATALOG:
+                sim.restore(snapshot)
+                sim.give(picker, card)
+                children.append(self._value(depth - 1))
+            children.sort(reverse=picker == 1)
+            value = sum(v * w for v, w in zip(children, _BEST_OF_WEIGHTS))
+        elif self._forced_win(sim):
+            value = WIN_VALUE if sim.turn == 0 else -WIN_VALUE
+        else:
+            actor = sim.turn
+            player = sim.players[actor]
+            payable = payable_ids(player.health, player.cost, len(player.hand))
+            options = {card.card_id: card for card in player.hand if payable >> card.card_id & 1}
+            best = None
+            for card in [None, *options.values()]:
+                sim.restore(snapshot)
+                if card is None:
+                    sim.end_turn(actor)
+                else:
+                    sim.apply_remote_play(actor, card)
+                v = self._value(depth - 1)
+                if best is None or (v > best if actor == 0 else v < best):
+                    best = v
+            value = best
+        sim.restore(snapshot)
+        self.cache.put(key, value)
+        return value
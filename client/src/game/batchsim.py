@@ -0,0 +1,422 @@
+"""Vectorized batch match simulator for balance tuning.
+
+N matches are stored as arrays and advanced together, one action per match
+per step, with the same rules as GameEngine:
+
+    hp[2, N], cost[2, N]        per seat, [0] is the seat to act
+    hand[2, CARD_KINDS, N]      how many of each card kind a seat holds
+    pending[2, N]               picks a seat owes its opponent
+    turn[N], winner[N]          winner is -1 while the match runs
+
+A card kind is a card_id of the card catalog (src/game/card.py), every
+(power, positive, negative) combination. Hands are counts, so the order of
+cards is lost: discards remove random cards instead of the oldest ones;
+nothing else depends on order.
+
+Policies are vectorized too. They receive the BatchState and the rows
+(match indices) that need a decision, and answer for all of them at once:
+
+    play_policy(state, rows, playable) -> card kind per row, -1 ends the turn
+        playable[CARD_KINDS, M] holds the counts of playable kinds in hand
+    choose_policy(state, rows, side, candidates) -> column per row
+        side is the picker's index (0 = seat to act), candidates[k, M]
+        holds the kinds on offer; the chosen one goes to the other side
+
+Example:
+    config = SimConfig(turn_regen=3)
+    result = simulate(1_000_000, config, seed=1)
+    print(result.win_rate())
+"""
+
+import numpy as np
+
+import src.game.constants as gconstants
+from src.game.card import CARD_CATALOG
+
+CARD_SPECS = [
+    (card.item_power, card.pcarditem_type, card.ncarditem_type) for card in CARD_CATALOG
+]
+CARD_KINDS = len(CARD_SPECS)
+
+NO_WINNER = -1
+DEFAULT_MAX_TURNS = 500
+DEFAULT_CHUNK = 50_000
+
+
+class SimConfig:
+    """Tunable numbers of one configuration; defaults are the live values.
+
+    Attributes:
+        card_values (dict[str, list[int]]): same layout as CARD_ITEM_VALUES.
+        max_health (int): PLAYER_MAX_HEALTH.
+        init_cost (int): PLAYER_INIT_COST.
+        cost_limit (int): PLAYER_COST_LIMIT.
+        turn_regen (int): cost restored to the seat that ends its turn.
+        opening_draft (int): picks each seat owes at game start.
+        candidates (int): cards offered per pick.
+    """
+
+    def __init__(
+        self,
+        card_values: dict[str, list[int]] | None = None,
+        max_health: int = gconstants.PLAYER_MAX_HEALTH,
+        init_cost: int = gconstants.PLAYER_INIT_COST,
+        cost_limit: int = gconstants.PLAYER_COST_LIMIT,
+        turn_regen: int = gconstants.TURN_COST_REGEN,
+        opening_draft: int = gconstants.OPENING_DRAFT,
+        candidates: int = gconstants.DRAFT_CANDIDATES,
+    ):
+        values = {k: list(v) for k, v in gconstants.CARD_ITEM_VALUES.items()}
+        if card_values:
+            values.update({k: list(v) for k, v in card_values.items()})
+        self.card_values = values
+        self.max_health = max_health
+        self.init_cost = init_cost
+        self.cost_limit = cost_limit
+        self.turn_regen = turn_regen
+        self.opening_draft = opening_draft
+        self.candidates = candidates
+
+    def tables(self) -> tuple:
+        """Per-kind effect tables: (ncard index, ncard value, pcard index, pcard value)."""
+        n_kind = np.empty(CARD_KINDS, np.int8)
+        n_val = np.empty(CARD_KINDS, np.int32)
+        p_kind = np.empty(CARD_KINDS, np.int8)
+        p_val = np.empty(CARD_KINDS, np.int32)
+        for kind, (power, pcard, ncard) in enumerate(CARD_SPECS):
+            n_kind[kind] = gconstants.NCARDITEMLIST.index(ncard)
+            n_val[kind] = self.card_values[ncard][power]
+            p_kind[kind] = gconstants.PCARDITEMLIST.index(pcard)
+            p_val[kind] = self.card_values[pcard][power]
+        return n_kind, n_val, p_kind, p_val
+
+    def __repr__(self) -> str:
+        changed = {k: v for k, v in self.card_values.items()
+                   if v != gconstants.CARD_ITEM_VALUES[k]}
+        return (f"SimConfig(hp={self.max_health}, cost={self.init_cost}/{self.cost_limit}, "
+                f"regen={self.turn_regen}, values={changed})")
+
+
+# 与 NCARDITEMLIST / PCARDITEMLIST 的顺序对应
+_N_SELF_DAMAGE, _N_DISCARD, _N_COST = range(3)
+_P_HEAL, _P_DRAW, _P_DAMAGE, _P_COST = range(4)
+
+
+class BatchState:
+    """Arrays for `n` matches, seat-relative and compacted as matches end.
+
+    Per-seat arrays are [2, M] (hand [2, CARD_KINDS, M]) over the M live
+    matches, and index 0 is always the seat to act: ending a turn swaps the
+    two halves of that match instead of every rule gathering by seat.
+    Finished matches are moved out to `final_winner` / `final_turns` once
+    enough of them pile up, so every step works on contiguous arrays.
+
+    Attributes:
+        config (SimConfig): numbers in effect.
+        rng (np.random.Generator): randomness for rules and policies.
+        hp, cost, pending (np.ndarray): [2, M] int32, [0] = seat to act.
+        hand (np.ndarray): [2, CARD_KINDS, M] int16 card counts, kind-major
+            so per-kind rules are contiguous vector ops.
+        mover (np.ndarray): [M] real seat of index 0.
+        winner (np.ndarray): [M] winning seat or NO_WINNER.
+        turns (np.ndarray): [M] completed turns.
+        ids (np.ndarray): [M] match number of each live row.
+        final_winner, final_turns (np.ndarray): [n] outcome per match.
+    """
+
+    def __init__(self, n: int, config: SimConfig, rng: np.random.Generator, first_seat: int = 0):
+        self.config = config
+        self.rng = rng
+        self.n_kind, self.n_val, self.p_kind, self.p_val = config.tables()
+        # can_play as one comparison: stat[n_kind] >= need, with the stats
+        # (hp, hand size, cost) and strict checks turned into +1 thresholds
+        need = self.n_val + (self.n_kind != _N_COST)
+        self.checks = [(int(n), int(v)) for n, v in zip(self.n_kind, need)]
+        self.hp = np.full((2, n), config.max_health, np.int32)
+        self.cost = np.full((2, n), config.init_cost, np.int32)
+        self.pending = np.full((2, n), config.opening_draft, np.int32)
+        self.hand = np.zeros((2, CARD_KINDS, n), np.int16)
+        self.mover = np.full(n, first_seat, np.int8)
+        self.winner = np.full(n, NO_WINNER, np.int8)
+        self.turns = np.zeros(n, np.int32)
+        self.ids = np.arange(n)
+        self.final_winner = np.full(n, NO_WINNER, np.int8)
+        self.final_turns = np.zeros(n, np.int32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def playable(self) -> np.ndarray:
+        """Counts of the kinds the seat to act could play, others zeroed.
+
+        Same checks as GameEngine.can_play; the hand size includes the card
+        being played.
+        """
+        hand = self.hand[0]
+        stats = (self.hp[0], hand.sum(axis=0, dtype=hand.dtype), self.cost[0])
+        out = np.empty_like(hand)
+        # 36 种牌只有少数几种不同的 (属性, 门槛)，每种只比较一次
+        checks = {}
+        for kind, key in enumerate(self.checks):
+            ok = checks.get(key)
+            if ok is None:
+                ok = checks[key] = stats[key[0]] >= key[1]
+            np.multiply(hand[kind], ok, out=out[kind])
+        return out
+
+    def keep(self, mask: np.ndarray) -> None:
+        """Record the outcome of rows outside `mask` and drop them."""
+        gone = ~mask
+        self.final_winner[self.ids[gone]] = self.winner[gone]
+        self.final_turns[self.ids[gone]] = self.turns[gone]
+        self.hp = self.hp[:, mask]
+        self.cost = self.cost[:, mask]
+        self.pending = self.pending[:, mask]
+        self.hand = self.hand[:, :, mask]
+        self.mover = self.mover[mask]
+        self.winner = self.winner[mask]
+        self.turns = self.turns[mask]
+        self.ids = self.ids[mask]
+
+
+# ---- Policies ----
+
+def random_play_policy(stop_chance: float = 0.2):
+    """Play a uniformly random playable card, ending the turn with `stop_chance`."""
+    def policy(state: BatchState, rows: np.ndarray, playable: np.ndarray) -> np.ndarray:
+        kinds = sample_counts(state.rng, playable)
+        stop = state.rng.random(len(rows)) < stop_chance
+        kinds[stop] = -1
+        return kinds
+    return policy
+
+
+def greedy_damage_play_policy(state: BatchState, rows: np.ndarray, playable: np.ndarray) -> np.ndarray:
+    """Play the playable card with the largest opponent damage, then any card."""
+    score = np.where(state.p_kind == _P_DAMAGE, state.p_val, 0)[:, None] * 2 + 1
+    score = np.where(playable > 0, score, 0)
+    kinds = score.argmax(axis=0)
+    kinds[score.max(axis=0) == 0] = -1
+    return kinds
+
+
+def random_choose_policy(state: BatchState, rows: np.ndarray, side: int, candidates: np.ndarray) -> np.ndarray:
+    """Give the opponent a uniformly random candidate."""
+    return state.rng.integers(0, candidates.shape[0], len(rows))
+
+
+def weakest_choose_policy(state: BatchState, rows: np.ndarray, side: int, candidates: np.ndarray) -> np.ndarray:
+    """Give the opponent the candidate with the lowest item power."""
+    return (candidates // (CARD_KINDS // len(gconstants.ITEM_POWER_LIST))).argmin(axis=0)
+
+
+def sample_counts(rng: np.random.Generator, counts: np.ndarray) -> np.ndarray:
+    """Pick a kind per column of counts[CARD_KINDS, M], weighted by count; -1 if empty."""
+    total = counts.sum(axis=0, dtype=counts.dtype)
+    pick = (rng.random(len(total)) * total).astype(counts.dtype)
+    # 逐行累加比 cumsum(axis=0) 快一个数量级
+    running = np.zeros_like(total)
+    below = np.empty(len(total), bool)
+    kinds = np.zeros(len(total), np.intp)
+    for row in counts:
+        running += row
+        np.less_equal(running, pick, out=below)
+        kinds += below
+    kinds[total == 0] = -1
+    return kinds
+
+
+# ---- Rules ----
+
+def _ask(policies: tuple, seat: np.ndarray, state: BatchState, rows: np.ndarray, *args) -> np.ndarray:
+    """Call each real seat's policy on the rows where that seat decides."""
+    if policies[0] is policies[1]:
+        return policies[0](state, rows, *args)
+    out = np.empty(len(rows), np.intp)
+    for s in (0, 1):
+        sel = np.flatnonzero(seat == s)
+        if len(sel):
+            out[sel] = policies[s](state, rows[sel],
+                                   *(a[..., sel] if isinstance(a, np.ndarray) else a for a in args))
+    return out
+
+
+def settle_picks(state: BatchState, choose_policies: tuple) -> None:
+    """Let both seats make the picks they owe, all rows at once."""
+    k = state.config.candidates
+    while (state.pending > 0).any():
+        for side in (0, 1):
+            rows = np.flatnonzero(state.pending[side] > 0)
+            if len(rows) == 0:
+                continue
+            candidates = state.rng.integers(0, CARD_KINDS, (k, len(rows)))
+            seat = state.mover[rows] ^ side
+            column = _ask(choose_policies, seat, state, rows, side, candidates)
+            kinds = candidates[column, np.arange(len(rows))]
+            state.hand[1 - side, kinds, rows] += 1      # rows are unique
+            state.pending[side, rows] -= 1
+
+
+def play_cards(state: BatchState, rows: np.ndarray, kinds: np.ndarray) -> None:
+    """Resolve one card played by the seat to act in each row."""
+    cfg = state.config
+    hp, cost = state.hp, state.cost
+    state.hand[0, kinds, rows] -= 1
+    n_kind = state.n_kind[kinds]
+    n_val = state.n_val[kinds]
+    p_kind = state.p_kind[kinds]
+    p_val = state.p_val[kinds]
+
+    # 负面效果
+    sel = n_kind == _N_SELF_DAMAGE
+    r = rows[sel]
+    hp[0, r] = np.maximum(hp[0, r] - n_val[sel], 0)
+    sel = n_kind == _N_COST
+    cost[0, rows[sel]] -= n_val[sel]
+    drop = n_kind == _N_DISCARD
+    for i in range(int(n_val[drop].max(initial=0))):
+        r = rows[drop & (n_val > i)]
+        lost = sample_counts(state.rng, state.hand[0][:, r])
+        has = lost >= 0
+        state.hand[0, lost[has], r[has]] -= 1
+
+    # 正面效果
+    sel = p_kind == _P_HEAL
+    r = rows[sel]
+    hp[0, r] = np.minimum(hp[0, r] + p_val[sel], cfg.max_health)
+    sel = p_kind == _P_DRAW
+    state.pending[1, rows[sel]] += p_val[sel]
+    sel = p_kind == _P_DAMAGE
+    r = rows[sel]
+    hp[1, r] = np.maximum(hp[1, r] - p_val[sel], 0)
+    sel = p_kind == _P_COST
+    r = rows[sel]
+    cost[0, r] = np.minimum(cost[0, r] + p_val[sel], cfg.cost_limit)
+
+    # 先判对手，再判自己（与 GameEngine._resolve 一致）
+    other_dead = hp[1, rows] <= 0
+    self_dead = ~other_dead & (hp[0, rows] <= 0)
+    state.winner[rows[other_dead]] = state.mover[rows[other_dead]]
+    state.winner[rows[self_dead]] = 1 - state.mover[rows[self_dead]]
+
+
+def end_turns(state: BatchState, rows: np.ndarray) -> None:
+    """End the turn in each row: owe a pick, regain cost, pass the turn."""
+    cfg = state.config
+    state.pending[0, rows] += 1
+    state.cost[0, rows] = np.minimum(state.cost[0, rows] + cfg.turn_regen, cfg.cost_limit)
+    state.turns[rows] += 1
+    state.mover[rows] ^= 1
+    for array in (state.hp, state.cost, state.pending):
+        array[:, rows] = array[::-1, rows]
+    mine = state.hand[0][:, rows]
+    state.hand[0][:, rows] = state.hand[1][:, rows]
+    state.hand[1][:, rows] = mine
+
+
+def run(state: BatchState, play_policies: tuple, choose_policies: tuple,
+        max_turns: int = DEFAULT_MAX_TURNS) -> None:
+    """Advance every match until it has a winner or reaches `max_turns`."""
+    settle_picks(state, choose_policies)
+    while len(state):
+        alive = (state.winner == NO_WINNER) & (state.turns < max_turns)
+        live = int(np.count_nonzero(alive))
+        if live == 0 or live < len(state) * 7 // 8:
+            state.keep(alive)
+            if live == 0:
+                return
+            alive = None
+        rows = np.arange(len(state))
+        playable = state.playable()
+        kinds = np.asarray(_ask(play_policies, state.mover, state, rows, playable), np.intp)
+        # 策略选了不可出的牌时按结束回合处理
+        act = kinds >= 0
+        r = np.flatnonzero(act)
+        act[r] = playable[kinds[r], r] > 0
+        end = ~act
+        if alive is not None:
+            act &= alive
+            end &= alive
+        r = np.flatnonzero(act)
+        if len(r):
+            play_cards(state, r, kinds[r])
+        r = np.flatnonzero(end)
+        if len(r):
+            end_turns(state, r)
+        settle_picks(state, choose_policies)
+
+
+# ---- Results ----
+
+class BatchResult:
+    """Outcome counts of a simulate() call.
+
+    Attributes:
+        games (int): matches simulated.
+        wins (list[int]): wins per seat.
+        unfinished (int): matches stopped at the turn limit.
+        total_turns (int): turns summed over all matches.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.wins = [0, 0]
+        self.unfinished = 0
+        self.total_turns = 0
+
+    def add(self, state: BatchState) -> None:
+        winner = state.final_winner
+        self.games += len(winner)
+        self.wins[0] += int((winner == 0).sum())
+        self.wins[1] += int((winner == 1).sum())
+        self.unfinished += int((winner == NO_WINNER).sum())
+        self.total_turns += int(state.final_turns.sum())
+
+    def win_rate(self, seat: int = 0) -> float:
+        """Share of finished matches won by `seat`."""
+        finished = self.wins[0] + self.wins[1]
+        return self.wins[seat] / finished if finished else 0.0
+
+    def avg_turns(self) -> float:
+        return self.total_turns / self.games if self.games else 0.0
+
+
+def simulate(
+    games: int,
+    config: SimConfig | None = None,
+    play_policies: tuple | None = None,
+    choose_policies: tuple | None = None,
+    seed: int | None = None,
+    first_seat: int = 0,
+    max_turns: int = DEFAULT_MAX_TURNS,
+    chunk: int = DEFAULT_CHUNK,
+) -> BatchResult:
+    """Simulate `games` matches under `config` in chunks of `chunk` matches.
+
+    Args:
+        games (int): Number of matches.
+        config (SimConfig | None): Numbers to test; live values by default.
+        play_policies (tuple | None): (seat 0, seat 1) play policies; random by default.
+        choose_policies (tuple | None): (seat 0, seat 1) pick policies; random by default.
+        seed (int | None): Seed for reproducible runs.
+        first_seat (int): Seat that takes the first turn.
+        max_turns (int): Turn limit after which a match counts as unfinished.
+        chunk (int): Matches held in memory at once.
+
+    Returns:
+        BatchResult: Wins per seat, unfinished matches and turn totals.
+    """
+    config = config or SimConfig()
+    default_play = random_play_policy()
+    play_policies = play_policies or (default_play, default_play)
+    choose_policies = choose_policies or (random_choose_policy, random_choose_policy)
+    rng = np.random.default_rng(seed)
+    result = BatchResult()
+    remaining = games
+    while remaining > 0:
+        n = min(chunk, remaining)
+        state = BatchState(n, config, rng, first_seat)
+        run(state, play_policies, choose_policies, max_turns)
+        result.add(state)
+        remaining -= n
+    return result
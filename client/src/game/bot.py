@@ -0,0 +1,166 @@
+"""A computer opponent that stands in for the remote peer.
+
+BotPeer looks like a connected Network to GameState: `send()` takes the
+messages GameState would put on the wire, `on_message` delivers the
+bot's replies. Behind it the bot keeps its own GameEngine (its seat is
+LOCAL_SEAT there, the human's is REMOTE_SEAT), mirrors the human's moves
+into it and answers with MCTS: picks when it owes the human cards, plays
+and ends its turn when it is its turn.
+
+Messages are handled on a worker thread, like a real peer's would
+arrive, so GameState never re-enters itself from inside `send()`.
+
+Example:
+    game_state.initBot()                  # instead of initNetwork()
+    app.start_game()                      # game_start -> the bot drafts
+"""
+
+import queue
+import threading
+
+import src.game.constants as gconstants
+from src.game.advisor import Advisor
+from src.game.card import Card, get_card
+from src.game.draft import ROLE_GUEST, ROLE_HOST
+from src.game.engine import GameEngine, IllegalAction
+from src.game.mcts import MCTS
+from src.log import get_logger
+
+log = get_logger("game.bot")
+
+BOT_SEAT = 0
+HUMAN_SEAT = 1
+CARD_FIELDS = ("item_power", "pcarditem_type", "ncarditem_type", "card_effect")
+
+
+class BotPeer:
+    """Network stand-in whose other end is an MCTS bot.
+
+    The human is the host and moves first.
+
+    Args:
+        search (MCTS | None): The bot's search; a default MCTS if None.
+        advisor (Advisor | None): If given, picks follow its ranking
+            instead of the MCTS.
+
+    Attributes:
+        on_message (Callable[[dict], None] | None): Receives the bot's messages.
+        engine (GameEngine): The bot's view of the match.
+    """
+
+    is_host = True          # 对 GameState 而言本机是主机
+    is_connected = True
+
+    def __init__(self, search: MCTS | None = None, advisor: Advisor | None = None):
+        self.search = search if search is not None else MCTS()
+        self.advisor = advisor
+        self.engine = GameEngine(first_seat=HUMAN_SEAT)
+        self.on_message = None
+        self.on_connected = None
+        self.on_peer_connected = None
+        self._inbox: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="bot-peer")
+        self._thread.start()
+
+    def send(self, msg: dict) -> None:
+        """Deliver a message from GameState to the bot (never blocks)."""
+        self._inbox.put(msg)
+
+    def close(self) -> None:
+        """Stop the bot thread and its search."""
+        if self._thread.is_alive():
+            self._inbox.put(None)
+            self._thread.join(timeout=1.0)
+        self.search.close()
+
+    # ---------------- Internals --------------------
+    # -----------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            msg = self._inbox.get()
+            if msg is None:
+                return
+            try:
+                self._receive(msg)
+                self._act()
+            except Exception as e:
+                log.error("电脑玩家处理消息失败: %s (%s)", e, msg)
+
+    def _receive(self, msg: dict) -> None:
+        engine = self.engine
+        msg_type = msg.get("type")
+        if msg_type == gconstants.EVENT_GAME_START:
+            if msg.get("seed") is not None:
+                engine.seed_draft(msg["seed"], (ROLE_GUEST, ROLE_HOST))
+            engine.start()
+        elif msg_type == gconstants.EVENT_CARD_PLAYED:
+            engine.apply_remote_play(HUMAN_SEAT, _dict_to_card(msg["card"]))
+        elif msg_type == gconstants.EVENT_CARD_DRAWN:
+            index = msg.get("index")
+            card = _dict_to_card(msg["card"]) if msg.get("card") else None
+            if index is not None and engine.draft is not None and (
+                    card is None or engine.candidates(HUMAN_SEAT)[index] is card):
+                engine.give_index(HUMAN_SEAT, index)
+            else:
+                # 序号与卡牌不符时以卡牌为准
+                engine.give(HUMAN_SEAT, card)
+        elif msg_type == gconstants.EVENT_TURN_END:
+            engine.end_turn(HUMAN_SEAT)
+
+    def _act(self) -> None:
+        """Make every move the bot owes now: picks first, then its turn."""
+        engine = self.engine
+        while not engine.is_over():
+            if engine.pending[BOT_SEAT] > 0:
+                self._pick()
+            elif engine.turn == BOT_SEAT and engine.pending[HUMAN_SEAT] <= 0:
+                # 等对手把欠的牌递过来再出牌：这些牌会进自己的手牌
+                self._play_or_end()
+            else:
+                return
+
+    def _pick(self) -> None:
+        engine = self.engine
+        cards = engine.candidates(BOT_SEAT)
+        if self.advisor is not None:
+            index = self.advisor.rank(engine, BOT_SEAT, cards)[0][0]
+        else:
+            index = self.search.choose_pick(engine, BOT_SEAT, cards)
+        engine.give(BOT_SEAT, cards[index])
+        msg = {"type": gconstants.EVENT_CARD_DRAWN, "player": "remote", "sender_turn_end": True,
+               "card": _card_to_dict(cards[index])}
+        if engine.draft is not None:
+            msg["index"] = index
+        self._deliver(msg)
+
+    def _play_or_end(self) -> None:
+        engine = self.engine
+        card = self.search.choose_play(engine, BOT_SEAT)
+        if card is not None:
+            try:
+                engine.play(BOT_SEAT, engine.players[BOT_SEAT].hand.ordered().index(card))
+            except IllegalAction as e:
+                log.warning("电脑玩家出牌被拒绝: %s", e)
+                card = None
+            else:
+                self._deliver({"type": gconstants.EVENT_CARD_PLAYED,
+                               "card": _card_to_dict(card), "param": None, "player": "remote"})
+                return
+        engine.end_turn(BOT_SEAT)
+        # 和 GameState.turnEnd 一样：先递出欠的牌，再通知回合结束
+        while engine.pending[BOT_SEAT] > 0:
+            self._pick()
+        self._deliver({"type": gconstants.EVENT_TURN_END, "player": "remote"})
+
+    def _deliver(self, msg: dict) -> None:
+        if self.on_message:
+            self.on_message(msg)
+
+
+def _card_to_dict(card: Card) -> dict:
+    return {field: getattr(card, field) for field in CARD_FIELDS}
+
+
+def _dict_to_card(card_dict: dict) -> Card:
+    return get_card(*(card_dict.get(field) for field in CARD_FIELDS))
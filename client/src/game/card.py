@@ -1,26 +1,121 @@
+import src.game.constants as gconstants
+
+
 class Card:
+    """An immutable card: one positive and one negative item at a power level.
+
+    Cards without a status effect come from the interned catalog (see
+    get_card / card_by_id), so equal cards are the same object and can be
+    stored or sent as their small integer `card_id`.
+
+    Attributes:
+        item_power (int): power level, an ITEM_POWER_* value.
+        pcarditem_type (str): positive item, a PCARDITEM_* value.
+        ncarditem_type (str): negative item, an NCARDITEM_* value.
+        card_effect (str): status effect, a STATUS_* value.
+        card_id (int | None): catalog index, None for cards outside it.
+        pvalue (int): CARD_ITEM_VALUES of the positive item at this power.
+        nvalue (int): CARD_ITEM_VALUES of the negative item at this power.
+    """
+
+    __slots__ = (
+        "item_power", "pcarditem_type", "ncarditem_type", "card_effect",
+        "card_id", "pvalue", "nvalue",
+    )
+
     def __init__(
         self,
         item_power: int,
         pcarditem_type: str,
         ncarditem_type: str,
         card_effect: str,
+        card_id: int | None = None,
     ):
-        self.item_power = item_power
-        self.pcarditem_type = pcarditem_type
-        self.ncarditem_type = ncarditem_type
-        self.card_effect = card_effect
+        init = object.__setattr__
+        init(self, "item_power", item_power)
+        init(self, "pcarditem_type", pcarditem_type)
+        init(self, "ncarditem_type", ncarditem_type)
+        init(self, "card_effect", card_effect)
+        init(self, "card_id", card_id)
+        init(self, "pvalue", gconstants.CARD_ITEM_VALUES[pcarditem_type][item_power])
+        init(self, "nvalue", gconstants.CARD_ITEM_VALUES[ncarditem_type][item_power])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Card is immutable")
+
+    def __reduce__(self):
+        if self.card_id is not None:
+            return (card_by_id, (self.card_id,))
+        return (Card, (self.item_power, self.pcarditem_type,
+                       self.ncarditem_type, self.card_effect))
 
     def getNcarditem(self) -> str:
         return self.ncarditem_type
-    
+
     def getPcarditem(self) -> str:
         return self.pcarditem_type
-    
+
     def getItemPower(self) -> int:
         return self.item_power
-    
+
     def getCardEffect(self) -> str:
         return self.card_effect
-    
-    
+
+    def __str__(self) -> str:
+        return f"{self.pcarditem_type} | {self.ncarditem_type} (Lv{self.item_power})"
+
+
+# ---- Catalog ----
+# id = power * 12 + positive index * 3 + negative index, 0..35
+
+CARD_CATALOG: tuple[Card, ...] = tuple(
+    Card(power, pcard, ncard, gconstants.STATUS_CARD_NO_EFFECT, card_id=i)
+    for i, (power, pcard, ncard) in enumerate(
+        (power, pcard, ncard)
+        for power in gconstants.ITEM_POWER_LIST
+        for pcard in gconstants.PCARDITEMLIST
+        for ncard in gconstants.NCARDITEMLIST
+    )
+)
+CARD_COUNT = len(CARD_CATALOG)
+
+_CARD_IDS = {
+    (card.item_power, card.pcarditem_type, card.ncarditem_type): card.card_id
+    for card in CARD_CATALOG
+}
+
+
+def card_by_id(card_id: int) -> Card:
+    """Return the catalog card with id `card_id` (0..CARD_COUNT-1)."""
+    return CARD_CATALOG[card_id]
+
+
+def get_card(
+    item_power: int,
+    pcarditem_type: str,
+    ncarditem_type: str,
+    card_effect: str = gconstants.STATUS_CARD_NO_EFFECT,
+) -> Card:
+    """Return the card with these items, from the catalog when possible.
+
+    Args:
+        item_power (int): Power level.
+        pcarditem_type (str): Positive item.
+        ncarditem_type (str): Negative item.
+        card_effect (str): Status effect; only STATUS_CARD_NO_EFFECT cards
+            are interned.
+
+    Returns:
+        Card: The shared catalog card, or a new Card for a status effect.
+
+    Raises:
+        ValueError: The power or item types do not exist.
+    """
+    card_id = _CARD_IDS.get((item_power, pcarditem_type, ncarditem_type))
+    if card_id is None:
+        raise ValueError(
+            f"unknown card: {pcarditem_type!r} | {ncarditem_type!r} (Lv{item_power!r})"
+        )
+    if card_effect == gconstants.STATUS_CARD_NO_EFFECT:
+        return CARD_CATALOG[card_id]
+    return Card(item_power, pcarditem_type, ncarditem_type, card_effect)
@@ -3,6 +3,9 @@ MAX_HAND_SIZE = 7
 PLAYER_INIT_COST = 4
 TURN_TIME_LIMIT = 120  # in seconds
 PLAYER_COST_LIMIT = 20
+TURN_COST_REGEN = 2    # cost restored to the player who ends a turn
+OPENING_DRAFT = 3      # cards each player picks for the opponent at game start
+DRAFT_CANDIDATES = 3   # cards offered per pick
 
 
 """
@@ -51,6 +54,14 @@ upon event_return_card, the json file should contain:
 }
 """
 
+"""
+Engine-only events (see src/game/engine.py), never sent over the network:
+EVENT_COST_CHANGED carries the new cost of a seat, EVENT_CHOOSE_CARD tells a
+seat it owes the opponent `count` picks.
+"""
+EVENT_COST_CHANGED = "cost_changed"
+EVENT_CHOOSE_CARD = "choose_card"
+
 EVENT_LIST = [
     EVENT_PLAYER_DAMAGE,
     EVENT_PLAYER_HEAL,
@@ -61,7 +72,8 @@ EVENT_LIST = [
     EVENT_CARD_DRAWN,
     EVENT_CARD_PLAYED,
     EVENT_CARD_DISCARDED,
-    
+    EVENT_COST_CHANGED,
+    EVENT_CHOOSE_CARD,
 ]
 
 """
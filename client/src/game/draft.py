@@ -0,0 +1,90 @@
+"""Seeded, deterministic draft candidates.
+
+Every candidate set of a match is a pure function of (match seed, role,
+counter): the role says who is picking (ROLE_HOST or ROLE_GUEST, the
+same on both machines whatever their local seat numbers) and the counter
+is how many picks that role has made so far. Both peers agree on the
+seed at game start, so each can compute the other's candidate sets and a
+pick only has to travel as its index (0..DRAFT_CANDIDATES-1).
+
+Sets can be looked up in any order, so bots can look ahead with `at()`
+or `peek()` without disturbing the stream.
+
+Example:
+    seed = new_match_seed()
+    stream = CandidateStream(seed, ROLE_HOST)
+    cards = stream.peek()        # what the host is offered now
+    stream.advance()             # the host made its pick
+"""
+
+import random
+from hashlib import blake2b
+
+import src.game.constants as gconstants
+from src.game.card import CARD_CATALOG, Card
+
+ROLE_HOST = 0
+ROLE_GUEST = 1
+SEED_BITS = 63      # 保证 JSON / 紧凑编码下都是普通整数
+
+
+def new_match_seed() -> int:
+    """Return a fresh match seed from the OS entropy source."""
+    return random.SystemRandom().getrandbits(SEED_BITS)
+
+
+def candidate_set(seed: int, role: int, counter: int) -> list[Card]:
+    """Return the `counter`-th candidate set offered to `role`.
+
+    Args:
+        seed (int): Match seed, 0 .. 2**63-1.
+        role (int): ROLE_HOST or ROLE_GUEST.
+        counter (int): Number of picks `role` made before this one.
+
+    Returns:
+        list[Card]: DRAFT_CANDIDATES catalog cards, uniform and independent.
+    """
+    key = seed.to_bytes(8, "little") + bytes((role,)) + counter.to_bytes(4, "little")
+    # 64 位摘要逐次取模，偏差约为 36 / 2**64，可忽略
+    n = int.from_bytes(blake2b(key, digest_size=8).digest(), "little")
+    size = len(CARD_CATALOG)
+    cards = []
+    for _ in range(gconstants.DRAFT_CANDIDATES):
+        n, card_id = divmod(n, size)
+        cards.append(CARD_CATALOG[card_id])
+    return cards
+
+
+class CandidateStream:
+    """The candidate sets of one role, with a counter of picks made.
+
+    Args:
+        seed (int): Match seed.
+        role (int): ROLE_HOST or ROLE_GUEST.
+        counter (int): Picks already made (to resume a match).
+
+    Attributes:
+        counter (int): Index of the set offered by the next `peek()`.
+    """
+
+    __slots__ = ("seed", "role", "counter")
+
+    def __init__(self, seed: int, role: int, counter: int = 0):
+        self.seed = seed
+        self.role = role
+        self.counter = counter
+
+    def at(self, counter: int) -> list[Card]:
+        """Return the set offered at pick `counter` (any pick, past or future)."""
+        return candidate_set(self.seed, self.role, counter)
+
+    def peek(self, ahead: int = 0) -> list[Card]:
+        """Return the set offered `ahead` picks from now (0 = the current one)."""
+        return candidate_set(self.seed, self.role, self.counter + ahead)
+
+    def advance(self) -> None:
+        """Move to the next set: the current pick was made."""
+        self.counter += 1
+
+    def __repr__(self) -> str:
+        return f"CandidateStream(seed={self.seed}, role={self.role}, counter={self.counter})"
@@ -0,0 +1,470 @@
+"""Headless rules engine.
+
+GameEngine owns the two players and the turn, applies actions and returns
+the events they caused. It never touches Tk or sockets, so whole matches
+can be run in-process (bots, regression tests, balance runs); GameState
+wraps it and turns the events into UI updates and network messages.
+
+Seats are 0 and 1. Every action returns a list of event dicts:
+
+    {"type": EVENT_CARD_PLAYED,   "seat": s, "card": Card}
+    {"type": EVENT_PLAYER_DAMAGE, "seat": s, "amount": n, "health": hp}
+    {"type": EVENT_PLAYER_HEAL,   "seat": s, "amount": n, "health": hp}
+    {"type": EVENT_COST_CHANGED,  "seat": s, "amount": +-n, "cost": c}
+    {"type": EVENT_CARD_DISCARDED, "seat": s, "card": Card}
+    {"type": EVENT_CHOOSE_CARD,   "seat": s, "count": n}   # s owes n picks
+    {"type": EVENT_CARD_DRAWN,    "seat": s, "card": Card} # s received a card
+    {"type": EVENT_TURN_END,      "seat": s}               # s ended its turn
+    {"type": EVENT_GAME_END,      "winner": s}
+
+Cards move by drafting: a seat that owes a pick looks at `candidates()`
+and `give()`s one of them to the opponent's hand. Picks are owed at game
+start, when a seat ends its turn, and to the opponent of a seat that
+plays a card-draw card. After `seed_draft()` the candidate sets come from
+per-seat CandidateStreams (see draft.py) instead of `rng`, so two engines
+with the same seed offer identical sets and a pick is just an index.
+
+Example:
+    engine = GameEngine(first_seat=0, rng=random.Random(1))
+    engine.start()
+    for seat in (0, 1):
+        while engine.pending[seat] > 0:
+            engine.give(seat, engine.candidates()[0])
+    events = engine.play(0, 0)
+"""
+
+from random import Random
+
+import src.game.constants as gconstants
+from src.game.card import CARD_CATALOG, Card
+from src.game.draft import CandidateStream
+from src.game.player import Player
+
+
+class IllegalAction(Exception):
+    """Raised when an action is not allowed in the current state."""
+
+
+def opponent(seat: int) -> int:
+    """Return the other seat."""
+    return 1 - seat
+
+
+# ---- Compiled Effects ----
+# Each card compiles once into (can_pay, pay, reward) closures with its
+# numbers bound, so a play runs no type dispatch or value lookups:
+#   can_pay(player) -> bool
+#   pay(engine, seat, player, events)       negative item
+#   reward(engine, seat, player, events)    positive item
+
+def _always(player: Player) -> bool:
+    return True
+
+
+def _nothing(engine: "GameEngine", seat: int, player: Player, events: list) -> None:
+    pass
+
+
+def _compile_cost(ncard: str, value: int) -> tuple:
+    match ncard:
+        case gconstants.NCARDITEM_SELF_DAMAGE:
+            def can_pay(player):
+                return player.health > value
+
+            def pay(engine, seat, player, events):
+                health = player.health - value           # Player.takeDamage
+                player.health = health = health if health > 0 else 0
+                events.append({"type": gconstants.EVENT_PLAYER_DAMAGE, "seat": seat,
+                               "amount": value, "health": health})
+        case gconstants.NCARDITEM_CARD_DISCARD:
+            def can_pay(player):
+                return len(player.hand) > value
+
+            def pay(engine, seat, player, events):
+                hand = player.hand
+                for _ in range(value):
+                    if hand:
+                        events.append({"type": gconstants.EVENT_CARD_DISCARDED,
+                                       "seat": seat, "card": hand.pop(0)})
+        case gconstants.NCARDITEM_COST_USAGE:
+            def can_pay(player):
+                return player.cost >= value
+
+            def pay(engine, seat, player, events):
+                if player.cost >= value:                 # Player.costUsage
+                    player.cost -= value
+                events.append({"type": gconstants.EVENT_COST_CHANGED, "seat": seat,
+                               "amount": -value, "cost": player.cost})
+        case _:
+            return _always, _nothing
+    return can_pay, pay
+
+
+def _compile_reward(pcard: str, value: int):
+    max_health = gconstants.PLAYER_MAX_HEALTH
+    cost_limit = gconstants.PLAYER_COST_LIMIT
+    match pcard:
+        case gconstants.PCARDITEM_HEAL:
+            def reward(engine, seat, player, events):
+                health = player.health + value           # Player.takeHeal
+                player.health = health = health if health < max_health else max_health
+                events.append({"type": gconstants.EVENT_PLAYER_HEAL, "seat": seat,
+                               "amount": value, "health": health})
+        case gconstants.PCARDITEM_CARD_DRAW:
+            # The opponent drafts the extra cards for us
+            def reward(engine, seat, player, events):
+                events.append(engine._owe(1 - seat, value))
+        case gconstants.PCARDITEM_DAMAGE:
+            def reward(engine, seat, player, events):
+                target = engine.players[1 - seat]
+                health = target.health - value
+                target.health = health = health if health > 0 else 0
+                events.append({"type": gconstants.EVENT_PLAYER_DAMAGE, "seat": 1 - seat,
+                               "amount": value, "health": health})
+        case gconstants.PCARDITEM_COST_RECOVER:
+            def reward(engine, seat, player, events):
+                cost = player.cost + value                # Player.costRegen
+                player.cost = cost = cost if cost < cost_limit else cost_limit
+                events.append({"type": gconstants.EVENT_COST_CHANGED, "seat": seat,
+                               "amount": value, "cost": cost})
+        case _:
+            return _nothing
+    return reward
+
+
+def compile_card(card: Card) -> tuple:
+    """Compile `card` into its (can_pay, pay, reward) closures."""
+    return (*_compile_cost(card.ncarditem_type, card.nvalue),
+            _compile_reward(card.pcarditem_type, card.pvalue))
+
+
+_COMPILED = tuple(compile_card(card) for card in CARD_CATALOG)
+_compiled_extra: dict[tuple, tuple] = {}
+
+
+def effects_of(card: Card) -> tuple:
+    """Return the compiled (can_pay, pay, reward) of `card`."""
+    if card.card_id is not None:
+        return _COMPILED[card.card_id]
+    # 目录外的卡牌（带状态效果）按需编译并缓存
+    key = (card.item_power, card.pcarditem_type, card.ncarditem_type)
+    effects = _compiled_extra.get(key)
+    if effects is None:
+        effects = _compiled_extra[key] = compile_card(card)
+    return effects
+
+
+# ---- Playable Masks ----
+# can_pay only reads hp, cost and hand size, so which catalog cards are
+# payable is one bitmask over card ids per (hp, cost, hand size). There are
+# few such triples; each mask is computed once per process.
+
+class _Probe:
+    __slots__ = ("health", "cost", "hand")
+
+    def __init__(self, health: int, cost: int, hand_size: int):
+        self.health = health
+        self.cost = cost
+        self.hand = range(hand_size)        # can_pay 只用到 len(hand)
+
+
+_payable: dict[tuple[int, int, int], int] = {}
+
+
+def payable_ids(health: int, cost: int, hand_size: int) -> int:
+    """Return the catalog cards a player could pay for, as a card-id bitmask.
+
+    Args:
+        health (int): The player's hp.
+        cost (int): The player's cost.
+        hand_size (int): Cards in the player's hand (the card itself included).
+
+    Returns:
+        int: Bit `card_id` is set if that card's negative item can be paid.
+    """
+    key = (health, cost, hand_size)
+    mask = _payable.get(key)
+    if mask is None:
+        probe = _Probe(health, cost, hand_size)
+        mask = 0
+        for card_id, (can_pay, _, _) in enumerate(_COMPILED):
+            if can_pay(probe):
+                mask |= 1 << card_id
+        _payable[key] = mask
+    return mask
+
+
+class GameEngine:
+    """Two-seat match state plus the rules that change it.
+
+    Attributes:
+        players (list[Player]): players[seat].
+        turn (int): seat whose turn it is.
+        winner (int | None): winning seat once the game is over.
+        pending (list[int]): picks each seat still owes its opponent. May go
+            negative when a mirrored opponent's pick arrives before the
+            action that owed it.
+        rng (Random): source for draft candidates until seed_draft().
+        draft (tuple[CandidateStream, CandidateStream] | None): draft[seat]
+            offers that seat's candidate sets once the draft is seeded.
+    """
+
+    def __init__(
+        self,
+        players: list[Player] | None = None,
+        first_seat: int = 0,
+        rng: Random | None = None,
+    ):
+        self.players = players if players is not None else [Player(), Player()]
+        self.turn = first_seat
+        self.winner: int | None = None
+        self.pending = [0, 0]
+        self.rng = rng if rng is not None else Random()
+        self.draft: tuple[CandidateStream, CandidateStream] | None = None
+        self._masks: list[tuple | None] = [None, None]     # (hp, cost, hand, mask) per seat
+
+    # ---------------- Queries ----------------------
+    # -----------------------------------------------
+
+    def is_over(self) -> bool:
+        """Return True once a winner is decided."""
+        return self.winner is not None
+
+    def can_play(self, seat: int, card: Card) -> bool:
+        """Check whether `seat` can pay the negative item of `card`.
+
+        Args:
+            seat (int): The seat that would play the card.
+            card (Card): The card to check.
+
+        Returns:
+            bool: True if the card's cost can be paid.
+        """
+        card_id = card.card_id
+        effects = _COMPILED[card_id] if card_id is not None else effects_of(card)
+        return effects[0](self.players[seat])
+
+    def playable_mask(self, seat: int) -> int:
+        """Return which of `seat`'s hand cards it could play right now.
+
+        The mask is cached per seat on (hp, cost, hand) and only recomputed
+        when that key changes, so the UI can ask on every refresh. The hand
+        part is the identity of its ordered() view, which CountHand replaces
+        whenever the hand's size or cards change.
+
+        Returns:
+            int: Bit i is set if hand index i is playable; 0 when it is not
+                `seat`'s turn or the game is over.
+        """
+        if self.winner is not None or seat != self.turn:
+            return 0
+        player = self.players[seat]
+        health, cost, hand = player.health, player.cost, player.hand.ordered()
+        cached = self._masks[seat]
+        if cached is not None and cached[2] is hand and cached[0] == health and cached[1] == cost:
+            return cached[3]
+        ids = payable_ids(health, cost, len(hand))
+        mask = 0
+        for i, card in enumerate(hand):
+            if ids >> card.card_id & 1:
+                mask |= 1 << i
+        # 持有 hand 的引用：它不会被回收，身份比较不会误中
+        self._masks[seat] = (health, cost, hand, mask)
+        return mask
+
+    def playable_indices(self, seat: int) -> list[int]:
+        """Return the hand indices `seat` could play right now."""
+        if self.winner is not None or seat != self.turn:
+            return []
+        player = self.players[seat]
+        ids = payable_ids(player.health, player.cost, len(player.hand))
+        return [i for i, card in enumerate(player.hand.ordered()) if ids >> card.card_id & 1]
+
+    def candidates(self, seat: int | None = None) -> list[Card]:
+        """Return the catalog cards `seat` may pick from.
+
+        With a seeded draft this is `seat`'s current set, the same on every
+        machine until `seat` gives a card. Otherwise (or without a seat)
+        the cards are random: a uniform pick from the catalog equals
+        independent uniform picks of power, positive and negative item,
+        with one RNG call per card.
+        """
+        if self.draft is not None and seat is not None:
+            return self.draft[seat].peek()
+        random = self.rng.random
+        n = len(CARD_CATALOG)
+        return [CARD_CATALOG[int(random() * n)] for _ in range(gconstants.DRAFT_CANDIDATES)]
+
+    # ---------------- Actions ----------------------
+    # -----------------------------------------------
+
+    def seed_draft(self, seed: int, roles: tuple[int, int]) -> None:
+        """Draw candidate sets from `seed` from now on.
+
+        Args:
+            seed (int): Match seed both peers agreed on.
+            roles (tuple[int, int]): roles[seat], ROLE_HOST or ROLE_GUEST;
+                the peers' seat numbers differ but the roles do not.
+        """
+        self.draft = (CandidateStream(seed, roles[0]), CandidateStream(seed, roles[1]))
+
+    def start(self) -> list[dict]:
+        """Open the game: both seats owe the opening draft.
+
+        Returns:
+            list[dict]: One EVENT_CHOOSE_CARD per seat.
+        """
+        events = []
+        for seat in (0, 1):
+            events.append(self._owe(seat, gconstants.OPENING_DRAFT))
+        return events
+
+    def give(self, seat: int, card: Card) -> list[dict]:
+        """`seat` picks `card` for its opponent's hand.
+
+        Args:
+            seat (int): The seat making the pick.
+            card (Card): The chosen card.
+
+        Returns:
+            list[dict]: An EVENT_CARD_DRAWN for the receiving seat.
+        """
+        target = opponent(seat)
+        self.players[target].hand.append(card)
+        self.pending[seat] -= 1
+        if self.draft is not None:
+            self.draft[seat].advance()
+        return [{"type": gconstants.EVENT_CARD_DRAWN, "seat": target, "card": card}]
+
+    def give_index(self, seat: int, index: int) -> list[dict]:
+        """`seat` gives card `index` of its current seeded candidate set.
+
+        Raises:
+            IllegalAction: The draft is not seeded or `index` is out of range.
+        """
+        if self.draft is None:
+            raise IllegalAction("draft is not seeded")
+        cards = self.draft[seat].peek()
+        if not 0 <= index < len(cards):
+            raise IllegalAction(f"no candidate at index {index}")
+        return self.give(seat, cards[index])
+
+    def play(self, seat: int, index: int) -> list[dict]:
+        """Play the card at `index` of `seat`'s hand.
+
+        Args:
+            seat (int): The acting seat.
+            index (int): Hand index of the card.
+
+        Returns:
+            list[dict]: Events in the order they happened.
+
+        Raises:
+            IllegalAction: Game over, not this seat's turn, bad index or the
+                card's cost cannot be paid.
+        """
+        if self.winner is not None:
+            raise IllegalAction("game is over")
+        if seat != self.turn:
+            raise IllegalAction(f"not seat {seat}'s turn")
+        hand = self.players[seat].hand
+        if index < 0 or index >= len(hand):
+            raise IllegalAction(f"no card at index {index}")
+        card = hand[index]
+        if not self.can_play(seat, card):
+            raise IllegalAction("card cost cannot be paid")
+        # 相同的牌可互换：总是移除最早的一张，重放时手牌顺序才能一致
+        hand.remove(card)
+        return self._resolve(seat, card)
+
+    def apply_remote_play(self, seat: int, card: Card) -> list[dict]:
+        """Apply a card played elsewhere: on the peer's machine or in a journal.
+
+        The card was already validated there. It is removed from the mirrored
+        hand when present (the opponent's hand holds the cards we gave it),
+        otherwise the hand's first entry is dropped.
+
+        Args:
+            seat (int): The seat that played.
+            card (Card): The card as received over the network.
+
+        Returns:
+            list[dict]: Events in the order they happened.
+        """
+        hand = self.players[seat].hand
+        if card in hand:
+            hand.remove(card)
+        elif hand:
+            hand.pop(0)
+        return self._resolve(seat, card)
+
+    def end_turn(self, seat: int) -> list[dict]:
+        """End `seat`'s turn: it owes one pick, regains cost, turn passes.
+
+        Args:
+            seat (int): The seat ending its turn.
+
+        Returns:
+            list[dict]: EVENT_TURN_END, EVENT_CHOOSE_CARD, EVENT_COST_CHANGED;
+                like every action, the event naming it comes first.
+        """
+        self.turn = opponent(seat)
+        return [
+            {"type": gconstants.EVENT_TURN_END, "seat": seat},
+            self._owe(seat, 1),
+            self._regen(seat, gconstants.TURN_COST_REGEN),
+        ]
+
+    # ---------------- Snapshots --------------------
+    # -----------------------------------------------
+
+    def snapshot(self) -> tuple:
+        """Return a copy of the match state that restore() can bring back."""
+        counters = None if self.draft is None else tuple(s.counter for s in self.draft)
+        return (
+            tuple((p.health, p.cost, p.hand.copy()) for p in self.players),
+            self.turn, self.winner, tuple(self.pending), counters,
+        )
+
+    def restore(self, snapshot: tuple) -> None:
+        """Reset the match state to a snapshot() (the snapshot stays reusable)."""
+        players, self.turn, self.winner, pending, counters = snapshot
+        for player, (health, cost, hand) in zip(self.players, players):
+            player.health = health
+            player.cost = cost
+            player.hand = hand.copy()
+        self.pending = list(pending)
+        if self.draft is not None and counters is not None:
+            for stream, counter in zip(self.draft, counters):
+                stream.counter = counter
+
+    # ---------------- Internals --------------------
+    # -----------------------------------------------
+
+    def _owe(self, seat: int, count: int) -> dict:
+        self.pending[seat] += count
+        return {"type": gconstants.EVENT_CHOOSE_CARD, "seat": seat, "count": count}
+
+    def _regen(self, seat: int, amount: int) -> dict:
+        player = self.players[seat]
+        player.costRegen(amount)
+        return {"type": gconstants.EVENT_COST_CHANGED, "seat": seat,
+                "amount": amount, "cost": player.cost}
+
+    def _resolve(self, seat: int, card: Card) -> list[dict]:
+        """Apply the negative, then the positive item of a played card."""
+        me = self.players[seat]
+        other = opponent(seat)
+        events = [{"type": gconstants.EVENT_CARD_PLAYED, "seat": seat, "card": card}]
+        card_id = card.card_id
+        _, pay, reward = _COMPILED[card_id] if card_id is not None else effects_of(card)
+        pay(self, seat, me, events)
+        reward(self, seat, me, events)
+
+        if self.players[other].health <= 0:      # Player.isDefeated
+            self.winner = seat
+        elif me.health <= 0:
+            self.winner = other
+        if self.winner is not None:
+            events.append({"type": gconstants.EVENT_GAME_END, "winner": self.winner})
+        return events
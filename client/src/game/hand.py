@@ -0,0 +1,204 @@
+from array import array
+from collections import deque
+from typing import Iterable, Iterator
+
+from src.game.card import CARD_CATALOG, CARD_COUNT, Card
+
+
+class CountHand:
+    """A hand of catalog cards stored as per-card-id counts.
+
+    Behaves like the `list[Card]` it replaces for everything the game does
+    with a hand (append, pop, remove, `in`, len, iteration and indexing in
+    the order the cards arrived), but membership, counting, adding and
+    removing a given card are O(1), copying is cheap and `snapshot()` is a
+    hashable key for caches.
+
+    Internally `_counts` is an `array('B')` with one byte per card id;
+    `_items` maps an increasing sequence number to each card in insertion
+    order, and `_seqs[card_id]` holds the sequence numbers of its copies.
+    Only catalog cards (with a card_id) can be held.
+
+    Example:
+        hand = CountHand([card_by_id(3), card_by_id(7)])
+        if card_by_id(3) in hand:
+            hand.remove(card_by_id(3))
+        key = hand.snapshot()
+    """
+
+    __slots__ = ("_counts", "_items", "_seqs", "_next", "_view")
+
+    def __init__(self, cards: Iterable[Card] = ()):
+        self._counts = array("B", bytes(CARD_COUNT))
+        self._items: dict[int, Card] = {}
+        self._seqs: dict[int, deque] = {}
+        self._next = 0
+        self._view: list[Card] | None = None
+        for card in cards:
+            self.append(card)
+
+    # ---------------- Queries ----------------------
+    # -----------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Card]:
+        return iter(self._items.values())
+
+    def __contains__(self, card: Card) -> bool:
+        card_id = getattr(card, "card_id", None)
+        return card_id is not None and self._counts[card_id] > 0
+
+    def __getitem__(self, index):
+        return self.ordered()[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CountHand):
+            return self.ordered() == other.ordered()
+        if isinstance(other, list):
+            return self.ordered() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"CountHand({self.ordered()!r})"
+
+    def __reduce__(self):
+        return (CountHand, (self.ordered(),))
+
+    def count(self, card: Card) -> int:
+        """Return how many copies of `card` the hand holds."""
+        card_id = getattr(card, "card_id", None)
+        return self._counts[card_id] if card_id is not None else 0
+
+    def ordered(self) -> list[Card]:
+        """Return the cards in insertion order (cached until the next change).
+
+        Returns:
+            list[Card]: Shared list, do not modify.
+        """
+        if self._view is None:
+            self._view = list(self._items.values())
+        return self._view
+
+    def counts(self) -> array:
+        """Return a copy of the per-card-id counts."""
+        return array("B", self._counts)
+
+    def snapshot(self) -> bytes:
+        """Return the counts as bytes: hashable, order-independent.
+
+        Two hands with the same cards in any order give equal snapshots.
+        """
+        return self._counts.tobytes()
+
+    # ---------------- Mutators ---------------------
+    # -----------------------------------------------
+
+    def append(self, card: Card) -> None:
+        """Add `card` at the end of the insertion order.
+
+        Raises:
+            ValueError: `card` is not a catalog card.
+            OverflowError: more than 255 copies of one card.
+        """
+        card_id = card.card_id
+        if card_id is None:
+            raise ValueError(f"only catalog cards can be held: {card}")
+        self._counts[card_id] += 1
+        seq = self._next
+        self._next = seq + 1
+        self._items[seq] = card
+        seqs = self._seqs.get(card_id)
+        if seqs is None:
+            seqs = self._seqs[card_id] = deque()
+        seqs.append(seq)
+        self._view = None
+
+    def extend(self, cards: Iterable[Card]) -> None:
+        for card in cards:
+            self.append(card)
+
+    def remove(self, card: Card) -> None:
+        """Remove the oldest copy of `card`.
+
+        Raises:
+            ValueError: `card` is not in the hand.
+        """
+        if card not in self:
+            raise ValueError(f"{card} is not in hand")
+        card_id = card.card_id
+        self._counts[card_id] -= 1
+        del self._items[self._seqs[card_id].popleft()]
+        self._view = None
+
+    def pop(self, index: int = -1) -> Card:
+        """Remove and return the card at `index` of the insertion order.
+
+        `pop(0)` and `pop()` are O(1); other indexes build the order view.
+
+        Raises:
+            IndexError: the hand is empty or `index` is out of range.
+        """
+        if not self._items:
+            raise IndexError("pop from empty hand")
+        if index == 0:
+            seq = next(iter(self._items))
+        elif index == -1:
+            seq = next(reversed(self._items))
+        else:
+            card = self.ordered()[index]
+            seqs = self._seqs[card.card_id]
+            seq = seqs[0] if len(seqs) == 1 else self._find_seq(card, index)
+        card = self._items.pop(seq)
+        card_id = card.card_id
+        self._counts[card_id] -= 1
+        seqs = self._seqs[card_id]
+        if seqs[0] == seq:
+            seqs.popleft()
+        elif seqs[-1] == seq:
+            seqs.pop()
+        else:
+            seqs.remove(seq)
+        self._view = None
+        return card
+
+    def clear(self) -> None:
+        self._counts = array("B", bytes(CARD_COUNT))
+        self._items.clear()
+        self._seqs.clear()
+        self._view = None
+
+    def copy(self) -> "CountHand":
+        """Return an independent hand with the same cards and order."""
+        other = CountHand.__new__(CountHand)
+        other._counts = array("B", self._counts)
+        other._items = dict(self._items)
+        other._seqs = {card_id: deque(seqs) for card_id, seqs in self._seqs.items() if seqs}
+        other._next = self._next
+        other._view = self._view
+        return other
+
+    __copy__ = copy
+
+    # ---------------- Internals --------------------
+    # -----------------------------------------------
+
+    def _find_seq(self, card: Card, index: int) -> int:
+        """Sequence number of the copy of `card` at `index` of the order."""
+        if index < 0:
+            index += len(self._items)
+        # 同一张牌的第 k 个副本就是 _seqs 中的第 k 个序号
+        nth = sum(1 for c in self.ordered()[:index] if c is card)
+        return self._seqs[card.card_id][nth]
+
+
+def hand_from_snapshot(snapshot: bytes) -> CountHand:
+    """Rebuild a hand from `CountHand.snapshot()`, cards ordered by id."""
+    hand = CountHand()
+    for card_id, n in enumerate(snapshot):
+        for _ in range(n):
+            hand.append(CARD_CATALOG[card_id])
+    return hand
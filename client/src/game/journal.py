@@ -0,0 +1,369 @@
+"""Append-only binary match journal.
+
+Every event GameState applies is appended as one fixed-size record, so a
+finished (or crashed) match can be read back sequentially or straight
+from an mmap by index.
+
+File layout (little endian):
+
+    header  16 bytes  "<4sHHQ"  magic b"FCJ1", version, record size,
+                                match start (ms since the epoch)
+    record  16 bytes  "<9B3xI"  kind, seat, arg0, arg1, arg2,
+                                hp[0], hp[1], cost[0], cost[1],
+                                3 pad bytes, ms since match start
+
+Seats are GameEngine seats (0 = local, 1 = remote). hp / cost are the
+values after the event. The args depend on the kind:
+
+    KIND_CARD_PLAYED   card_id, -, -          seat played it
+    KIND_CARD_DRAWN    card_id, -, -          seat received it
+    KIND_TURN_END      -, -, -                seat ended its turn
+    KIND_CANDIDATES    card_id x 3            seat was offered these
+    KIND_DAMAGE        amount, -, -           seat lost hp
+    KIND_HEAL          amount, -, -           seat gained hp
+    KIND_COST_CHANGED  amount, sign, -        sign 1 = spent
+    KIND_DISCARDED     card_id, -, -          seat lost the card
+    KIND_CHOOSE_CARD   count, -, -            seat owes count picks
+    KIND_GAME_END      -, -, -                seat won
+
+Missing card ids are NO_CARD; values are clamped to a byte. A torn last
+record (crash mid-write) is ignored by the reader.
+
+Writes never touch the disk on the game thread: records are packed and
+queued, and one JournalWriter thread per file writes whatever has queued
+up and fsyncs it as a single group commit.
+
+The game client records matches only when FAIRCARD_JOURNAL_DIR names a
+directory (see journal_dir_from_env()); by default nothing is written.
+
+Example:
+    journal = MatchJournal.create("journals")
+    journal.record_events(events, engine.players)
+    journal.close()
+
+    for record in JournalReader(path):
+        print(record.kind, record.seat, record.hp)
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+import weakref
+from collections.abc import Iterable, Iterator
+from itertools import count
+
+import src.game.constants as gconstants
+from src.game.card import Card
+from src.game.player import Player
+from src.log import get_logger
+
+log = get_logger("game.journal")
+
+JOURNAL_MAGIC = b"FCJ1"
+JOURNAL_VERSION = 1
+JOURNAL_SUFFIX = ".fcj"
+HEADER = struct.Struct("<4sHHQ")
+RECORD = struct.Struct("<9B3xI")
+NO_CARD = 0xFF
+DEFAULT_COMMIT_INTERVAL = 0.05      # seconds between group commits
+JOURNAL_DIR_ENV = "FAIRCARD_JOURNAL_DIR"
+
+
+def journal_dir_from_env() -> str | None:
+    """Return the journal directory the user opted into, or None (no journal)."""
+    path = os.environ.get(JOURNAL_DIR_ENV, "").strip()
+    return os.path.expanduser(path) if path else None
+
+KIND_CARD_PLAYED = 1
+KIND_CARD_DRAWN = 2
+KIND_TURN_END = 3
+KIND_CANDIDATES = 4
+KIND_DAMAGE = 5
+KIND_HEAL = 6
+KIND_COST_CHANGED = 7
+KIND_DISCARDED = 8
+KIND_CHOOSE_CARD = 9
+KIND_GAME_END = 10
+
+# 引擎事件类型 -> 记录类型
+EVENT_KINDS = {
+    gconstants.EVENT_CARD_PLAYED: KIND_CARD_PLAYED,
+    gconstants.EVENT_CARD_DRAWN: KIND_CARD_DRAWN,
+    gconstants.EVENT_TURN_END: KIND_TURN_END,
+    gconstants.EVENT_PLAYER_DAMAGE: KIND_DAMAGE,
+    gconstants.EVENT_PLAYER_HEAL: KIND_HEAL,
+    gconstants.EVENT_COST_CHANGED: KIND_COST_CHANGED,
+    gconstants.EVENT_CARD_DISCARDED: KIND_DISCARDED,
+    gconstants.EVENT_CHOOSE_CARD: KIND_CHOOSE_CARD,
+    gconstants.EVENT_GAME_END: KIND_GAME_END,
+}
+KIND_NAMES = {
+    KIND_CARD_PLAYED: "card_played",
+    KIND_CARD_DRAWN: "card_drawn",
+    KIND_TURN_END: "turn_end",
+    KIND_CANDIDATES: "candidates",
+    KIND_DAMAGE: "damage",
+    KIND_HEAL: "heal",
+    KIND_COST_CHANGED: "cost_changed",
+    KIND_DISCARDED: "discarded",
+    KIND_CHOOSE_CARD: "choose_card",
+    KIND_GAME_END: "game_end",
+}
+
+
+def _byte(value: int) -> int:
+    return 0 if value < 0 else 255 if value > 255 else value
+
+
+def _card_id(card: Card | None) -> int:
+    card_id = getattr(card, "card_id", None)
+    return NO_CARD if card_id is None else card_id
+
+
+# ---- Writing ----
+
+class JournalWriter:
+    """Append bytes to a file from a background thread with group commit.
+
+    `append()` only queues; the writer thread wakes at most every
+    `commit_interval` seconds, writes everything queued in one call and
+    fsyncs once for the whole batch.
+
+    Args:
+        path (str): File to append to (created if missing).
+        commit_interval (float): Seconds to gather records per commit.
+    """
+
+    def __init__(self, path: str, commit_interval: float = DEFAULT_COMMIT_INTERVAL):
+        self.path = path
+        self.commit_interval = commit_interval
+        self.commits = 0
+        self._file = open(path, "ab", buffering=0)
+        self._pending: list[bytes] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True, name="journal-writer")
+        self._thread.start()
+
+    def append(self, data: bytes) -> None:
+        """Queue `data` for the next commit; never blocks on disk."""
+        with self._cond:
+            if self._closed:
+                raise ValueError("journal is closed")
+            was_empty = not self._pending
+            self._pending.append(data)
+            if was_empty:
+                self._cond.notify()
+
+    def close(self) -> None:
+        """Commit what is queued and stop the writer thread."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self._file.close()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                closing = self._closed
+            if not closing:
+                # 攒一小段时间，一次 write + fsync 提交整批记录
+                time.sleep(self.commit_interval)
+            with self._cond:
+                batch, self._pending = self._pending, []
+                closing = self._closed
+            if batch:
+                try:
+                    self._file.write(b"".join(batch))
+                    os.fsync(self._file.fileno())
+                    self.commits += 1
+                except OSError as e:
+                    log.error("写入对局记录失败: %s", e)
+            if closing:
+                return
+
+
+class MatchJournal:
+    """Journal of one match: turns engine events into records.
+
+    Args:
+        path (str): Journal file; a header is written if it is new.
+        commit_interval (float): See JournalWriter.
+    """
+
+    def __init__(self, path: str, commit_interval: float = DEFAULT_COMMIT_INTERVAL):
+        self.path = path
+        self._start = time.monotonic()
+        self._writer = JournalWriter(path, commit_interval)
+        if os.path.getsize(path) == 0:
+            self._writer.append(HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, RECORD.size,
+                                            int(time.time() * 1000)))
+        self._hp = [gconstants.PLAYER_MAX_HEALTH] * 2
+        self._cost = [gconstants.PLAYER_INIT_COST] * 2
+
+    @classmethod
+    def create(cls, directory: str, commit_interval: float = DEFAULT_COMMIT_INTERVAL) -> "MatchJournal":
+        """Start a new journal file in `directory` named after the current time.
+
+        The name is match-<time>-<pid>-<n>; the file is created with
+        O_EXCL, taking the next n when a match started in the same second
+        already has one.
+        """
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        for n in count():
+            path = os.path.join(directory, f"match-{stamp}-{os.getpid()}-{n}{JOURNAL_SUFFIX}")
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except FileExistsError:
+                continue
+            return cls(path, commit_interval)
+
+    def record_events(self, events: Iterable[dict], players: list[Player]) -> None:
+        """Append one record per engine event.
+
+        hp / cost follow the values carried by the events, so every record
+        shows the state right after its own event; at the end they are
+        resynchronised with `players`.
+        """
+        out = []
+        hp, cost = self._hp, self._cost
+        for event in events:
+            kind = EVENT_KINDS.get(event["type"])
+            if kind is None:
+                continue
+            seat = event.get("seat", event.get("winner", 0))
+            a0 = a1 = a2 = 0
+            if kind in (KIND_CARD_PLAYED, KIND_CARD_DRAWN, KIND_DISCARDED):
+                a0 = _card_id(event.get("card"))
+            elif kind in (KIND_DAMAGE, KIND_HEAL):
+                a0 = event["amount"]
+                hp[seat] = event["health"]
+            elif kind == KIND_COST_CHANGED:
+                a0, a1 = abs(event["amount"]), int(event["amount"] < 0)
+                cost[seat] = event["cost"]
+            elif kind == KIND_CHOOSE_CARD:
+                a0 = event["count"]
+            out.append(self._pack(kind, seat, a0, a1, a2))
+        self._sync(players)
+        if out:
+            self._writer.append(b"".join(out))
+
+    def record_candidates(self, seat: int, cards: list[Card], players: list[Player]) -> None:
+        """Append the candidate set `seat` was offered by chooseCard."""
+        ids = [_card_id(card) for card in cards[:3]]
+        ids += [NO_CARD] * (3 - len(ids))
+        self._sync(players)
+        self._writer.append(self._pack(KIND_CANDIDATES, seat, *ids))
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def _sync(self, players: list[Player]) -> None:
+        for seat, player in enumerate(players):
+            self._hp[seat] = player.health
+            self._cost[seat] = player.cost
+
+    def _pack(self, kind: int, seat: int, a0: int, a1: int, a2: int) -> bytes:
+        hp, cost = self._hp, self._cost
+        return RECORD.pack(kind, seat, _byte(a0), _byte(a1), _byte(a2),
+                           _byte(hp[0]), _byte(hp[1]), _byte(cost[0]), _byte(cost[1]),
+                           int((time.monotonic() - self._start) * 1000))
+
+
+# ---- Reading ----
+
+class JournalRecord:
+    """One decoded record; see the module docstring for the args."""
+
+    __slots__ = ("kind", "seat", "args", "hp", "cost", "ms")
+
+    def __init__(self, fields: tuple):
+        kind, seat, a0, a1, a2, hp0, hp1, cost0, cost1, ms = fields
+        self.kind = kind
+        self.seat = seat
+        self.args = (a0, a1, a2)
+        self.hp = (hp0, hp1)
+        self.cost = (cost0, cost1)
+        self.ms = ms
+
+    @property
+    def name(self) -> str:
+        return KIND_NAMES.get(self.kind, f"kind{self.kind}")
+
+    def __repr__(self) -> str:
+        return (f"JournalRecord({self.name}, seat={self.seat}, args={self.args}, "
+                f"hp={self.hp}, cost={self.cost}, ms={self.ms})")
+
+
+class JournalReader:
+    """Read a journal through mmap: sequentially or by record index.
+
+    Args:
+        path (str): Journal file.
+
+    Attributes:
+        started_ms (int): Match start, ms since the epoch.
+
+    Raises:
+        ValueError: Not a journal, or an unsupported version.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError(f"{path}: too short for a journal")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, self.started_ms = HEADER.unpack_from(self._map, 0)
+        if magic != JOURNAL_MAGIC:
+            raise ValueError(f"{path}: not a match journal")
+        if version != JOURNAL_VERSION or record_size != RECORD.size:
+            raise ValueError(f"{path}: unsupported journal version {version}")
+        # 末尾不完整的记录（写入时崩溃）忽略
+        self._count = (size - HEADER.size) // RECORD.size
+        self._iterators = weakref.WeakSet()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> JournalRecord:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("journal record out of range")
+        return JournalRecord(RECORD.unpack_from(self._map, HEADER.size + index * RECORD.size))
+
+    def __iter__(self) -> Iterator[JournalRecord]:
+        records = self._records()
+        self._iterators.add(records)
+        return records
+
+    def _records(self) -> Iterator[JournalRecord]:
+        # 直接在 mmap 上解包，不复制；视图释放后 mmap 才能关闭
+        view = memoryview(self._map)[HEADER.size:HEADER.size + self._count * RECORD.size]
+        try:
+            for fields in RECORD.iter_unpack(view):
+                yield JournalRecord(fields)
+        finally:
+            view.release()
+
+    def close(self) -> None:
+        # 先结束未读完的迭代器，释放它们持有的视图
+        for records in list(self._iterators):
+            records.close()
+        self._map.close()
+
+    def __enter__(self) -> "JournalReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,524 @@
+"""Monte Carlo tree search over GameEngine.
+
+MCTS decides both kinds of moves a seat makes: which card to play (or to
+end the turn) and which candidate to give the opponent. Each iteration
+restores the root position into a private engine, walks down the tree
+with UCB1, expands one new position, finishes with a short random
+rollout and backs the result up.
+
+Positions are identified by an incremental Zobrist hash of hp, cost,
+per-card hand counts, owed picks and the seat to act, updated from the
+events each action returns. Tree nodes live in a bounded LRU
+transposition table keyed by that hash, so a position reached through
+different move orders, or again on a later move, keeps its statistics.
+Candidate sets below the root are sampled; a pick node's key also
+includes its candidate set.
+
+Example:
+    search = MCTS(time_budget=0.08)
+    card = search.choose_play(engine, seat)           # None = end the turn
+    index = search.choose_pick(engine, seat, cards)   # index into cards
+
+    with MCTS(workers=4) as search:                   # root-parallel
+        card = search.choose_play(engine, seat)
+"""
+
+import gc
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from math import log, sqrt
+from random import Random
+
+import src.game.constants as gconstants
+from src.game.card import CARD_CATALOG, CARD_COUNT, Card
+from src.game.engine import GameEngine, payable_ids
+from src.game.tablebase import Tablebase, get_tablebase
+
+END_TURN = -1                   # action: end the turn instead of playing
+DEFAULT_TIME_BUDGET = 0.08      # seconds per move
+DEFAULT_TABLE_SIZE = 200_000    # transposition table entries
+DEFAULT_EXPLORATION = 1.4
+DEFAULT_ROLLOUT_TURNS = 8
+ROLLOUT_STOP = 0.2              # chance a rollout turn ends early
+PENDING_SLOTS = 32
+HAND_SLOTS = 256                # CountHand holds at most 255 copies
+
+
+# ---- Zobrist hashing ----
+
+class ZobristKeys:
+    """Random 64-bit keys for every (feature, value) pair of a position."""
+
+    def __init__(self, seed: int = 0x5EED):
+        bits = Random(seed).getrandbits
+        self.hp = [[bits(64) for _ in range(gconstants.PLAYER_MAX_HEALTH + 1)] for _ in (0, 1)]
+        self.cost = [[bits(64) for _ in range(gconstants.PLAYER_COST_LIMIT + 1)] for _ in (0, 1)]
+        self.hand = [[[bits(64) for _ in range(HAND_SLOTS)] for _ in range(CARD_COUNT)]
+                     for _ in (0, 1)]
+        self.pending = [[bits(64) for _ in range(PENDING_SLOTS)] for _ in (0, 1)]
+        self.turn = bits(64)
+        self.over = bits(64)
+        self.candidate = [bits(64) for _ in range(CARD_COUNT)]
+
+
+ZOBRIST = ZobristKeys()
+
+
+def _slot(pending: int) -> int:
+    return 0 if pending < 0 else pending if pending < PENDING_SLOTS else PENDING_SLOTS - 1
+
+
+class StateHash:
+    """Zobrist hash of an engine's position, kept current from its events.
+
+    Args:
+        engine (GameEngine): The position to hash; see reset().
+
+    Attributes:
+        value (int): The current hash.
+    """
+
+    __slots__ = ("value", "_hp", "_cost", "_counts", "_pending")
+
+    def __init__(self, engine: GameEngine):
+        self.reset(engine)
+
+    def reset(self, engine: GameEngine) -> None:
+        """Hash `engine` from scratch."""
+        z = ZOBRIST
+        self._hp = [p.health for p in engine.players]
+        self._cost = [p.cost for p in engine.players]
+        self._counts = [p.hand.counts() for p in engine.players]
+        self._pending = list(engine.pending)
+        value = z.turn if engine.turn else 0
+        if engine.winner is not None:
+            value ^= z.over
+        for seat in (0, 1):
+            value ^= z.hp[seat][self._hp[seat]] ^ z.cost[seat][self._cost[seat]]
+            value ^= z.pending[seat][_slot(self._pending[seat])]
+            hand = z.hand[seat]
+            for card_id, n in enumerate(self._counts[seat]):
+                value ^= hand[card_id][n]
+        self.value = value
+
+    def copy(self) -> "StateHash":
+        other = StateHash.__new__(StateHash)
+        other.value = self.value
+        other._hp = self._hp[:]
+        other._cost = self._cost[:]
+        other._counts = [counts[:] for counts in self._counts]
+        other._pending = self._pending[:]
+        return other
+
+    def apply(self, events: list[dict]) -> int:
+        """Fold the events of one action into the hash and return it."""
+        z = ZOBRIST
+        value = self.value
+        for event in events:
+            kind = event["type"]
+            if kind == gconstants.EVENT_PLAYER_DAMAGE or kind == gconstants.EVENT_PLAYER_HEAL:
+                seat, health = event["seat"], event["health"]
+                value ^= z.hp[seat][self._hp[seat]] ^ z.hp[seat][health]
+                self._hp[seat] = health
+            elif kind == gconstants.EVENT_COST_CHANGED:
+                seat, cost = event["seat"], event["cost"]
+                value ^= z.cost[seat][self._cost[seat]] ^ z.cost[seat][cost]
+                self._cost[seat] = cost
+            elif kind == gconstants.EVENT_CARD_PLAYED or kind == gconstants.EVENT_CARD_DISCARDED:
+                value = self._move_card(value, event["seat"], event["card"].card_id, -1)
+            elif kind == gconstants.EVENT_CARD_DRAWN:
+                seat = event["seat"]
+                value = self._move_card(value, seat, event["card"].card_id, 1)
+                value = self._owe(value, 1 - seat, -1)
+            elif kind == gconstants.EVENT_CHOOSE_CARD:
+                value = self._owe(value, event["seat"], event["count"])
+            elif kind == gconstants.EVENT_TURN_END:
+                value ^= z.turn
+            elif kind == gconstants.EVENT_GAME_END:
+                value ^= z.over
+        self.value = value
+        return value
+
+    def _move_card(self, value: int, seat: int, card_id: int, delta: int) -> int:
+        counts = self._counts[seat]
+        keys = ZOBRIST.hand[seat][card_id]
+        n = counts[card_id]
+        counts[card_id] = n + delta
+        return value ^ keys[n] ^ keys[n + delta]
+
+    def _owe(self, value: int, seat: int, delta: int) -> int:
+        keys = ZOBRIST.pending[seat]
+        n = self._pending[seat]
+        self._pending[seat] = n + delta
+        return value ^ keys[_slot(n)] ^ keys[_slot(n + delta)]
+
+
+def candidates_key(cards: list[Card]) -> int:
+    """Order-independent key of a candidate set, to xor into a position."""
+    key = 0
+    for card_id in {card.card_id for card in cards}:
+        key ^= ZOBRIST.candidate[card_id]
+    return key
+
+
+# ---- Tree ----
+
+# A node is an immutable tuple (actor, actions, total, stats): the seat
+# deciding, the action keys, its visit count and (visits0, wins0, visits1,
+# wins1, ...) with wins counted for the actor. Updating stores a new tuple.
+# Tuples of numbers drop out of the cyclic GC, so a table of 10^5 nodes
+# does not make full collections (and the moves they land in) slow.
+
+def new_node(actor: int, actions: tuple) -> tuple:
+    return actor, actions, 0, (0.0,) * (2 * len(actions))
+
+
+def select(node: tuple, exploration: float) -> int:
+    """Return the index of the action to try next (UCB1)."""
+    _, actions, total, stats = node
+    log_total = log(total) if total else 0.0
+    best, best_score = 0, -1.0
+    for i in range(len(actions)):
+        n = stats[2 * i]
+        if n == 0:
+            return i
+        score = stats[2 * i + 1] / n + exploration * sqrt(log_total / n)
+        if score > best_score:
+            best, best_score = i, score
+    return best
+
+
+def updated(node: tuple, i: int, result: float) -> tuple:
+    """Return `node` with `result` (seat 0 win chance) recorded for action `i`."""
+    actor, actions, total, stats = node
+    stats = list(stats)
+    stats[2 * i] += 1
+    stats[2 * i + 1] += result if actor == 0 else 1.0 - result
+    return actor, actions, total + 1, tuple(stats)
+
+
+def node_stats(node: tuple) -> dict[int, tuple[int, float]]:
+    """Return {action: (visits, wins)} of a node."""
+    stats = node[3]
+    return {action: (int(stats[2 * i]), stats[2 * i + 1])
+            for i, action in enumerate(node[1])}
+
+
+class TranspositionTable:
+    """Bounded map of position hash -> node that evicts the least recently used.
+
+    Args:
+        capacity (int): Maximum number of nodes kept.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_TABLE_SIZE):
+        self.capacity = capacity
+        self._nodes: OrderedDict[int, tuple] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def get(self, key: int) -> tuple | None:
+        node = self._nodes.get(key)
+        if node is None:
+            self.misses += 1
+            return None
+        self._nodes.move_to_end(key)
+        self.hits += 1
+        return node
+
+    def peek(self, key: int) -> tuple | None:
+        """Return the node for `key` without touching the LRU order or counters."""
+        return self._nodes.get(key)
+
+    def put(self, key: int, node: tuple) -> None:
+        """Insert a node, or replace one in place (keeping its LRU position)."""
+        nodes = self._nodes
+        nodes[key] = node
+        if len(nodes) > self.capacity:
+            nodes.popitem(last=False)
+
+    def clear(self) -> None:
+        self._nodes.clear()
+
+
+# ---- Search ----
+
+class MCTS:
+    """Monte Carlo tree search for one seat's moves.
+
+    The search stops at `iterations` or after `time_budget` seconds,
+    whichever comes first (either may be None, not both). With
+    `workers` > 1 the root is searched in that many processes at once,
+    each with its own table, and the root statistics are summed.
+
+    Args:
+        iterations (int | None): Iteration budget per move.
+        time_budget (float | None): Seconds per move.
+        workers (int): Processes searching each move.
+        table_size (int): Transposition table capacity (per process).
+        exploration (float): UCB1 exploration constant.
+        rollout_turns (int): Turns a rollout plays before it is scored
+            by the hp difference.
+        seed (int | None): Seed for the search's own randomness.
+        tablebase (Tablebase | None): Endgame table; when it shows a forced
+            win the move is played without searching. Defaults to
+            get_tablebase().
+
+    Attributes:
+        table (TranspositionTable): Nodes kept between moves.
+        last_iterations (int): Iterations of the last search.
+    """
+
+    def __init__(
+        self,
+        iterations: int | None = None,
+        time_budget: float | None = DEFAULT_TIME_BUDGET,
+        workers: int = 1,
+        table_size: int = DEFAULT_TABLE_SIZE,
+        exploration: float = DEFAULT_EXPLORATION,
+        rollout_turns: int = DEFAULT_ROLLOUT_TURNS,
+        seed: int | None = None,
+        tablebase: Tablebase | None = None,
+    ):
+        if iterations is None and time_budget is None:
+            raise ValueError("MCTS needs an iteration or a time budget")
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.workers = workers
+        self.exploration = exploration
+        self.rollout_turns = rollout_turns
+        self.table = TranspositionTable(table_size)
+        self.rng = Random(seed)
+        self.last_iterations = 0
+        self.tablebase = tablebase if tablebase is not None else get_tablebase()
+        self._sim = GameEngine(rng=self.rng)
+        self._pool: ProcessPoolExecutor | None = None
+
+    # ---------------- Moves ------------------------
+    # -----------------------------------------------
+
+    def choose_play(self, engine: GameEngine, seat: int) -> Card | None:
+        """Return the card `seat` should play next, or None to end the turn.
+
+        Args:
+            engine (GameEngine): The position; it is not modified.
+            seat (int): The seat to act (engine.turn).
+        """
+        actions = _turn_actions(engine, seat)
+        if len(actions) == 1:
+            return None
+        if self.tablebase is not None:
+            result = self.tablebase.lookup_engine(engine, seat)
+            if result is not None and result.lethal and result.card is not None:
+                self.last_iterations = 0
+                return result.card
+        action = self._best(engine, seat, None)
+        return None if action == END_TURN else CARD_CATALOG[action]
+
+    def choose_pick(self, engine: GameEngine, seat: int, cards: list[Card]) -> int:
+        """Return the index in `cards` that `seat` should give its opponent."""
+        if len({card.card_id for card in cards}) == 1:
+            return 0
+        action = self._best(engine, seat, [card.card_id for card in cards])
+        return next(i for i, card in enumerate(cards) if card.card_id == action)
+
+    def search(self, engine: GameEngine, seat: int,
+               candidate_ids: list[int] | None = None) -> dict[int, tuple[int, float]]:
+        """Search the position and return {action: (visits, wins)} at the root.
+
+        Args:
+            engine (GameEngine): The position; it is not modified.
+            seat (int): The seat to decide for.
+            candidate_ids (list[int] | None): For a pick, the card ids
+                offered; None for a play decision.
+        """
+        snapshot = engine.snapshot()
+        if self.workers <= 1:
+            with gc_paused():
+                return self._search(snapshot, seat, candidate_ids)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        params = (self.iterations, self.time_budget, self.table.capacity,
+                  self.exploration, self.rollout_turns)
+        futures = [self._pool.submit(_worker_search, params, self.rng.getrandbits(32),
+                                     snapshot, seat, candidate_ids)
+                   for _ in range(self.workers)]
+        merged: dict[int, tuple[int, float]] = {}
+        self.last_iterations = 0
+        for future in futures:
+            stats, iterations = future.result()
+            self.last_iterations += iterations
+            for action, (n, w) in stats.items():
+                n0, w0 = merged.get(action, (0, 0.0))
+                merged[action] = (n0 + n, w0 + w)
+        return merged
+
+    def close(self) -> None:
+        """Stop the worker processes, if any."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self) -> "MCTS":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---------------- Internals --------------------
+    # -----------------------------------------------
+
+    def _best(self, engine: GameEngine, seat: int, candidate_ids: list[int] | None) -> int:
+        stats = self.search(engine, seat, candidate_ids)
+        return max(stats, key=lambda action: stats[action][0])
+
+    def _search(self, snapshot: tuple, seat: int,
+                candidate_ids: list[int] | None) -> dict[int, tuple[int, float]]:
+        sim = self._sim
+        sim.restore(snapshot)
+        root_hash = StateHash(sim)
+        root_cards = None if candidate_ids is None else [CARD_CATALOG[i] for i in candidate_ids]
+        root_key = root_hash.value
+        if root_cards is not None:
+            root_key ^= candidates_key(root_cards)
+        actions = _pick_actions(root_cards) if root_cards is not None else _turn_actions(sim, seat)
+        if self.table.get(root_key) is None:
+            self.table.put(root_key, new_node(seat, actions))
+
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        limit = self.iterations
+        done = 0
+        while (limit is None or done < limit) and (deadline is None or time.perf_counter() < deadline):
+            sim.restore(snapshot)
+            self._iterate(sim, root_hash.copy(), root_key, root_cards)
+            done += 1
+        self.last_iterations = done
+        root = self.table.peek(root_key)
+        return node_stats(root if root is not None else new_node(seat, actions))
+
+    def _iterate(self, sim: GameEngine, state: StateHash, root_key: int, root_cards) -> None:
+        table = self.table
+        path = []
+        key, cards = root_key, root_cards
+        node = table.peek(key)
+        if node is None:
+            return
+        while True:
+            i = select(node, self.exploration)
+            path.append((key, i))
+            _apply(sim, state, node[0], node[1][i], cards)
+            if sim.winner is not None:
+                result = 1.0 if sim.winner == 0 else 0.0
+                break
+            actor, cards = _next_decision(sim)
+            key = state.value
+            if cards is not None:
+                key ^= candidates_key(cards)
+            node = table.get(key)
+            if node is None:
+                actions = _pick_actions(cards) if cards is not None else _turn_actions(sim, actor)
+                table.put(key, new_node(actor, actions))
+                result = self._rollout(sim)
+                break
+        for key, i in path:
+            node = table.peek(key)
+            if node is not None:
+                table.put(key, updated(node, i, result))
+
+    def _rollout(self, sim: GameEngine) -> float:
+        """Play random moves for a few turns; return seat 0's win chance."""
+        random = self.rng.random
+        turns = 0
+        _settle_randomly(sim, random)
+        while sim.winner is None and turns < self.rollout_turns:
+            seat = sim.turn
+            while sim.winner is None:
+                options = sim.playable_indices(seat)
+                if not options or random() < ROLLOUT_STOP:
+                    break
+                sim.play(seat, options[int(random() * len(options))])
+                _settle_randomly(sim, random)
+            if sim.winner is not None:
+                break
+            sim.end_turn(seat)
+            _settle_randomly(sim, random)
+            turns += 1
+        if sim.winner is not None:
+            return 1.0 if sim.winner == 0 else 0.0
+        hp0, hp1 = sim.players[0].health, sim.players[1].health
+        return 0.5 + (hp0 - hp1) / (4 * gconstants.PLAYER_MAX_HEALTH)
+
+
+@contextmanager
+def gc_paused():
+    """Pause the cyclic GC for a time-budgeted search."""
+    # 搜索本身不产生循环引用：期间暂停 GC，回收留到两步之间，不计入思考时间
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _turn_actions(engine: GameEngine, seat: int) -> tuple:
+    """Distinct playable card ids of `seat`, then END_TURN."""
+    player = engine.players[seat]
+    payable = payable_ids(player.health, player.cost, len(player.hand))
+    ids = {card.card_id for card in player.hand if payable >> card.card_id & 1}
+    return (*sorted(ids), END_TURN)
+
+
+def _pick_actions(cards: list[Card]) -> tuple:
+    return tuple(sorted({card.card_id for card in cards}))
+
+
+def _next_decision(sim: GameEngine) -> tuple[int, list[Card] | None]:
+    """Return (actor, candidates): owed picks come first, then the turn."""
+    for seat in (0, 1):
+        if sim.pending[seat] > 0:
+            return seat, sim.candidates()
+    return sim.turn, None
+
+
+def _apply(sim: GameEngine, state: StateHash, seat: int, action: int, cards) -> None:
+    if cards is not None:
+        events = sim.give(seat, CARD_CATALOG[action])
+    elif action == END_TURN:
+        events = sim.end_turn(seat)
+    else:
+        events = sim.play(seat, sim.players[seat].hand.ordered().index(CARD_CATALOG[action]))
+    state.apply(events)
+
+
+def _settle_randomly(sim: GameEngine, random) -> None:
+    for seat in (0, 1):
+        while sim.pending[seat] > 0:
+            sim.give(seat, sim.candidates()[int(random() * gconstants.DRAFT_CANDIDATES)])
+
+
+# ---- Worker processes ----
+
+_worker_mcts: MCTS | None = None
+
+
+def _worker_search(params: tuple, seed: int, snapshot: tuple, seat: int,
+                   candidate_ids: list[int] | None) -> tuple[dict, int]:
+    """Run one root search in a worker; its table lives as long as the worker."""
+    global _worker_mcts
+    iterations, time_budget, table_size, exploration, rollout_turns = params
+    if _worker_mcts is None or _worker_mcts.table.capacity != table_size:
+        _worker_mcts = MCTS(iterations, time_budget, 1, table_size, exploration, rollout_turns)
+    search = _worker_mcts
+    search.iterations, search.time_budget = iterations, time_budget
+    search.exploration, search.rollout_turns = exploration, rollout_turns
+    search.rng.seed(seed)
+    with gc_paused():
+        stats = search._search(snapshot, seat, candidate_ids)
+    return stats, search.last_iterations
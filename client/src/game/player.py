@@ -1,5 +1,6 @@
 import src.game.constants as gconstants
 from src.game.card import Card
+from src.game.hand import CountHand
 
 
 class Player:
@@ -8,7 +9,8 @@ class Player:
     Attributes:
         health (int): current health points (0..PLAYER_MAX_HEALTH).
         cost (int): current available cost/resources to play cards.
-        hand (list[Card]): cards currently held by the player.
+        hand (CountHand): cards currently held by the player, in the order
+            they arrived; list-like, with O(1) add, remove and `in`.
 
     All methods mutate the player's state in place and prefer clear
     return values for success/failure so callers (UI or game engine)
@@ -17,7 +19,7 @@ class Player:
     def __init__(self):
         self.health = gconstants.PLAYER_MAX_HEALTH
         self.cost = gconstants.PLAYER_INIT_COST
-        self.hand = list[Card]()
+        self.hand = CountHand()
 
     def takeDamage(self, damage: int) -> None:
         """Reduce the player's health by `damage`.
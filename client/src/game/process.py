@@ -1,25 +1,123 @@
-from random import choice
-from src.game.card import Card
+import itertools
+from typing import Callable
+from src.game.advisor import Advisor
+from src.game.bot import BotPeer
+from src.game.card import Card, get_card
+from src.game.draft import ROLE_GUEST, ROLE_HOST, new_match_seed
+from src.game.engine import GameEngine, IllegalAction
+from src.game.journal import MatchJournal
+from src.game.mcts import MCTS
 from src.game.player import Player
+from src.game.tablebase import get_tablebase
 from src.network.core import Network
-from src.game.constants import CARD_ITEM_VALUES as gValues, EVENT_CARD_PLAYED
+from src.game.constants import EVENT_CARD_PLAYED
 import src.game.constants as gconstants
+from src.log import get_logger
+
+log = get_logger("game")
+
+LOCAL_SEAT = 0
+REMOTE_SEAT = 1
+
+# UI 快照的版本号，跨 GameState 实例单调递增（UI 只认比已应用版本新的字段）
+_ui_versions = itertools.count(1)
+# 残局提示只取决于这些字段
+HINT_INPUTS = frozenset(("self.hp", "self.cost", "self.hand", "opponent.hp", "is_my_turn"))
+
+# Field types of a serialized card (see GameState._card_to_dict)
+CARD_SCHEMA = {
+    "item_power": int,
+    "pcarditem_type": str,
+    "ncarditem_type": str,
+    "card_effect": str,
+}
+
+
+def compile_schema(schema: dict) -> Callable[[dict], str | None]:
+    """Turn a message schema into a validator, once.
+
+    A schema maps field names to a type, a tuple of alternatives or a nested
+    schema dict; None inside a tuple allows a missing/None field.
+
+    Args:
+        schema (dict): The schema to compile.
+
+    Returns:
+        Callable[[dict], str | None]: Returns an error description, or None
+            if the message matches.
+    """
+    checks = []
+    for field, spec in schema.items():
+        options = spec if isinstance(spec, tuple) else (spec,)
+        optional = None in options
+        types = tuple(o for o in options if isinstance(o, type))
+        nested = [compile_schema(o) for o in options if isinstance(o, dict)]
+        checks.append((field, optional, types, nested))
+
+    def validate(msg: dict) -> str | None:
+        if not isinstance(msg, dict):
+            return f"expected an object, got {type(msg).__name__}"
+        for field, optional, types, nested in checks:
+            value = msg.get(field)
+            if value is None:
+                if optional:
+                    continue
+                return f"missing field '{field}'"
+            if types and isinstance(value, types):
+                continue
+            for check in nested:
+                error = check(value)
+                if error is None:
+                    break
+            else:
+                return f"bad field '{field}': {value!r}"
+        return None
+
+    return validate
 
 
 class GameState:
     def __init__(
-        self, local_player: Player, remote_player: Player, NetworkManager: Network
+        self,
+        local_player: Player,
+        remote_player: Player,
+        NetworkManager: Network,
+        journal_dir: str | None = None,
     ):
         self.local_player = local_player
         self.remote_player = remote_player
+        # 规则全部在无界面的 GameEngine 中，这里只负责 UI / 网络的衔接
+        self.engine = GameEngine(
+            players=[local_player, remote_player], first_seat=REMOTE_SEAT
+        )
         self.NetworkManager = NetworkManager
         self.on_game_start_callback = None
-        self.is_my_turn = False
         self.ui_draw_card_selection_callback = None
         self.ui_update = None
         self.game_over_callback = None
         self.showframe = None
         self.drawTurnstart = None
+        self._message_routes: dict[str, tuple] = {}
+        self._register_default_message_handlers()
+        # 对局记录：第一次记录事件时在 journal_dir 下创建文件
+        self.journal_dir = journal_dir
+        self.journal: MatchJournal | None = None
+        # 选牌建议在 Advisor 自己的线程里计算，第一次请求时创建
+        self.advisor: Advisor | None = None
+        # UI 快照的增量维护：上次的字段值、各字段最后变化的版本、上次的快照
+        self._ui_values: dict[str, object] = {}
+        self._ui_changed_at: dict[str, int] = {}
+        self._ui_snapshot: dict | None = None
+        self._ui_card_dicts: dict[int, dict] = {}
+
+    @property
+    def is_my_turn(self) -> bool:
+        """Whether the local player may act (mirrors the engine's turn)."""
+        return self.engine.turn == LOCAL_SEAT
+
+    @is_my_turn.setter
+    def is_my_turn(self, value: bool) -> None:
+        self.engine.turn = LOCAL_SEAT if value else REMOTE_SEAT
 
     # -------------- Getter Methods -----------------
     # -----------------------------------------------
@@ -92,13 +190,26 @@ class GameState:
             if is_host:
                 self.NetworkManager.start()
                 self.NetworkManager.on_message = self.handle_network_message
-                print("服务器已启动，等待连接...")
+                log.info("服务器已启动，等待连接...")
             else:
                 self.NetworkManager.connect(ip)
                 self.NetworkManager.on_message = self.handle_network_message
-                print("已连接到服务器")
+                log.info("已连接到服务器")
         except Exception as e:
-            print(f"初始化失败: {e}")
+            log.error("初始化失败: %s", e)
+
+    def initBot(self, search: MCTS | None = None) -> None:
+        """Play against the computer: a BotPeer takes the remote seat.
+
+        The local player is the host and moves first, as with initNetwork.
+
+        Args:
+            search (MCTS | None): The bot's search settings; default if None.
+        """
+        self.NetworkManager = BotPeer(search)
+        self.NetworkManager.on_message = self.handle_network_message
+        self.is_my_turn = True
+        log.info("电脑玩家已就位")
 
     def closeNetwork(self):
         """Close the network connection.
@@ -107,6 +218,9 @@ class GameState:
             None
         """
         self.NetworkManager.close()
+        self.closeJournal()
+        if self.advisor is not None:
+            self.advisor.close()
 
     def sendData(self, data: dict):
         """Send data to the remote player.
@@ -119,45 +233,127 @@ class GameState:
         """
         self.NetworkManager.send(data)
 
-    def handle_network_message(self, msg: dict) -> None:
-        """处理来自网络的消息"""
-        print(f"[GameState] 收到网络消息: {msg}")
+    # ------------ Network Message Dispatch ----------
+    # ------------------------------------------------
 
-        msg_type = msg.get("type")  # ✅ 修正: 应该用 "type" 而不是 "event"
+    def register_message_handler(
+        self,
+        msg_type: str,
+        handler: Callable[[dict], bool | None],
+        dirties_ui: bool = True,
+        schema: dict | None = None,
+    ) -> None:
+        """Route messages of one type to a handler.
 
-        if msg_type == gconstants.EVENT_GAME_START:
-            print("[GameState] ✅ 客户端收到游戏开始通知")
-            if self.on_game_start_callback:
-                self.on_game_start_callback()
+        Args:
+            msg_type (str): The "type" value of the message.
+            handler (Callable[[dict], bool | None]): Called with the message.
+                Returning False means nothing changed for this message, even
+                if the type usually dirties the UI.
+            dirties_ui (bool): Whether the UI snapshot is rebuilt after the
+                handler runs.
+            schema (dict | None): Expected fields, see compile_schema();
+                messages that do not match are dropped before the handler.
 
-        elif msg_type == EVENT_CARD_PLAYED:
-            print("[GameState] 收到对手出牌消息")
-            self.parseRemotePlayedCard(self._dict_to_card(msg.get("card")))
+        Returns:
+            None
+        """
+        validator = compile_schema(schema) if schema else None
+        self._message_routes[msg_type] = (handler, dirties_ui, validator)
 
-        elif msg_type == gconstants.EVENT_TURN_END:
-            print("[GameState] 🔔 收到对手回合结束消息")
-            self.remote_player.costRegen(2)
-            self.drawTurnstart()
-            self.is_my_turn = True
-            print("[GameState] ➡️ 现在轮到本地玩家出牌")
+    def handle_network_message(self, msg: dict) -> None:
+        """处理来自网络的消息（按 type 查表分发）"""
+        log.debug("收到网络消息: %s", msg)
 
+        msg_type = msg.get("type")
+        route = self._message_routes.get(msg_type)
+        if route is None:
+            log.warning("未处理的消息类型: %s", msg_type)
+            return
 
-        elif msg_type == gconstants.EVENT_CARD_DRAWN:
-            print("[GameState] 收到对手抽牌消息")            
-            card_dict = msg.get("card")
-            if card_dict:
-                # ✅ 关键修复：反序列化
-                received_card: Card = self._dict_to_card(card_dict)
-                print(f"[GameState] 📨 收到对手递来的卡牌: {self._card_to_str(received_card)}")
-                self.local_player.hand.append(received_card)
-                print(f"[GameState] ✅ 卡牌已加入手牌，手牌数: {len(self.local_player.hand)}")
-            else:
-                print("[GameState] ⚠️ 对手未递来卡牌")            
+        handler, dirties_ui, validator = route
+        if validator is not None:
+            error = validator(msg)
+            if error:
+                log.warning("丢弃格式错误的 %s 消息: %s", msg_type, error)
+                return
 
+        if handler(msg) is False or not dirties_ui:
+            return
+        if self.ui_update:
+            self.ui_update(self.get_ui_state())
+
+    def _register_default_message_handlers(self) -> None:
+        card_schema = {"card": CARD_SCHEMA}
+        self.register_message_handler(gconstants.EVENT_GAME_START, self._on_game_start,
+                                      schema={"seed": (int, None)})
+        # parseRemotePlayedCard refreshes the UI itself
+        self.register_message_handler(EVENT_CARD_PLAYED, self._on_card_played,
+                                      dirties_ui=False, schema=card_schema)
+        self.register_message_handler(gconstants.EVENT_TURN_END, self._on_turn_end)
+        self.register_message_handler(gconstants.EVENT_CARD_DRAWN, self._on_card_drawn,
+                                      schema={"card": (CARD_SCHEMA, None), "index": (int, None)})
+
+    def _on_game_start(self, msg: dict) -> None:
+        log.debug("✅ 客户端收到游戏开始通知")
+        if msg.get("seed") is not None:
+            self.seedMatch(msg["seed"])
+        if self.on_game_start_callback:
+            self.on_game_start_callback()
+
+    def _on_card_played(self, msg: dict) -> None:
+        log.debug("收到对手出牌消息")
+        try:
+            card = self._dict_to_card(msg["card"])
+        except ValueError as e:
+            log.warning("⚠️ 丢弃未知卡牌: %s", e)
+            return
+        self.parseRemotePlayedCard(card)
+
+    def _on_turn_end(self, msg: dict) -> None:
+        log.debug("🔔 收到对手回合结束消息")
+        self._journal_events(self.engine.end_turn(REMOTE_SEAT))
+        self.drawTurnstart()
+        log.debug("➡️ 现在轮到本地玩家出牌")
+
+    def _on_card_drawn(self, msg: dict) -> bool:
+        log.debug("收到对手抽牌消息")
+        index = msg.get("index")
+        card_dict = msg.get("card")
+        if index is not None and self.engine.draft is not None and card_dict:
+            # 序号和卡牌应指向同一张；不一致时以卡牌为准
+            try:
+                received_card = self._dict_to_card(card_dict)
+            except ValueError as e:
+                log.warning("⚠️ 丢弃未知卡牌: %s", e)
+                return False
+            candidates = self.engine.candidates(REMOTE_SEAT)
+            if not 0 <= index < len(candidates) or candidates[index] is not received_card:
+                log.warning("⚠️ 对手递来的卡牌与序号 %s 不符，按卡牌处理", index)
+                index = None
+        if index is not None and self.engine.draft is not None:
+            # 种子一致：按序号在对手的候选牌中取出同一张牌
+            try:
+                events = self.engine.give_index(REMOTE_SEAT, index)
+            except IllegalAction as e:
+                log.warning("⚠️ 对手选择的序号无效: %s", e)
+                return False
+            log.debug("📨 收到对手递来的卡牌: %s", events[0]["card"])
+            self._journal_events(events)
+        elif card_dict:
+            # ✅ 关键修复：反序列化
+            try:
+                received_card: Card = self._dict_to_card(card_dict)
+                log.debug("📨 收到对手递来的卡牌: %s", received_card)
+                self._journal_events(self.engine.give(REMOTE_SEAT, received_card))
+            except ValueError as e:
+                log.warning("⚠️ 丢弃未知卡牌: %s", e)
+                return False
         else:
-            print(f"[GameState] 未处理的消息类型: {msg_type}")
-
-        self.ui_update(self.get_ui_state())
+            log.warning("⚠️ 对手未递来卡牌")
+            return False
+        log.debug("✅ 卡牌已加入手牌，手牌数: %s", len(self.local_player.hand))
+        return True
 
     # ------------- Gameplay Methods -----------------
     # ------------------------------------------------
@@ -170,17 +366,15 @@ class GameState:
                          "remote" if the remote player wins,
                          None if the game is still ongoing.
         """
-
-        if self.remote_player.isDefeated():
-            self.game_over_callback(True)
-            self.showframe("EndPage")
-            return
-        elif self.local_player.isDefeated():
-            self.game_over_callback(False)
-            self.showframe("EndPage")
-            return
-        else:
+        winner = self.engine.winner
+        if winner is None:
             return None
+        self.closeJournal()
+        if self.game_over_callback:
+            self.game_over_callback(winner == LOCAL_SEAT)
+        if self.showframe:
+            self.showframe("EndPage")
+        return "local" if winner == LOCAL_SEAT else "remote"
 
     def _card_to_str(self, card: Card) -> str:
         """给 UI 用的卡牌展示文字，可按你自己喜好调整。"""
@@ -189,25 +383,96 @@ class GameState:
         )
 
     def get_ui_state(self) -> dict:
-        """返回给 UI 的完整状态快照。"""
-        return {
+        """返回给 UI 的状态快照（增量维护）。
+
+        The fields are compared with the previous call; when none changed
+        the previous snapshot object is returned as is, otherwise only the
+        changed parts are rebuilt (the hand's card dicts only when the hand
+        changed). Besides the full layout the snapshot carries "version"
+        and "changed_at" ({field: version it last changed}), so a consumer
+        that remembers the last version it applied redoes only the fields
+        changed since (see GamePage.StatusUpdate). Snapshots are shared:
+        do not modify them.
+
+        Returns:
+            dict: The UI state snapshot.
+        """
+        local, remote = self.local_player, self.remote_player
+        values = {
+            "self.hp": local.health,
+            "self.cost": local.cost,
+            "self.hand": local.hand.ordered(),      # 手牌变化时 CountHand 会换一个新列表
+            "opponent.hp": remote.health,
+            "opponent.cost": remote.cost,
+            "opponent.hand_count": len(remote.hand),
+            "is_my_turn": self.is_my_turn,
+        }
+        last = self._ui_values
+        changed = [field for field, value in values.items()
+                   if field not in last or (last[field] is not value and last[field] != value)]
+        # 残局提示要查残局表，只在它依赖的字段变化时重算
+        if "endgame_hint" not in last or any(field in HINT_INPUTS for field in changed):
+            values["endgame_hint"] = self.endgameHint()
+            if "endgame_hint" not in last or values["endgame_hint"] != last["endgame_hint"]:
+                changed.append("endgame_hint")
+        else:
+            values["endgame_hint"] = last["endgame_hint"]
+        snapshot = self._ui_snapshot
+        if snapshot is not None and not changed:
+            return snapshot
+
+        version = next(_ui_versions)
+        for field in changed:
+            self._ui_changed_at[field] = version
+        self._ui_values = values
+        if snapshot is not None and "self.hand" not in changed:
+            hand_cards = snapshot["player_status"]["self"]["hand_cards"]
+        else:
+            hand_cards = [self._ui_card_dict(c) for c in values["self.hand"]]
+        self._ui_snapshot = snapshot = {
             "player_status": {
                 "self": {
-                    "hp": self.local_player.health,
-                    "hand_count": len(self.local_player.hand),
-                    "cost": self.local_player.cost,
-                    "hand_cards": [
-                        self._card_to_dict(c) for c in self.local_player.hand
-                    ],
+                    "hp": local.health,
+                    "hand_count": len(hand_cards),
+                    "cost": local.cost,
+                    "hand_cards": hand_cards,
                 },
                 "opponent": {
-                    "hp": self.remote_player.health,
-                    "hand_count": len(self.remote_player.hand),
-                    "cost": self.remote_player.cost,
+                    "hp": remote.health,
+                    "hand_count": values["opponent.hand_count"],
+                    "cost": remote.cost,
                 },
-                "is_my_turn": self.is_my_turn,
-            }
+                "is_my_turn": values["is_my_turn"],
+            },
+            "endgame_hint": values["endgame_hint"],
+            "version": version,
+            "changed_at": dict(self._ui_changed_at),
         }
+        return snapshot
+
+    def _ui_card_dict(self, card: Card) -> dict:
+        # 目录卡牌不可变，每种只转换一次
+        if card.card_id is None:
+            return self._card_to_dict(card)
+        card_dict = self._ui_card_dicts.get(card.card_id)
+        if card_dict is None:
+            card_dict = self._ui_card_dicts[card.card_id] = self._card_to_dict(card)
+        return card_dict
+
+    def endgameHint(self) -> str | None:
+        """Return a hint when the endgame table shows a forced win this turn.
+
+        Returns:
+            str | None: The card to start with, or None (no table, not our
+                turn, position outside the table or no forced win).
+        """
+        table = get_tablebase()
+        if table is None or not self.is_my_turn or self.engine.winner is not None:
+            return None
+        result = table.lookup_engine(self.engine, LOCAL_SEAT)
+        if result is None or not result.lethal or result.card is None:
+            return None
+        return f"本回合可斩杀：先打出 {result.card}"
 
     # ------------ Player Action Methods -------------
     # ------------------------------------------------
@@ -216,45 +481,28 @@ class GameState:
         """Check if a card in the local player's hand is playable.
 
         Args:
-            card_index (int): The index of the card to check.
+            targetCard (Card): The card to check.
 
         Returns:
             bool: True if the card is playable, False otherwise.
         """
+        return self.engine.can_play(LOCAL_SEAT, targetCard)
 
-        match targetCard.getNcarditem():
-            case gconstants.NCARDITEM_SELF_DAMAGE:
-                if (
-                    self.local_player.health
-                    > gValues[targetCard.getNcarditem()][targetCard.getItemPower()]
-                ):
-                    return True
-                else:
-                    return False
-            case gconstants.NCARDITEM_CARD_DISCARD:
-                if (
-                    len(self.local_player.hand)
-                    > gValues[targetCard.getNcarditem()][targetCard.getItemPower()]
-                ):
-                    return True
-                else:
-                    return False
-            case gconstants.NCARDITEM_COST_USAGE:
-                if (
-                    self.local_player.cost
-                    >= gValues[targetCard.getNcarditem()][targetCard.getItemPower()]
-                ):
-                    return True
-                else:
-                    return False
-            case _:
-                return True
+    def playableMask(self) -> int:
+        """Return which local hand cards are playable, as a bitmask.
+
+        Returns:
+            int: Bit i is set if hand index i can be played now; 0 when it
+                is not the local turn. Cached by the engine until the local
+                hp, cost or hand change.
+        """
+        return self.engine.playable_mask(LOCAL_SEAT)
 
     """
     对需要做牌的函数，实现逻辑为：
     发出 EVENT_CARD_PLAYED 事件，附带 card 数据
     在 remote 端收到时间后，调用 parseRemotePlayedCard(card) 解析牌效果
-    此时 remote 端会根据做牌效果对应做出牌并发出 EVENT_RETURN_CARD 事件
+    此时 remote 端会根据做牌效果对应做出牌并发出 EVENT_CARD_DRAWN 事件
     本地需要捕获这一事件并将其中 card 数据作为得到的牌加入手牌
     """
 
@@ -267,53 +515,17 @@ class GameState:
         Returns:
             bool: True if the card was played successfully, False otherwise.
         """
-        if card_index < 0 or card_index >= len(self.local_player.hand):
-            return False
-
-        card = self.local_player.hand[card_index]
-        if not self.checkCardPlayable(card):
+        try:
+            events = self.engine.play(LOCAL_SEAT, card_index)
+        except IllegalAction as e:
+            log.debug("出牌被拒绝: %s", e)
             return False
-        self.local_player.hand.pop(card_index)
-
-        # Apply negative card item effects
-        match card.getNcarditem():
-            case gconstants.NCARDITEM_SELF_DAMAGE:
-                damage = gValues[card.getNcarditem()][card.getItemPower()]
-                self.local_player.takeDamage(damage)
-            case gconstants.NCARDITEM_CARD_DISCARD:
-                discard_count = gValues[card.getNcarditem()][card.getItemPower()]
-                for _ in range(discard_count):
-                    if self.local_player.hand:
-                        self.local_player.hand.pop(0)  # Discard the first card in hand
-            case gconstants.NCARDITEM_COST_USAGE:
-                cost = gValues[card.getNcarditem()][card.getItemPower()]
-                self.local_player.costUsage(cost)
-            case _:
-                pass
 
+        card = events[0]["card"]
         self.NetworkManager.send(
             {"type": EVENT_CARD_PLAYED, "card": self._card_to_dict(card), "param": None, "player": "remote"}
         )
-
-        match card.getPcarditem():
-            case gconstants.PCARDITEM_HEAL:
-                heal = gValues[card.getPcarditem()][card.getItemPower()]
-                self.local_player.takeHeal(heal)
-            case gconstants.PCARDITEM_CARD_DRAW:
-                draw_count = gValues[card.getPcarditem()][card.getItemPower()]
-                pass
-            case gconstants.PCARDITEM_DAMAGE:
-                damage = gValues[card.getPcarditem()][card.getItemPower()]
-                self.remote_player.takeDamage(damage)
-            case gconstants.PCARDITEM_COST_RECOVER:
-                recover = gValues[card.getPcarditem()][card.getItemPower()]
-                self.local_player.costRegen(recover)
-            case _:
-                pass
-
-        # Remove the card from hand after playing
-        self.ui_update(self.get_ui_state())
-        self.checkGameOver()
+        self._apply_events(events)
         return True
 
     def parseRemotePlayedCard(self, card: Card) -> None:
@@ -321,109 +533,156 @@ class GameState:
         Parse and apply the effects of a card played by the remote player.
 
         Args:
-            card_data (dict): The data of the card played by the remote player.
+            card (Card): The card played by the remote player.
         Returns:
             None
         """
-        self.remote_player.hand.pop(0)
-        # Apply negative card item effects
-        match card.getNcarditem():
-            case gconstants.NCARDITEM_SELF_DAMAGE:
-                damage = gValues[card.getNcarditem()][card.getItemPower()]
-                self.remote_player.takeDamage(damage)
-            case gconstants.NCARDITEM_CARD_DISCARD:
-                discard_count = gValues[card.getNcarditem()][card.getItemPower()]
-                for _ in range(discard_count):
-                    if self.remote_player.hand:
-                        self.remote_player.hand.pop(0)  # Discard the first card in hand
-            case gconstants.NCARDITEM_COST_USAGE:
-                cost = gValues[card.getNcarditem()][card.getItemPower()]
-                self.remote_player.costUsage(cost)
-            case _:
-                pass
-
-        match card.getPcarditem():
-            case gconstants.PCARDITEM_HEAL:
-                heal = gValues[card.getPcarditem()][card.getItemPower()]
-                self.remote_player.takeHeal(heal)
-            case gconstants.PCARDITEM_CARD_DRAW:
-                draw_count = gValues[card.getPcarditem()][card.getItemPower()]
-                for _ in range(draw_count):
+        self._apply_events(self.engine.apply_remote_play(REMOTE_SEAT, card))
+
+    def _apply_events(self, events: list[dict]) -> None:
+        """Run the local side effects of engine events, then refresh the UI."""
+        self._journal_events(events)
+        for event in events:
+            # 对手打出抽牌卡时，由本地为其挑选卡牌
+            if event["type"] == gconstants.EVENT_CHOOSE_CARD and event["seat"] == LOCAL_SEAT:
+                for _ in range(event["count"]):
                     self.chooseCard()
-            case gconstants.PCARDITEM_DAMAGE:
-                damage = gValues[card.getPcarditem()][card.getItemPower()]
-                self.local_player.takeDamage(damage)
-            case gconstants.PCARDITEM_COST_RECOVER:
-                recover = gValues[card.getPcarditem()][card.getItemPower()]
-                self.remote_player.costRegen(recover)
-            case _:
-                pass
-        self.ui_update(self.get_ui_state())
+        if self.ui_update:
+            self.ui_update(self.get_ui_state())
         self.checkGameOver()
-        return
-    
+
+    def startGame(self) -> None:
+        """Open the match: both seats owe the opening draft; make ours."""
+        events = self.engine.start()
+        self._journal_events(events)
+        for event in events:
+            if event["type"] == gconstants.EVENT_CHOOSE_CARD and event["seat"] == LOCAL_SEAT:
+                for _ in range(event["count"]):
+                    self.chooseCard()
+
+    def requestPickHint(self, cards: list[Card], callback: Callable[[list], None]) -> None:
+        """Rank the candidates the local player may give, off the calling thread.
+
+        Args:
+            cards (list[Card]): The candidates on offer.
+            callback (Callable[[list], None]): Receives [(index, value), ...],
+                best first, on the advisor's thread.
+        """
+        if self.advisor is None:
+            self.advisor = Advisor()
+        self.advisor.request(self.engine, LOCAL_SEAT, cards, callback)
+
     def chooseCard(self) -> None:
-        card_list : list[Card] = []
-        for _ in range(3):
-            card_list.append(
-                Card(
-                    choice(gconstants.ITEM_POWER_LIST),
-                    choice(gconstants.PCARDITEMLIST),
-                    choice(gconstants.NCARDITEMLIST),
-                    gconstants.STATUS_CARD_NO_EFFECT
-                )
-            )
-            
+        card_list: list[Card] = self.engine.candidates(LOCAL_SEAT)
+        if self._journal() is not None:
+            self.journal.record_candidates(LOCAL_SEAT, card_list, self.engine.players)
+
         selected_card: Card = self.ui_draw_card_selection_callback(card_list)
         
-        if selected_card is None:
-            print("[GameState] ⚠️ 用户未选择卡牌，使用默认卡牌")
+        if selected_card is None or selected_card not in card_list:
+            log.warning("⚠️ 用户未选择卡牌，使用默认卡牌")
             selected_card = card_list[0]
-        
-        self.remote_player.hand.append(selected_card)
-        self.sendDrawnCard(selected_card)
 
-        
+        # 种子一致时对方能算出同样的候选牌，只需发送序号
+        index = card_list.index(selected_card) if self.engine.draft is not None else None
+        self._journal_events(self.engine.give(LOCAL_SEAT, selected_card))
+        self.sendDrawnCard(selected_card, index)
 
     def turnEnd(self) -> None:
         """【改进】本地玩家回合结束 - 同步获取用户选择的卡牌"""
-        print("[GameState] 本地玩家回合结束...")
-        
-        # 【步骤 1】生成三张待选卡牌
-        self.chooseCard()
-        
-        # 【步骤 2】恢复 Cost
-        self.local_player.costRegen(2)
-        print("[GameState] 本地玩家恢复 Cost +2")
+        log.info("本地玩家回合结束...")
+
+        # 【步骤 1】结算回合结束：恢复 Cost，轮到对手，并欠对手一张牌
+        events = self.engine.end_turn(LOCAL_SEAT)
+        self._journal_events(events)
+        log.debug("本地玩家恢复 Cost +%s", gconstants.TURN_COST_REGEN)
+
+        # 【步骤 2】显示弹窗并同步等待用户选择，发送选定的卡牌给对方
+        for event in events:
+            if event["type"] == gconstants.EVENT_CHOOSE_CARD:
+                for _ in range(event["count"]):
+                    self.chooseCard()
 
         self.NetworkManager.send({
             "type": gconstants.EVENT_TURN_END,
             "player": "remote",
         })
-        
-        # 【步骤 3】显示弹窗并同步等待用户选择
-        # 【关键改进】现在直接调用 draw_card_selection()，它会返回被选中的卡牌
-        # 这会阻塞直到用户完成选择
-        
-        # 【步骤 4】发送选定的卡牌给对方
+
         self.ui_update(self.get_ui_state())
 
 
-    def sendDrawnCard(self, selected_card: Card) -> None:
-        """【改进】发送选定的卡牌给对方"""
-        print(f"[GameState] 正在发送卡牌给对方: {self._card_to_str(selected_card)}")
+    def sendDrawnCard(self, selected_card: Card, index: int | None = None) -> None:
+        """【改进】发送选定的卡牌给对方
 
-        card_dict = self._card_to_dict(selected_card)
-        
-        # 【关键】直接接收 Card 对象，而不是索引
-        self.NetworkManager.send({
+        The full card is always sent, so a peer that did not take up the
+        match seed still receives it; a seeded peer checks it against the
+        index.
+
+        Args:
+            selected_card (Card): The card given to the opponent.
+            index (int | None): Its position in the seeded candidate set.
+        """
+        log.debug("正在发送卡牌给对方: %s", selected_card)
+
+        msg = {
             "type": gconstants.EVENT_CARD_DRAWN,
-            "card": card_dict,
             "player": "remote",
-            "sender_turn_end": True
-        })
+            "sender_turn_end": True,
+            "card": self._card_to_dict(selected_card),
+        }
+        if index is not None:
+            msg["index"] = index
+        self.NetworkManager.send(msg)
         
-        print("[GameState] ✅ 回合结束通知已发送到对方")
+        log.debug("✅ 回合结束通知已发送到对方")
+
+    # ---------------- Match Seed -------------------
+    # ------------------------------------------------
+
+    def newMatchSeed(self) -> int:
+        """Pick a seed for this match (host side) and seed the draft with it.
+
+        Returns:
+            int: The seed, to send to the peer in EVENT_GAME_START.
+        """
+        seed = new_match_seed()
+        self.seedMatch(seed)
+        return seed
+
+    def seedMatch(self, seed: int) -> None:
+        """Draw all candidate sets of this match from `seed`.
+
+        Args:
+            seed (int): The seed agreed on at game start.
+        """
+        local_role = ROLE_HOST if self.NetworkManager.is_host else ROLE_GUEST
+        self.engine.seed_draft(seed, (local_role, 1 - local_role))
+        log.info("对局种子: %s", seed)
+
+    # ---------------- Journal Methods ---------------
+    # ------------------------------------------------
+
+    def _journal(self) -> MatchJournal | None:
+        """Return the match journal, opening it on first use."""
+        if self.journal is None and self.journal_dir:
+            try:
+                self.journal = MatchJournal.create(self.journal_dir)
+                log.info("对局记录: %s", self.journal.path)
+            except OSError as e:
+                log.error("无法创建对局记录，本局不再记录: %s", e)
+                self.journal_dir = None
+        return self.journal
+
+    def _journal_events(self, events: list[dict]) -> None:
+        if self._journal() is not None:
+            self.journal.record_events(events, self.engine.players)
+
+    def closeJournal(self) -> None:
+        """Flush and close the match journal; this match records nothing more."""
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+            self.journal_dir = None
 
     def _card_to_dict(self, card: Card) -> dict:
         """将 Card 对象转换为字典"""
@@ -435,12 +694,16 @@ class GameState:
         }
 
     def _dict_to_card(self, card_dict: dict) -> Card:
-        """从字典重建 Card 对象"""
-        return Card(
-            item_power=card_dict.get("item_power"),
-            pcarditem_type=card_dict.get("pcarditem_type"),
-            ncarditem_type=card_dict.get("ncarditem_type"),
-            card_effect=card_dict.get("card_effect"),
+        """从字典取回卡牌（目录中的共享对象，不再每次新建）
+
+        Raises:
+            ValueError: 字典描述的卡牌不存在。
+        """
+        return get_card(
+            card_dict.get("item_power"),
+            card_dict.get("pcarditem_type"),
+            card_dict.get("ncarditem_type"),
+            card_dict.get("card_effect"),
         )
 
 
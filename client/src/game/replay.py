@@ -0,0 +1,193 @@
+"""Headless replay of match journals.
+
+Replay re-applies the action records of a journal (card_played,
+card_drawn, turn_end) through GameEngine; every other record is a
+consequence the engine recomputes, and is used to verify the replay.
+Every `snapshot_every` records a full engine snapshot is kept, so seeking
+to any record or turn restores the nearest earlier snapshot and replays
+at most `snapshot_every` records.
+
+Usage, from the `client` directory:
+    python -m src.game.replay JOURNAL [--turn N | --record I] [--every K]
+
+Example:
+    with JournalReader(path) as reader:
+        replay = Replay(reader)
+    engine = replay.seek_turn(5)
+    print(engine.players[0].health)
+"""
+
+import argparse
+from bisect import bisect_right
+
+from src.game.card import CARD_CATALOG
+from src.game.engine import GameEngine, opponent
+from src.game.journal import (
+    JournalReader, JournalRecord, KIND_CARD_PLAYED, KIND_CARD_DRAWN, KIND_TURN_END,
+)
+
+DEFAULT_SNAPSHOT_EVERY = 32
+ACTION_KINDS = (KIND_CARD_PLAYED, KIND_CARD_DRAWN, KIND_TURN_END)
+
+
+class ReplayMismatch(Exception):
+    """Raised when replayed hp / cost differ from what the journal recorded."""
+
+
+class Replay:
+    """Seekable replay of one journal.
+
+    Building the replay applies every record once, keeping a snapshot at
+    the first action record after each `snapshot_every` records.
+
+    Args:
+        records (Iterable[JournalRecord]): The journal, e.g. a JournalReader.
+        snapshot_every (int): Records between snapshots (K).
+        verify (bool): Check the replayed hp / cost against each record
+            group while building; raise ReplayMismatch on a difference.
+
+    Attributes:
+        engine (GameEngine): State after `position` records.
+        position (int): Records applied so far.
+        turn_starts (list[int]): Position at which turn N starts: after
+            N turn_end records (turn 0 starts at position 0).
+        events (int): Records applied in total, seeks included.
+    """
+
+    def __init__(self, records, snapshot_every: int = DEFAULT_SNAPSHOT_EVERY, verify: bool = True):
+        self.records: list[JournalRecord] = list(records)
+        self.snapshot_every = max(1, snapshot_every)
+        self.turn_starts = [0]
+        self.events = 0
+        self._snap_positions: list[int] = []
+        self._snaps: list[tuple] = []
+
+        self.engine = GameEngine(first_seat=self._first_seat())
+        self.engine.start()
+        self.position = 0
+        self._take_snapshot()
+        last_snap = 0
+        previous = None
+        for i, record in enumerate(self.records):
+            if record.kind in ACTION_KINDS:
+                # 每组记录以动作开头；上一组结束时的状态应与记录一致
+                if verify and previous is not None:
+                    self._verify(previous)
+                if i - last_snap >= self.snapshot_every:
+                    self._take_snapshot()
+                    last_snap = i
+            self._apply(record)
+            if record.kind == KIND_TURN_END:
+                self.turn_starts.append(i + 1)
+            previous = record
+        if verify and previous is not None:
+            self._verify(previous)
+
+    @property
+    def turns(self) -> int:
+        """Number of turns that ended in the journal."""
+        return len(self.turn_starts) - 1
+
+    def seek(self, position: int) -> GameEngine:
+        """Return the engine after the first `position` records.
+
+        Args:
+            position (int): 0 .. len(records).
+
+        Returns:
+            GameEngine: `self.engine`, moved to that position.
+        """
+        position = max(0, min(position, len(self.records)))
+        if not self.position <= position < self.position + self.snapshot_every:
+            # 从最近的快照开始，最多重放 snapshot_every 条
+            k = bisect_right(self._snap_positions, position) - 1
+            self.engine.restore(self._snaps[k])
+            self.position = self._snap_positions[k]
+        while self.position < position:
+            self._apply(self.records[self.position])
+        return self.engine
+
+    def seek_turn(self, turn: int) -> GameEngine:
+        """Return the engine at the start of `turn` (after `turn` turn ends)."""
+        if not 0 <= turn < len(self.turn_starts):
+            raise IndexError(f"turn {turn} not in journal (0..{self.turns})")
+        return self.seek(self.turn_starts[turn])
+
+    # ---------------- Internals --------------------
+    # -----------------------------------------------
+
+    def _first_seat(self) -> int:
+        for record in self.records:
+            if record.kind in (KIND_CARD_PLAYED, KIND_TURN_END):
+                return record.seat
+        return 0
+
+    def _take_snapshot(self) -> None:
+        self._snap_positions.append(self.position)
+        self._snaps.append(self.engine.snapshot())
+
+    def _apply(self, record: JournalRecord) -> None:
+        kind = record.kind
+        if kind == KIND_CARD_PLAYED:
+            self.engine.apply_remote_play(record.seat, CARD_CATALOG[record.args[0]])
+        elif kind == KIND_CARD_DRAWN:
+            # 记录的是收牌的一方，出牌选择的是对方
+            self.engine.give(opponent(record.seat), CARD_CATALOG[record.args[0]])
+        elif kind == KIND_TURN_END:
+            self.engine.end_turn(record.seat)
+        self.position += 1
+        self.events += 1
+
+    def _verify(self, record: JournalRecord) -> None:
+        players = self.engine.players
+        state = (tuple(p.health for p in players), tuple(p.cost for p in players))
+        if state != (record.hp, record.cost):
+            raise ReplayMismatch(
+                f"record {self.position - 1}: replayed hp/cost {state}, "
+                f"journal {(record.hp, record.cost)}"
+            )
+
+
+def load_replay(path: str, snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+                verify: bool = True) -> Replay:
+    """Build a Replay from the journal file at `path`."""
+    with JournalReader(path) as reader:
+        return Replay(reader, snapshot_every, verify)
+
+
+def format_state(engine: GameEngine) -> str:
+    """Multi-line description of a replayed position."""
+    lines = [f"seat to act: {engine.turn}"
+             + (f"   winner: {engine.winner}" if engine.winner is not None else "")]
+    for seat, player in enumerate(engine.players):
+        lines.append(f"seat {seat}: hp {player.health:>2}  cost {player.cost:>2}  "
+                     f"owes {engine.pending[seat]}  hand {len(player.hand)}")
+        for card in player.hand:
+            lines.append(f"    #{card.card_id:<2} {card}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Print the state of a recorded match.")
+    parser.add_argument("journal")
+    where = parser.add_mutually_exclusive_group()
+    where.add_argument("--turn", type=int, help="state at the start of turn N")
+    where.add_argument("--record", type=int, help="state after the first I records")
+    parser.add_argument("--every", type=int, default=DEFAULT_SNAPSHOT_EVERY,
+                        help="records between snapshots")
+    parser.add_argument("--no-verify", action="store_true",
+                        help="do not check hp / cost against the journal")
+    args = parser.parse_args()
+
+    replay = load_replay(args.journal, args.every, verify=not args.no_verify)
+    if args.turn is not None:
+        engine = replay.seek_turn(args.turn)
+    else:
+        engine = replay.seek(len(replay.records) if args.record is None else args.record)
+    print(f"{args.journal}: {len(replay.records)} records, {replay.turns} turns, "
+          f"position {replay.position}")
+    print(format_state(engine))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""Endgame tablebase: how much damage a seat can force in its current turn.
+
+For every hand of at most K catalog cards and every hp, opponent hp and
+cost, the table stores the most damage the seat to move can deal before
+ending its turn, and the first card of a line that deals it. Damage equal
+to the opponent's hp is a forced win (lethal).
+
+The solution is a guarantee, independent of the parts of the state the
+table leaves out:
+  * card-discard costs drop the remaining cards worst for the player (the
+    real rule drops the oldest, and hand order is not in the table);
+  * cards the opponent gives mid-turn for a card-draw card are ignored.
+Both can only make the real outcome better than the stored one.
+
+Values beyond what K cards can use are equivalent, so each dimension is
+clamped: hp above K * max self-damage + 1, opponent hp above
+K * max damage + 1, cost above K * max cost usage. Tables built with
+lower bounds simply leave the higher values out.
+
+File layout (little endian): a 32-byte header "<4sHBBBBBBBI15x" (magic
+b"FCTB", version, K, hp / opponent hp / cost bounds, hp / opponent hp /
+cost caps, number of hands), then one byte per state:
+
+    bits 0-4  damage the mover can force (capped at the opponent's hp)
+    bits 5-7  index of the first card to play among the hand's distinct
+              card ids in ascending order, NO_MOVE to end the turn
+
+ordered by (hand rank, hp - 1, opponent hp - 1, cost). Hands of k cards
+are ranked in the combinatorial number system after all smaller hands,
+so a lookup is O(K) arithmetic and one byte read from the mmap.
+
+Build it offline, from the `client` directory:
+    python -m src.game.tablebase build [--hand K] [--max-hp H] [--max-opp-hp O]
+                                       [--max-cost C] [-o PATH]
+    python -m src.game.tablebase query PATH HP OPP_HP COST CARD_ID...
+
+Example:
+    table = get_tablebase()              # None when no table was built
+    if table is not None:
+        result = table.lookup_engine(engine, seat)
+        if result is not None and result.lethal:
+            engine.play(seat, hand.ordered().index(result.card))
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from itertools import combinations_with_replacement
+from math import comb
+
+import src.game.constants as gconstants
+from src.game.card import CARD_CATALOG, CARD_COUNT, Card
+from src.log import get_logger
+
+log = get_logger("game.tablebase")
+
+TABLE_MAGIC = b"FCTB"
+TABLE_VERSION = 1
+HEADER = struct.Struct("<4sHBBBBBBBI15x")
+DAMAGE_BITS = 5
+DAMAGE_MASK = (1 << DAMAGE_BITS) - 1
+NO_MOVE = 7
+MAX_HAND = 7                # 3 位的出牌序号
+DEFAULT_HAND = 3
+DEFAULT_TABLEBASE_PATH = os.environ.get("FAIRCARD_TABLEBASE", os.path.join("data", "endgame.fctb"))
+
+_VALUES = gconstants.CARD_ITEM_VALUES
+MAX_SELF_DAMAGE = max(_VALUES[gconstants.NCARDITEM_SELF_DAMAGE])
+MAX_COST_USAGE = max(_VALUES[gconstants.NCARDITEM_COST_USAGE])
+MAX_DAMAGE = max(_VALUES[gconstants.PCARDITEM_DAMAGE])
+
+
+def caps(hand: int) -> tuple[int, int, int]:
+    """Return the (hp, opponent hp, cost) values above which nothing changes."""
+    return (
+        min(hand * MAX_SELF_DAMAGE + 1, gconstants.PLAYER_MAX_HEALTH),
+        min(hand * MAX_DAMAGE + 1, gconstants.PLAYER_MAX_HEALTH),
+        min(hand * MAX_COST_USAGE, gconstants.PLAYER_COST_LIMIT),
+    )
+
+
+def hand_offsets(hand: int) -> list[int]:
+    """offsets[k] = number of hands with fewer than k cards."""
+    offsets = [0]
+    for k in range(hand + 1):
+        offsets.append(offsets[-1] + comb(CARD_COUNT + k - 1, k))
+    return offsets
+
+
+def hand_rank(card_ids: list[int]) -> int:
+    """Rank of a sorted multiset of card ids among hands of its size."""
+    # 可重组合 a_0<=a_1<=... 对应严格递增的 a_i + i，再按 colex 排名
+    return sum(comb(a + i, i + 1) for i, a in enumerate(card_ids))
+
+
+class EndgameResult:
+    """One table entry.
+
+    Attributes:
+        damage (int): Damage the mover can force this turn.
+        lethal (bool): The damage kills the opponent.
+        card (Card | None): First card of the line, None to end the turn.
+    """
+
+    __slots__ = ("damage", "lethal", "card")
+
+    def __init__(self, damage: int, lethal: bool, card: Card | None):
+        self.damage = damage
+        self.lethal = lethal
+        self.card = card
+
+    def __repr__(self) -> str:
+        return f"EndgameResult(damage={self.damage}, lethal={self.lethal}, card={self.card})"
+
+
+# ---- Reading ----
+
+class Tablebase:
+    """A tablebase file opened through mmap; lookups read one byte.
+
+    Args:
+        path (str): Table file written by build_table().
+
+    Raises:
+        ValueError: Not a tablebase, unsupported version or truncated.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError(f"{path}: too short for a tablebase")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.hand, self.max_hp, self.max_opp_hp, self.max_cost,
+         self.hp_cap, self.opp_cap, self.cost_cap, hands) = HEADER.unpack_from(self._map, 0)
+        if magic != TABLE_MAGIC:
+            raise ValueError(f"{path}: not a tablebase")
+        if version != TABLE_VERSION:
+            raise ValueError(f"{path}: unsupported tablebase version {version}")
+        self._offsets = hand_offsets(self.hand)
+        self._stride_o = self.max_cost + 1
+        self._stride_h = self.max_opp_hp * self._stride_o
+        self._stride_hand = self.max_hp * self._stride_h
+        if size < HEADER.size + hands * self._stride_hand:
+            raise ValueError(f"{path}: truncated tablebase")
+
+    def lookup(self, card_ids: list[int], hp: int, opp_hp: int, cost: int) -> EndgameResult | None:
+        """Look up a position.
+
+        Args:
+            card_ids (list[int]): The mover's hand as card ids, any order.
+            hp (int): The mover's hp (>= 1).
+            opp_hp (int): The opponent's hp (>= 1).
+            cost (int): The mover's cost.
+
+        Returns:
+            EndgameResult | None: None if the position is outside the table.
+        """
+        ids = sorted(card_ids)
+        hp, opp_hp, cost = min(hp, self.hp_cap), min(opp_hp, self.opp_cap), min(cost, self.cost_cap)
+        if (len(ids) > self.hand or not 1 <= hp <= self.max_hp
+                or not 1 <= opp_hp <= self.max_opp_hp or not 0 <= cost <= self.max_cost):
+            return None
+        index = (HEADER.size
+                 + (self._offsets[len(ids)] + hand_rank(ids)) * self._stride_hand
+                 + (hp - 1) * self._stride_h + (opp_hp - 1) * self._stride_o + cost)
+        entry = self._map[index]
+        damage, move = entry & DAMAGE_MASK, entry >> DAMAGE_BITS
+        card = None if move == NO_MOVE else CARD_CATALOG[sorted(set(ids))[move]]
+        return EndgameResult(damage, damage >= opp_hp, card)
+
+    def lookup_engine(self, engine, seat: int) -> EndgameResult | None:
+        """Look up `seat`'s position in a GameEngine (its turn assumed)."""
+        me, other = engine.players[seat], engine.players[1 - seat]
+        if len(me.hand) > self.hand or me.health <= 0 or other.health <= 0:
+            return None
+        return self.lookup([card.card_id for card in me.hand], me.health, other.health, me.cost)
+
+    def close(self) -> None:
+        self._map.close()
+
+
+_loaded: dict[str, Tablebase | None] = {}
+
+
+def get_tablebase(path: str = DEFAULT_TABLEBASE_PATH) -> Tablebase | None:
+    """Open the tablebase at `path` once per process; None if there is none."""
+    if path not in _loaded:
+        try:
+            _loaded[path] = Tablebase(path)
+            log.info("残局表已载入: %s", path)
+        except FileNotFoundError:
+            _loaded[path] = None
+        except (OSError, ValueError) as e:
+            log.warning("无法载入残局表 %s: %s", path, e)
+            _loaded[path] = None
+    return _loaded[path]
+
+
+# ---- Building ----
+
+def solve(hand: int) -> dict[tuple, tuple]:
+    """Solve every hand of at most `hand` cards on the full clamped grid.
+
+    Returns:
+        dict[tuple, tuple]: sorted card ids -> (damage, move) uint8 arrays
+            of shape (hp cap, opponent hp cap, cost cap + 1).
+    """
+    import numpy as np
+
+    hp_cap, opp_cap, cost_cap = caps(hand)
+    shape = (hp_cap, opp_cap, cost_cap + 1)
+    hp = np.arange(1, hp_cap + 1)
+    opp = np.arange(1, opp_cap + 1)
+    cost = np.arange(0, cost_cap + 1)
+    opp_grid = np.broadcast_to(opp[None, :, None], shape)
+
+    zero = np.zeros(shape, np.uint8)
+    solved = {(): (zero, np.full(shape, NO_MOVE, np.uint8))}
+    for k in range(1, hand + 1):
+        for ids in combinations_with_replacement(range(CARD_COUNT), k):
+            best = zero.copy()
+            best_move = np.full(shape, NO_MOVE, np.uint8)
+            for move, card_id in enumerate(sorted(set(ids))):
+                value = _play_value(np, solved, ids, card_id, hp, opp, cost, opp_grid, shape)
+                if value is None:
+                    continue
+                better = value > best
+                best[better] = value[better]
+                best_move[better] = move
+            solved[ids] = (best, best_move)
+    return solved
+
+
+def _play_value(np, solved, ids, card_id, hp, opp, cost, opp_grid, shape):
+    """Damage forced by playing `card_id` first (0 where it cannot be paid)."""
+    card = CARD_CATALOG[card_id]
+    hp_cap, opp_cap, cost_cap1 = shape
+    ncard, nv = card.ncarditem_type, card.nvalue
+    pcard, pv = card.pcarditem_type, card.pvalue
+
+    rest = list(ids)
+    rest.remove(card_id)
+    valid_h = np.ones(hp_cap, bool)
+    valid_c = np.ones(cost_cap1, bool)
+    new_hp, new_cost = hp.copy(), cost.copy()
+    children = [tuple(rest)]
+    if ncard == gconstants.NCARDITEM_SELF_DAMAGE:
+        valid_h = hp > nv
+        new_hp = np.maximum(hp - nv, 1)
+    elif ncard == gconstants.NCARDITEM_COST_USAGE:
+        valid_c = cost >= nv
+        new_cost = np.maximum(cost - nv, 0)
+    elif ncard == gconstants.NCARDITEM_CARD_DISCARD:
+        if len(ids) <= nv:
+            return None
+        # 弃牌按最坏情况：任意 nv 张剩余手牌
+        children = sorted({_without(rest, drop) for drop in combinations_with_replacement(
+            sorted(set(rest)), nv) if _can_drop(rest, drop)})
+
+    dealt = 0
+    if pcard == gconstants.PCARDITEM_HEAL:
+        new_hp = np.minimum(new_hp + pv, hp_cap)
+    elif pcard == gconstants.PCARDITEM_COST_RECOVER:
+        new_cost = np.minimum(new_cost + pv, cost_cap1 - 1)
+    elif pcard == gconstants.PCARDITEM_DAMAGE:
+        dealt = pv
+
+    child = solved[children[0]][0]
+    for other in children[1:]:
+        child = np.minimum(child, solved[other][0])
+    # 对手剩余 hp 为 opp - dealt；<= 0 即斩杀
+    opp_after = np.maximum(opp - dealt, 1) - 1
+    follow = child[np.ix_(new_hp - 1, opp_after, new_cost)]
+    value = np.where(opp_grid <= dealt, opp_grid, np.minimum(follow.astype(np.int16) + dealt, opp_grid))
+    valid = valid_h[:, None, None] & valid_c[None, None, :]
+    return np.where(valid, value, 0).astype(np.uint8)
+
+
+def _without(cards: list[int], drop: tuple) -> tuple:
+    rest = list(cards)
+    for card_id in drop:
+        rest.remove(card_id)
+    return tuple(rest)
+
+
+def _can_drop(cards: list[int], drop: tuple) -> bool:
+    return all(drop.count(card_id) <= cards.count(card_id) for card_id in set(drop))
+
+
+def build_table(path: str, hand: int = DEFAULT_HAND, max_hp: int | None = None,
+                max_opp_hp: int | None = None, max_cost: int | None = None) -> int:
+    """Solve and write a tablebase; return its size in bytes.
+
+    Bounds above the clamp caps are lowered to them (higher values look
+    up as the cap).
+    """
+    import numpy as np
+
+    if not 1 <= hand <= MAX_HAND:
+        raise ValueError(f"hand size must be 1..{MAX_HAND}")
+    hp_cap, opp_cap, cost_cap = caps(hand)
+    max_hp = hp_cap if max_hp is None else min(max_hp, hp_cap)
+    max_opp_hp = opp_cap if max_opp_hp is None else min(max_opp_hp, opp_cap)
+    max_cost = cost_cap if max_cost is None else min(max_cost, cost_cap)
+
+    solved = solve(hand)
+    offsets = hand_offsets(hand)
+    hands = offsets[hand + 1]
+    body = np.zeros((hands, max_hp, max_opp_hp, max_cost + 1), np.uint8)
+    for ids, (damage, move) in solved.items():
+        index = offsets[len(ids)] + hand_rank(list(ids))
+        entry = damage | (move << DAMAGE_BITS)
+        body[index] = entry[:max_hp, :max_opp_hp, :max_cost + 1]
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(TABLE_MAGIC, TABLE_VERSION, hand, max_hp, max_opp_hp, max_cost,
+                            hp_cap, opp_cap, cost_cap, hands))
+        f.write(body.tobytes())
+    os.replace(tmp, path)
+    return HEADER.size + body.nbytes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build or query the endgame tablebase.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="solve and write a table")
+    build.add_argument("--hand", type=int, default=DEFAULT_HAND, help="largest hand (K)")
+    build.add_argument("--max-hp", type=int, default=None)
+    build.add_argument("--max-opp-hp", type=int, default=None)
+    build.add_argument("--max-cost", type=int, default=None)
+    build.add_argument("-o", "--output", default=DEFAULT_TABLEBASE_PATH)
+    query = commands.add_parser("query", help="look up one position")
+    query.add_argument("path")
+    query.add_argument("hp", type=int)
+    query.add_argument("opp_hp", type=int)
+    query.add_argument("cost", type=int)
+    query.add_argument("cards", type=int, nargs="*", help="card ids in hand")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        size = build_table(args.output, args.hand, args.max_hp, args.max_opp_hp, args.max_cost)
+        print(f"{args.output}: {size:,} bytes in {time.perf_counter() - start:.1f}s")
+    else:
+        table = Tablebase(args.path)
+        print(table.lookup(args.cards, args.hp, args.opp_hp, args.cost))
+
+
+if __name__ == "__main__":
+    main()
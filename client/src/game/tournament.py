@@ -0,0 +1,445 @@
+"""Round-robin tournaments between bot strategies.
+
+A strategy is a card-play policy plus a card-choose policy, written as
+"PLAY/CHOOSE" (e.g. "greedy/weakest", "mcts:200/advisor:2"; a bare name
+uses the same policy for both if it has both, else "random" for the
+other). Policies are looked up in PLAY_POLICIES / CHOOSE_POLICIES, or
+imported when the name is a dotted path ("mypkg.bots.rush:3"); the part
+after ":" is passed to the factory as a string.
+
+    play factory(arg)   -> play(engine, seat, rng) -> hand index | None (end turn)
+    choose factory(arg) -> choose(engine, seat, cards, rng) -> index into cards
+
+A policy object may also have `reset(seed)`, called before every match
+(clear caches, reseed), so a match only depends on its own seed.
+
+Matches run on GameEngine alone (no Tk, no Network) with a seeded draft.
+Every pair of strategies plays --games matches; games 2k and 2k+1 share
+a match seed and swap seats, so both sides see the same candidate sets.
+The matches are cut into chunks and spread over a process pool; each
+worker builds its strategies once and sends back one result list per
+chunk, which the parent folds into the win matrix as it arrives.
+
+Run from the `client` directory:
+    python -m src.game.tournament random/random greedy/weakest mcts:100/mcts
+        [--games N] [--workers W] [--chunk C] [--seed S] [--max-turns T]
+
+Example:
+    result = run_tournament(["random", "greedy/weakest"], games=100, workers=4)
+    print(format_matrix(result))
+"""
+
+import argparse
+import importlib
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from hashlib import blake2b
+from random import Random
+from typing import Callable, Iterable
+
+import src.game.constants as gconstants
+from src.game.advisor import Advisor
+from src.game.card import Card
+from src.game.draft import ROLE_GUEST, ROLE_HOST
+from src.game.engine import GameEngine, payable_ids
+from src.game.mcts import MCTS
+from src.log import get_logger
+
+log = get_logger("game.tournament")
+
+DEFAULT_GAMES = 100
+DEFAULT_CHUNK = 10
+DEFAULT_MAX_TURNS = 500
+RANDOM_STOP = 0.2           # 随机出牌时每步主动结束回合的概率
+DEFAULT_MCTS_ITERATIONS = 200
+DEFAULT_ADVISOR_DEPTH = 2
+Z_95 = 1.959964
+
+
+# ---- Policies ----
+
+def random_play(engine: GameEngine, seat: int, rng: Random) -> int | None:
+    """Play a random playable card, or end the turn with probability RANDOM_STOP."""
+    options = engine.playable_indices(seat)
+    if not options or rng.random() < RANDOM_STOP:
+        return None
+    return options[int(rng.random() * len(options))]
+
+
+def greedy_play(engine: GameEngine, seat: int, rng: Random) -> int | None:
+    """Play the playable card with the largest opponent damage, then any card."""
+    player = engine.players[seat]
+    payable = payable_ids(player.health, player.cost, len(player.hand))
+    best, best_score = None, 0
+    for i, card in enumerate(player.hand.ordered()):
+        if payable >> card.card_id & 1:
+            score = 1 + 2 * (card.pvalue if card.pcarditem_type == gconstants.PCARDITEM_DAMAGE else 0)
+            if score > best_score:
+                best, best_score = i, score
+    return best
+
+
+def random_choose(engine: GameEngine, seat: int, cards: list[Card], rng: Random) -> int:
+    """Give the opponent a uniformly random candidate."""
+    return int(rng.random() * len(cards))
+
+
+def weakest_choose(engine: GameEngine, seat: int, cards: list[Card], rng: Random) -> int:
+    """Give the opponent the candidate with the lowest item power."""
+    return min(range(len(cards)), key=lambda i: cards[i].item_power)
+
+
+class MCTSPolicy:
+    """MCTS for both decisions with a fixed iteration budget (reproducible).
+
+    Args:
+        arg (str | None): Iterations per move; DEFAULT_MCTS_ITERATIONS if None.
+    """
+
+    def __init__(self, arg: str | None = None):
+        iterations = int(arg) if arg else DEFAULT_MCTS_ITERATIONS
+        self.search = MCTS(iterations=iterations, time_budget=None)
+
+    def reset(self, seed: int) -> None:
+        self.search.rng.seed(seed)
+        self.search.table.clear()
+
+    def play(self, engine: GameEngine, seat: int, rng: Random) -> int | None:
+        card = self.search.choose_play(engine, seat)
+        return None if card is None else engine.players[seat].hand.ordered().index(card)
+
+    def choose(self, engine: GameEngine, seat: int, cards: list[Card], rng: Random) -> int:
+        return self.search.choose_pick(engine, seat, cards)
+
+
+class AdvisorPolicy:
+    """Expectimax picks searched to a fixed depth, without a time budget.
+
+    Args:
+        arg (str | None): Search depth; DEFAULT_ADVISOR_DEPTH if None.
+    """
+
+    def __init__(self, arg: str | None = None):
+        depth = int(arg) if arg else DEFAULT_ADVISOR_DEPTH
+        self.advisor = Advisor(budget=math.inf, max_depth=depth)
+
+    def reset(self, seed: int) -> None:
+        self.advisor.cache.clear()
+
+    def choose(self, engine: GameEngine, seat: int, cards: list[Card], rng: Random) -> int:
+        return self.advisor.rank(engine, seat, cards)[0][0]
+
+
+def _method(cls: type, name: str) -> Callable:
+    return lambda arg=None: getattr(cls(arg), name)
+
+
+PLAY_POLICIES: dict[str, Callable] = {
+    "random": lambda arg=None: random_play,
+    "greedy": lambda arg=None: greedy_play,
+    "mcts": _method(MCTSPolicy, "play"),
+}
+CHOOSE_POLICIES: dict[str, Callable] = {
+    "random": lambda arg=None: random_choose,
+    "weakest": lambda arg=None: weakest_choose,
+    "mcts": _method(MCTSPolicy, "choose"),
+    "advisor": _method(AdvisorPolicy, "choose"),
+}
+
+
+class Strategy:
+    """A play policy and a choose policy, built from a "PLAY/CHOOSE" spec.
+
+    Args:
+        spec (str): Strategy spec, see the module docstring.
+
+    Raises:
+        ValueError: Unknown policy name or malformed spec.
+    """
+
+    __slots__ = ("spec", "play", "choose")
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        play_spec, sep, choose_spec = spec.partition("/")
+        if not sep:
+            name = play_spec.partition(":")[0]
+            choose_spec = play_spec if name in CHOOSE_POLICIES else "random"
+            if name not in PLAY_POLICIES and "." not in name:
+                play_spec = "random"
+        self.play = _build(play_spec, PLAY_POLICIES)
+        self.choose = _build(choose_spec, CHOOSE_POLICIES)
+
+    def reset(self, seed: int) -> None:
+        """Reset both policies for a match with `seed`."""
+        # 绑定方法的 reset 在其实例上；同一实例只重置一次
+        owners = [getattr(policy, "__self__", policy) for policy in (self.play, self.choose)]
+        for owner in {id(owner): owner for owner in owners}.values():
+            reset = getattr(owner, "reset", None)
+            if reset is not None:
+                reset(seed)
+
+
+def _build(spec: str, registry: dict[str, Callable]) -> Callable:
+    name, _, arg = spec.partition(":")
+    factory = registry.get(name)
+    if factory is None and "." in name:
+        module, _, attr = name.rpartition(".")
+        try:
+            factory = getattr(importlib.import_module(module), attr)
+        except (ImportError, AttributeError) as e:
+            raise ValueError(f"cannot import policy {name!r}: {e}") from None
+    if factory is None:
+        raise ValueError(f"unknown policy {name!r} (known: {', '.join(registry)})")
+    return factory(arg or None)
+
+
+# ---- Matches ----
+
+def match_seed(seed: int, pair: int, game: int) -> int:
+    """Seed of a match: games 2k and 2k+1 of a pair share one."""
+    key = seed.to_bytes(8, "little") + pair.to_bytes(4, "little") + (game // 2).to_bytes(4, "little")
+    return int.from_bytes(blake2b(key, digest_size=8).digest(), "little") >> 1
+
+
+def play_match(seats: tuple[Strategy, Strategy], seed: int,
+               max_turns: int = DEFAULT_MAX_TURNS) -> tuple[int | None, int]:
+    """Play one match, seats[0] moving first.
+
+    Returns:
+        tuple[int | None, int]: (winning seat or None if cut at max_turns, turns).
+    """
+    rng = Random(seed)
+    for strategy in seats:
+        strategy.reset(seed)
+    engine = GameEngine(first_seat=0, rng=rng)
+    engine.seed_draft(seed, (ROLE_HOST, ROLE_GUEST))
+
+    def settle_picks():
+        for seat in (0, 1):
+            while engine.pending[seat] > 0:
+                cards = engine.candidates(seat)
+                engine.give(seat, cards[seats[seat].choose(engine, seat, cards, rng)])
+
+    engine.start()
+    settle_picks()
+    turns = 0
+    while not engine.is_over() and turns < max_turns:
+        seat = engine.turn
+        while not engine.is_over():
+            index = seats[seat].play(engine, seat, rng)
+            if index is None:
+                break
+            engine.play(seat, index)
+            settle_picks()
+        if engine.is_over():
+            break
+        engine.end_turn(seat)
+        settle_picks()
+        turns += 1
+    return engine.winner, turns
+
+
+_worker_strategies: dict[tuple, list[Strategy]] = {}
+
+
+def _run_chunk(specs: tuple, seed: int, max_turns: int, jobs: list) -> list[tuple]:
+    """Play `jobs` [(a, b, pair, game)]; return [(a, b, winner or -1, turns)].
+
+    The winner is a strategy index. Strategies are built once per process.
+    """
+    strategies = _worker_strategies.get(specs)
+    if strategies is None:
+        strategies = _worker_strategies[specs] = [Strategy(spec) for spec in specs]
+    results = []
+    for a, b, pair, game in jobs:
+        # 奇数局交换座位
+        order = (a, b) if game % 2 == 0 else (b, a)
+        winner, turns = play_match((strategies[order[0]], strategies[order[1]]),
+                                   match_seed(seed, pair, game), max_turns)
+        results.append((a, b, -1 if winner is None else order[winner], turns))
+    return results
+
+
+# ---- Results ----
+
+class TournamentResult:
+    """Win counts of a round-robin, filled in as chunks arrive.
+
+    Attributes:
+        specs (list[str]): Strategy specs, indexing the matrices.
+        wins (list[list[int]]): wins[i][j] matches i won against j.
+        draws (list[list[int]]): draws[i][j] matches cut at the turn limit.
+        turns (int): Total turns played.
+        matches (int): Matches played.
+        elapsed (float): Wall time in seconds.
+    """
+
+    def __init__(self, specs: list[str]):
+        n = len(specs)
+        self.specs = list(specs)
+        self.wins = [[0] * n for _ in range(n)]
+        self.draws = [[0] * n for _ in range(n)]
+        self.turns = 0
+        self.matches = 0
+        self.elapsed = 0.0
+
+    def add(self, a: int, b: int, winner: int, turns: int) -> None:
+        if winner < 0:
+            self.draws[a][b] += 1
+            self.draws[b][a] += 1
+        else:
+            self.wins[winner][b if winner == a else a] += 1
+        self.turns += turns
+        self.matches += 1
+
+    def games(self, i: int, j: int) -> int:
+        return self.wins[i][j] + self.wins[j][i] + self.draws[i][j]
+
+    def score(self, i: int, j: int) -> float:
+        """i's score against j: (wins + draws / 2) / games."""
+        n = self.games(i, j)
+        return (self.wins[i][j] + self.draws[i][j] / 2) / n if n else math.nan
+
+    def interval(self, i: int, j: int, z: float = Z_95) -> tuple[float, float]:
+        """Wilson score interval of score(i, j) (95% by default)."""
+        return wilson_interval(self.score(i, j), self.games(i, j), z)
+
+    def overall(self, i: int) -> tuple[float, int]:
+        """i's score against the whole field and its number of games."""
+        n = sum(self.games(i, j) for j in range(len(self.specs)) if j != i)
+        points = sum(self.wins[i][j] + self.draws[i][j] / 2 for j in range(len(self.specs)) if j != i)
+        return (points / n if n else math.nan), n
+
+    def throughput(self) -> float:
+        """Matches per second."""
+        return self.matches / self.elapsed if self.elapsed else 0.0
+
+
+def wilson_interval(p: float, n: int, z: float = Z_95) -> tuple[float, float]:
+    """Wilson score interval for a proportion `p` observed over `n` trials."""
+    if not n:
+        return 0.0, 1.0
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+# ---- Running ----
+
+def schedule(n: int, games: int) -> list[tuple]:
+    """All (a, b, pair, game) of a round-robin between n strategies."""
+    jobs = []
+    pair = 0
+    for a in range(n):
+        for b in range(a + 1, n):
+            jobs.extend((a, b, pair, game) for game in range(games))
+            pair += 1
+    return jobs
+
+
+def run_tournament(specs: list[str], games: int = DEFAULT_GAMES, workers: int | None = None,
+                   chunk: int = DEFAULT_CHUNK, seed: int = 0, max_turns: int = DEFAULT_MAX_TURNS,
+                   on_chunk: Callable[[TournamentResult], None] | None = None) -> TournamentResult:
+    """Play a round-robin of `games` matches per pair of strategies.
+
+    Args:
+        specs (list[str]): Strategy specs (at least two).
+        games (int): Matches per pair; even numbers give each side both seats equally.
+        workers (int | None): Worker processes; os.cpu_count() if None, in-process if 1.
+        chunk (int): Matches per task sent to a worker.
+        seed (int): Tournament seed; the same seed replays the same matches.
+        max_turns (int): Matches are cut (a draw) after this many turns.
+        on_chunk (Callable | None): Called with the partial result after each chunk.
+
+    Returns:
+        TournamentResult: The aggregated results.
+
+    Raises:
+        ValueError: Fewer than two strategies or an unknown policy.
+    """
+    if len(specs) < 2:
+        raise ValueError("a tournament needs at least two strategies")
+    for spec in specs:
+        Strategy(spec)          # 在父进程里尽早报告拼写错误
+    specs = tuple(specs)
+    workers = workers or os.cpu_count() or 1
+    jobs = schedule(len(specs), games)
+    chunks = [jobs[i:i + chunk] for i in range(0, len(jobs), chunk)]
+    result = TournamentResult(list(specs))
+    log.info("锦标赛开始: %s 个策略, %s 局, %s 个进程", len(specs), len(jobs), workers)
+
+    def collect(rows: Iterable[tuple]):
+        for row in rows:
+            result.add(*row)
+        result.elapsed = time.perf_counter() - start
+        if on_chunk is not None:
+            on_chunk(result)
+
+    start = time.perf_counter()
+    if workers == 1:
+        for jobs_chunk in chunks:
+            collect(_run_chunk(specs, seed, max_turns, jobs_chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_chunk, specs, seed, max_turns, jobs_chunk)
+                       for jobs_chunk in chunks]
+            for future in as_completed(futures):
+                collect(future.result())
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def format_matrix(result: TournamentResult) -> str:
+    """Score matrix (row against column) with 95% intervals, then overall scores."""
+    n = len(result.specs)
+    width = max(22, *(len(spec) + 2 for spec in result.specs))
+    lines = [" " * width + "".join(f"{j:>18}" for j in range(n)) + f"{'overall':>18}"]
+    for i, spec in enumerate(result.specs):
+        cells = []
+        for j in range(n):
+            if i == j or not result.games(i, j):
+                cells.append(f"{'-':>18}")
+            else:
+                low, high = result.interval(i, j)
+                cells.append(f"{result.score(i, j):>6.1%} [{low:.0%}-{high:.0%}]".rjust(18))
+        score, games = result.overall(i)
+        low, high = wilson_interval(score, games)
+        cells.append(f"{score:>6.1%} [{low:.0%}-{high:.0%}]".rjust(18))
+        lines.append(f"{i}: {spec}".ljust(width) + "".join(cells))
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Round-robin tournament between bot strategies.")
+    parser.add_argument("strategies", nargs="+", help='"PLAY/CHOOSE" specs, e.g. greedy/weakest')
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES, help="matches per pair")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help="matches per task")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS)
+    parser.add_argument("--progress", action="store_true", help="print the score matrix after every chunk")
+    args = parser.parse_args()
+
+    def progress(result: TournamentResult):
+        print(f"\n{result.matches} matches, {result.throughput():,.1f} matches/s")
+        print(format_matrix(result))
+
+    try:
+        result = run_tournament(args.strategies, args.games, args.workers, args.chunk,
+                                args.seed, args.max_turns, progress if args.progress else None)
+    except ValueError as e:
+        parser.error(str(e))
+    draws = sum(map(sum, result.draws)) // 2
+    print(f"{result.matches} matches in {result.elapsed:.1f}s: {result.throughput():,.1f} matches/s "
+          f"with {args.workers or os.cpu_count()} workers, "
+          f"avg {result.turns / max(1, result.matches):.1f} turns, {draws} cut at {args.max_turns} turns")
+    print("score of row against column, 95% Wilson interval:")
+    print(format_matrix(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,9 @@ import tkinter as tk
 from tkinter import messagebox
 
 from src.game.process import GameState
+from src.log import get_logger
+
+log = get_logger("ui")
 
 
 
@@ -50,6 +53,11 @@ class StartPage(tk.Frame):
                 self.ip_entry.get(), self.port_entry.get(), "join"
             ),
         ).pack(side="left", padx=10)
+        tk.Button(
+            action_frame,
+            text="人机对战",
+            command=self.controller.play_vs_bot,
+        ).pack(side="left", padx=10)
 
         # 房间状态显示
         self.status_var = tk.StringVar(value="房间状态：未连接")
@@ -86,6 +94,7 @@ class GamePage(tk.Frame):
         self.selected_card_index = None  # 记录玩家选择打出的牌索引
         self.selected_draw_index = None  # 记录玩家选择给对方的牌索引
         self.turn_end_callback = None  # 结束回合的回调函数
+        self.hint_provider = None  # 选牌建议: hint_provider(cards, on_ranked)
 
         # --- 1. 顶部：对方状态 ---
         self.opp_status_frame = tk.Frame(self)
@@ -137,6 +146,11 @@ class GamePage(tk.Frame):
         )
         self.turn_indicator_label.pack()
 
+        # 【新增】残局提示（来自残局表，本回合可斩杀时显示）
+        self.endgame_hint_var = tk.StringVar(value="")
+        tk.Label(mid_frame, textvariable=self.endgame_hint_var,
+                 font=("Arial", 12), fg="darkgreen").pack()
+
         # 2b. 结束回合按钮（存储引用以便后续禁用）
         self.turn_end_button = tk.Button(
             mid_frame,
@@ -173,32 +187,55 @@ class GamePage(tk.Frame):
         self.hand_frame = tk.Frame(self)
         self.hand_frame.pack(side="bottom", fill="x", pady=10)
         self.card_buttons = []  # 存储手牌按钮
+        self.applied_ui_version = 0  # 已应用的 UI 快照版本
 
     # --- 状态更新函数 ---
     def StatusUpdate(self, game_data):
         """
         根据game端传来的数据包，更新显示的双方状态。
+        只重绘自上次应用的版本以来变化过的字段（见 GameState.get_ui_state）；
+        同一个快照或更旧的快照再次传入时什么也不做。
         :param game_data: 包含所有游戏状态的数据结构
         """
+        version = game_data.get("version")
+        changed_at = game_data.get("changed_at")
+        if version is not None and version <= self.applied_ui_version:
+            return
+
+        def changed(field: str) -> bool:
+            return changed_at is None or changed_at.get(field, 0) > self.applied_ui_version
+
         player_data = game_data["player_status"]["self"]
         opponent_data = game_data["player_status"]["opponent"]
         
         # 更新己方状态
-        self.self_hp_var.set(f"己方生命值: {player_data['hp']}")
-        self.self_hand_var.set(f"己方手牌数: {player_data['hand_count']}")
-        self.self_cost_var.set(f"己方Cost: {player_data['cost']}")
+        if changed("self.hp"):
+            self.self_hp_var.set(f"己方生命值: {player_data['hp']}")
+        if changed("self.cost"):
+            self.self_cost_var.set(f"己方Cost: {player_data['cost']}")
         
         # 更新对方状态
-        self.opp_hp_var.set(f"对方生命值: {opponent_data['hp']}")
-        self.opp_hand_var.set(f"对方手牌数: {opponent_data['hand_count']}")
-        self.opp_cost_var.set(f"对方Cost: {opponent_data['cost']}")
+        if changed("opponent.hp"):
+            self.opp_hp_var.set(f"对方生命值: {opponent_data['hp']}")
+        if changed("opponent.hand_count"):
+            self.opp_hand_var.set(f"对方手牌数: {opponent_data['hand_count']}")
+        if changed("opponent.cost"):
+            self.opp_cost_var.set(f"对方Cost: {opponent_data['cost']}")
         
-        # 更新己方手牌显示
-        self.update_hand_display(player_data["hand_cards"])
+        # 更新己方手牌显示（重建按钮，最贵的一步）
+        if changed("self.hand"):
+            self.self_hand_var.set(f"己方手牌数: {player_data['hand_count']}")
+            self.update_hand_display(player_data["hand_cards"])
         
-        # 【新增】获取回合状态并更新 UI
+        # 【新增】获取回合状态并更新 UI；可出的牌随生命值、Cost、手牌变化
         is_my_turn = game_data["player_status"].get("is_my_turn", False)
-        self.update_turn_state(is_my_turn)
+        if any(map(changed, ("is_my_turn", "self.hp", "self.cost", "self.hand"))):
+            self.update_turn_state(is_my_turn)
+        if changed("endgame_hint") or changed("is_my_turn"):
+            hint = game_data.get("endgame_hint")
+            self.endgame_hint_var.set(f"💡 {hint}" if hint and is_my_turn else "")
+        if version is not None:
+            self.applied_ui_version = version
 
 
     def update_hand_display(self, hand_cards):
@@ -216,13 +253,13 @@ class GamePage(tk.Frame):
                 n_effect = card["ncarditem_type"]
                 power = card["item_power"]
                 card_name = f"卡牌 {i + 1}"
-                print(f"[UI] 卡牌 {i + 1}: {card_name}，正面: {p_effect}，负面: {n_effect}，等级: Lv{power}")
+                log.debug("卡牌 %s: %s，正面: %s，负面: %s，等级: Lv%s", i + 1, card_name, p_effect, n_effect, power)
                 # 格式化卡牌信息，显示在多行
                 card_text = f"{card_name}\n━━━━━━━━━━━━━━━\n正面: {p_effect}\n负面: {n_effect}\n等级: Lv{power}"
 
             except Exception as e:
                 # 如果卡牌对象没有这些属性，显示备用信息
-                print(f"[UI] ⚠️ 卡牌 {i + 1} 未找到详细信息，使用 str(card)：{str(card)}")
+                log.warning("⚠️ 卡牌 %s 未找到详细信息，使用 str(card)：%s", i + 1, card)
                 card_text = str(card)
 
             # 创建手牌按钮（竖着的长方形）
@@ -248,7 +285,7 @@ class GamePage(tk.Frame):
         
         :param is_my_turn: True 表示自己的回合，False 表示对方的回合
         """
-        print(f"[UI] 更新回合状态: is_my_turn={is_my_turn}")
+        log.debug("更新回合状态: is_my_turn=%s", is_my_turn)
         
         if is_my_turn:
             # 【自己的回合】
@@ -258,11 +295,13 @@ class GamePage(tk.Frame):
             # 启用结束回合按钮
             self.turn_end_button.config(state=tk.NORMAL)
             
-            # 启用所有手牌按钮
-            for btn in self.card_buttons:
-                btn.config(state=tk.NORMAL)
+            # 只启用当前付得起代价的手牌，其余置灰
+            gs = self.controller.game_state if hasattr(self.controller, 'game_state') else None
+            mask = gs.playableMask() if gs is not None else -1
+            for i, btn in enumerate(self.card_buttons):
+                btn.config(state=tk.NORMAL if mask >> i & 1 else tk.DISABLED)
             
-            print("[UI] ✅ 启用了所有操作按钮")
+            log.debug("✅ 启用了操作按钮，可出牌掩码: %s", bin(mask))
             
         else:
             # 【对方的回合】
@@ -276,7 +315,7 @@ class GamePage(tk.Frame):
             for btn in self.card_buttons:
                 btn.config(state=tk.DISABLED)
             
-            print("[UI] 🔒 禁用了所有操作按钮")
+            log.debug("🔒 禁用了所有操作按钮")
 
 
     # --- 回合画面函数 ---
@@ -301,7 +340,7 @@ class GamePage(tk.Frame):
         """
         显示卡牌选择弹窗，并返回用户选择的卡牌
         """
-        print(f"[UI] 显示卡牌选择窗口，共 {len(three_cards)} 张卡牌")
+        log.debug("显示卡牌选择窗口，共 %s 张卡牌", len(three_cards))
 
         # 【关键】初始化选择结果容器
         self.selected_card = None
@@ -362,6 +401,18 @@ class GamePage(tk.Frame):
         tk.Label(info_frame, text="提示：单击卡牌选择，选中的卡牌会高亮显示",
                  font=('Arial', 10), fg="gray").pack()
 
+        # 【新增】选牌建议：在后台线程计算，算完再显示，不阻塞界面
+        self.hint_var = tk.StringVar(value="")
+        tk.Label(info_frame, textvariable=self.hint_var,
+                 font=('Arial', 10), fg="darkgreen").pack()
+        if self.hint_provider:
+            self.hint_var.set("💡 正在计算建议...")
+            window = self.draw_window
+            self.hint_provider(
+                three_cards,
+                lambda ranking: self.after(0, lambda: self._show_draw_hint(window, ranking)),
+            )
+
         # 确认按钮框架
         confirm_frame = tk.Frame(self.draw_window)
         confirm_frame.pack(pady=10)
@@ -385,15 +436,24 @@ class GamePage(tk.Frame):
 
         # 【关键返回值】用户选择完成后返回选中的卡牌
         if self.selected_card is not None:
-            print(f"[UI] 用户选择了卡牌: {self._format_card_for_display(self.selected_card)}")
+            log.info("用户选择了卡牌: %s", self._format_card_for_display(self.selected_card))
             return self.selected_card
         else:
-            print("[UI] ⚠️ 用户未完成选择或取消，返回 None")
+            log.warning("⚠️ 用户未完成选择或取消，返回 None")
             return None
 
+    def _show_draw_hint(self, window, ranking: list) -> None:
+        """显示选牌建议（弹窗已关闭则忽略）"""
+        if window is not self.draw_window or not window.winfo_exists() or not ranking:
+            return
+        best, value = ranking[0]
+        self.hint_var.set(f"💡 建议递出第 {best + 1} 张（预期局势 {value:+.1f}）")
+        self.draw_choice_buttons[best].config(highlightbackground="darkgreen",
+                                              highlightthickness=3)
+
     def _on_draw_window_close(self):
         """处理窗口关闭事件"""
-        print("[UI] 窗口被关闭或取消")
+        log.info("窗口被关闭或取消")
         self.selected_card = None
         if self.draw_window:
             self.draw_window.destroy()
@@ -410,14 +470,14 @@ class GamePage(tk.Frame):
             else:
                 return str(card)
         except Exception as e:
-            print(f"[UI] 格式化卡牌失败: {e}")
+            log.warning("格式化卡牌失败: %s", e)
             return str(card)
 
     def _on_card_selected(self, index: int, card: object) -> None:
         """
         【回调方法】当玩家单击卡牌时调用 - 仅高亮显示并保存选择
         """
-        print(f"[UI] 玩家单击了第 {index} 张卡牌 (仅选中)")
+        log.debug("玩家单击了第 %s 张卡牌 (仅选中)", index)
 
         # 【改进】高亮选中的按钮
         for i, btn in enumerate(self.draw_choice_buttons):
@@ -486,7 +546,7 @@ class GamePage(tk.Frame):
         if gs is None:
             return
 
-        print("[UI] 玩家点击了结束回合按钮")
+        log.info("玩家点击了结束回合按钮")
 
         # 【步骤 1】显示回合结束提示
         self.DrawTurnEnd()
@@ -496,10 +556,10 @@ class GamePage(tk.Frame):
 
         # 【步骤 3】2秒后启动回合结束处理
         if hasattr(self, 'turn_end_callback') and self.turn_end_callback:
-            print("[UI] 启动回合结束处理")
+            log.debug("启动回合结束处理")
             self.after(1000, self.turn_end_callback)
         else:
-            print("[UI] ⚠️ 警告: turn_end_callback 未设置！")
+            log.warning("⚠️ 警告: turn_end_callback 未设置！")
 
     # --- 通用API：实现抽牌功能（由后端调用） ---
     def DrawACard(self):
@@ -548,7 +608,7 @@ class EndPage(tk.Frame):
     def restart_game(self):
         """点击“再来一局”，返回开始界面并准备新连接"""
         # **这里需要通知后端准备新局，并关闭当前的socket连接等**
-        print("[UI] 点击了'再来一局'按钮")
+        log.info("点击了'再来一局'按钮")
     
     # 关闭网络连接
         try:
@@ -594,7 +654,7 @@ class MainApp(tk.Tk):
 
     def on_window_close(self):
         """处理用户关闭窗口"""
-        print("[UI] 窗口关闭事件")
+        log.info("窗口关闭事件")
         
         try:
             if self.game_state and self.game_state.NetworkManager:
@@ -608,7 +668,7 @@ class MainApp(tk.Tk):
 
     def destroy_app(self):
         """彻底销毁应用及所有资源"""
-        print("[UI] 开始销毁应用...")
+        log.info("开始销毁应用...")
         
         try:
             # 关闭网络连接
@@ -627,7 +687,7 @@ class MainApp(tk.Tk):
         try:
             # 销毁主窗口
             self.destroy()
-            print("[UI] ✅ 主窗口已销毁")
+            log.info("✅ 主窗口已销毁")
         except:
             pass
 
@@ -647,12 +707,13 @@ class MainApp(tk.Tk):
             self.game_state.NetworkManager.on_peer_connected = self._on_peer_connected
 
         self.frames["GamePage"].turn_end_callback = self.game_state.turnEnd
+        self.frames["GamePage"].hint_provider = self.game_state.requestPickHint
         self.game_state.ui_update = self.frames["GamePage"].StatusUpdate
         self.game_state.game_over_callback = self.frames["EndPage"].GameOver
 
     def _on_game_start_from_network(self):
         """当收到网络游戏开始消息时调用"""
-        print("[UI] 收到网络游戏开始通知")
+        log.info("收到网络游戏开始通知")
         # 在主线程中安全地切换
         self.after(0, self._do_start_game)
 
@@ -663,7 +724,7 @@ class MainApp(tk.Tk):
 
     def _on_peer_connected(self, peer_count: int):
         """当有客户端连接时（主机端调用）"""
-        print(f"[UI] 客户端连接，当前连接数: {peer_count}")
+        log.info("客户端连接，当前连接数: %s", peer_count)
         self.after(0, lambda: self._update_ui_peer_connected(peer_count))
 
     def _update_ui_peer_connected(self, peer_count: int):
@@ -709,6 +770,17 @@ class MainApp(tk.Tk):
                 "已加入房间，等待房主开始", enable_start=False
             )
 
+    def play_vs_bot(self):
+        """由电脑玩家坐在对手位置，无需网络。"""
+        if self.game_state is None:
+            messagebox.showerror("错误", "GameState 尚未初始化")
+            return
+
+        self.game_state.initBot()
+        self.frames["StartPage"].update_room_status(
+            "电脑玩家已就位，准备开始！", enable_start=True
+        )
+
     def _do_start_game(self):
         """【提取为公共方法】实际执行游戏开始"""
         self.show_frame("GamePage")
@@ -716,8 +788,7 @@ class MainApp(tk.Tk):
         self.game_state.drawTurnstart = self.frames["GamePage"].DrawTurnStart
         game_page: GamePage = self.frames["GamePage"]
         ui_state = self.game_state.get_ui_state()
-        for _ in range(3):
-            self.game_state.chooseCard()
+        self.game_state.startGame()
         game_page.StatusUpdate(ui_state)
         if self.game_state.is_my_turn:
             game_page.DrawTurnStart()
@@ -737,9 +808,11 @@ class MainApp(tk.Tk):
             return
 
         if self.game_state.NetworkManager.is_host:
-            print("[Host] 发送游戏开始通知...")
+            log.info("Host: 发送游戏开始通知...")
+            # 双方用同一个种子生成候选牌，抽牌消息只需携带序号
+            seed = self.game_state.newMatchSeed()
             self.game_state.NetworkManager.send(
-                {"type": "game_start", "message": "主机已开始游戏"}
+                {"type": "game_start", "message": "主机已开始游戏", "seed": seed}
             )
 
         # 切到游戏界面
@@ -0,0 +1,179 @@
+"""
+Leveled logging with an in-memory ring buffer
+---------------------------------------------
+Every module gets a child of the "faircard" logger:
+
+    from src.log import get_logger
+    log = get_logger("network")
+    log.debug("%s <- %s", peer_info, msg)      # formatted only if enabled
+
+* Hot paths log at DEBUG, which is off by default; a disabled call costs one
+  cached level check and never formats its arguments.
+* INFO and above go to a bounded RingBufferHandler that stores the raw
+  records; they are formatted only when dumped, either on demand with
+  dump_recent() or automatically when an ERROR record arrives. An
+  automatic dump writes only the records added since the previous one,
+  so a burst of errors does not print the whole buffer once per error.
+* Until configure() is called, WARNING records are printed to stderr
+  (ERROR and above already arrive there with the ring buffer dump), so
+  benchmarks, CLIs and pool workers still show problems. configure()
+  replaces that with its own console handler (the application entry
+  point calls it).
+
+The level can also be set with the FAIRCARD_LOG environment variable
+(e.g. FAIRCARD_LOG=debug); an unknown name falls back to INFO with a
+warning.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+from collections import deque
+from typing import Deque, List, Optional, TextIO
+
+ROOT_LOGGER = "faircard"
+RING_CAPACITY = 2000
+CONSOLE_FORMAT = "[%(name)s] %(message)s"
+DUMP_FORMAT = "%(asctime)s.%(msecs)03d %(levelname)-7s %(threadName)s [%(name)s] %(message)s"
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Keep the last `capacity` records unformatted.
+
+    Parameters
+    ----------
+    capacity : int
+        Records kept; older ones are discarded.
+    dump_level : int or None
+        A record at or above this level dumps the records added since
+        the last automatic dump to `stream`; None disables automatic
+        dumps.
+    stream : file-like, optional
+        Target for automatic dumps (default: sys.stderr at dump time).
+    """
+
+    def __init__(self,
+                 capacity: int = RING_CAPACITY,
+                 dump_level: Optional[int] = logging.ERROR,
+                 stream: Optional[TextIO] = None) -> None:
+        super().__init__(logging.NOTSET)
+        self.records: Deque[logging.LogRecord] = deque(maxlen=capacity)
+        self.dump_level = dump_level
+        self.stream = stream
+        self.setFormatter(logging.Formatter(DUMP_FORMAT, datefmt="%H:%M:%S"))
+        self._dumping = threading.local()
+        self._added = 0         # records ever appended
+        self._dumped = 0        # value of _added at the last automatic dump
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+        self._added += 1
+        if self.dump_level is not None and record.levelno >= self.dump_level:
+            new = self._added - self._dumped
+            self._dumped = self._added
+            self.dump(last=new)
+
+    def lines(self, last: Optional[int] = None) -> List[str]:
+        """Format the buffered records (only the newest `last`), oldest first."""
+        records = list(self.records)
+        if last is not None:
+            records = records[max(0, len(records) - last):]
+        out = []
+        for record in records:
+            try:
+                out.append(self.format(record))
+            except Exception:
+                out.append(f"<unformattable record {record.msg!r}>")
+        return out
+
+    def dump(self, stream: Optional[TextIO] = None, last: Optional[int] = None) -> None:
+        """Write the buffered records (only the newest `last`) to `stream`."""
+        if getattr(self._dumping, "active", False):
+            return
+        self._dumping.active = True
+        try:
+            target = stream or self.stream or sys.stderr
+            lines = self.lines(last)
+            target.write(f"----- last {len(lines)} log records -----\n")
+            for line in lines:
+                target.write(line + "\n")
+            target.write("----- end of log records -----\n")
+            target.flush()
+        finally:
+            self._dumping.active = False
+
+    def clear(self) -> None:
+        self.records.clear()
+        self._dumped = self._added
+
+
+def _below_dump_level(record: logging.LogRecord) -> bool:
+    # 达到 dump_level 的记录会随环形缓冲一起写到 stderr，不再重复打印
+    return _ring.dump_level is None or record.levelno < _ring.dump_level
+
+
+_root = logging.getLogger(ROOT_LOGGER)
+_ring = RingBufferHandler()
+_root.addHandler(_ring)
+_console: Optional[logging.Handler] = logging.StreamHandler(sys.stderr)
+_console.setLevel(logging.WARNING)
+_console.addFilter(_below_dump_level)
+_console.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+_root.addHandler(_console)
+
+_env_level = os.environ.get("FAIRCARD_LOG", "INFO").upper()
+if _env_level in logging.getLevelNamesMapping():
+    _root.setLevel(_env_level)
+else:
+    _root.setLevel(logging.INFO)
+    _root.warning("FAIRCARD_LOG=%s 不是有效的日志级别，改用 INFO", os.environ["FAIRCARD_LOG"])
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return the "faircard.<name>" logger."""
+    return _root.getChild(name)
+
+
+def configure(level: Optional[int] = None,
+              console_level: Optional[int] = logging.INFO,
+              capacity: Optional[int] = None) -> None:
+    """
+    Set up logging for an application run.
+
+    Parameters
+    ----------
+    level : int, optional
+        Level for all faircard loggers (DEBUG enables hot-path messages).
+    console_level : int or None
+        Print records at or above this level to stdout; None disables
+        console output.
+    capacity : int, optional
+        New ring buffer size.
+    """
+    global _console
+    if level is not None:
+        _root.setLevel(level)
+    if capacity is not None:
+        _ring.records = deque(_ring.records, maxlen=capacity)
+    if _console is not None:
+        _root.removeHandler(_console)
+        _console = None
+    if console_level is not None:
+        _console = logging.StreamHandler(sys.stdout)
+        _console.setLevel(console_level)
+        _console.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        _root.addHandler(_console)
+
+
+def ring_buffer() -> RingBufferHandler:
+    """The process-wide ring buffer handler."""
+    return _ring
+
+
+def dump_recent(stream: Optional[TextIO] = None) -> None:
+    """Write the recent log records to `stream` (default stderr)."""
+    _ring.dump(stream)
@@ -1,3 +1,5 @@
 # 统一导出接口，方便别人“from network import Network, NetError”
 from .core import Network, NetError
-__all__ = ['Network', 'NetError']
\ No newline at end of file
+from .aio import AsyncNetwork
+from .utils import FRAMING_LINE, FRAMING_LENGTH
+__all__ = ['Network', 'AsyncNetwork', 'NetError', 'FRAMING_LINE', 'FRAMING_LENGTH']
@@ -0,0 +1,428 @@
+"""
+asyncio counterpart of Network
+------------------------------
+AsyncNetwork speaks exactly the same wire protocol as `core.Network`
+(same framing modes, heartbeat packets and RPC schema:
+``{"type", "request_id", "payload"}`` / ``"rpc_response"``), so the two
+can talk to each other. Everything runs as tasks on one event loop:
+
+* one reader task per connection instead of one thread per socket
+* ``await request(...)`` instead of blocking on ``Future.result()``
+* handlers may be plain functions or ``async def`` coroutines; each RPC
+  runs in its own task so a slow handler never stalls the reader
+* heartbeats are a background task; ``close()`` cancels everything
+* same hello/hello_ack codec handshake as Network
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Union
+
+from .core import NetError
+from .utils import (
+    FRAMING_LINE, FRAMING_LENGTH, FRAME_HEADER, MAX_FRAME_SIZE,
+    Codec, JSON_CODEC, CODEC_JSON, MSG_HELLO, MSG_HELLO_ACK,
+    check_codecs, decode_body, frame, get_codec, negotiate,
+)
+from src.log import get_logger
+
+log = get_logger("network.aio")
+
+Handler = Callable[[Dict[str, Any]], Union[Dict[str, Any], Awaitable[Dict[str, Any]]]]
+
+
+class _Peer:
+    """One open connection: stream pair plus bookkeeping."""
+
+    __slots__ = ("peer_id", "reader", "writer", "last_seen", "task", "info", "codec")
+
+    def __init__(self, peer_id: int, reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter, now: float) -> None:
+        self.peer_id = peer_id
+        self.reader = reader
+        self.writer = writer
+        self.last_seen = now
+        self.task: Optional[asyncio.Task] = None
+        self.info = f"Peer {writer.get_extra_info('peername')}"
+        self.codec: Codec = JSON_CODEC
+
+
+class AsyncNetwork:
+    """
+    asyncio TCP networking layer with RPC.
+
+    Callbacks (set by application, sync or async):
+        on_message(msg: dict) -> None
+        on_disconnect() -> None
+        on_peer_connected(peer_id: int) -> None
+
+    RPC:
+        register_handler(request_type, handler)
+        await request(data, timeout=5, to_peer=?) -> dict
+    """
+
+    def __init__(
+        self,
+        is_host: bool = False,
+        host_ip: str = "0.0.0.0",
+        port: int = 5555,
+        framing: str = FRAMING_LINE,
+        codecs: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        is_host : bool
+            True  -> listen for incoming connections (start())
+            False -> connect to a remote host (connect())
+        host_ip : str
+            Local interface to bind (Host only)
+        port : int
+            TCP port to bind/connect
+        framing : str
+            "line" or "length"; must match the remote peer
+        codecs : list[str], optional
+            Body codecs we accept, best first (see Network)
+        """
+        self.is_host = is_host
+        self.host_ip, self.port = host_ip, port
+        self.framing = framing
+        self.codecs = check_codecs(codecs, framing)
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._peers: Dict[int, _Peer] = {}
+        self._next_peer_id = 1
+        self._running = False
+
+        self.on_message: Optional[Callable[[Dict[str, Any]], Any]] = None
+        self.on_disconnect: Optional[Callable[[], Any]] = None
+        self.on_peer_connected: Optional[Callable[[int], Any]] = None
+        self.is_connected = False
+
+        # Heart-beating
+        self._hb_interval = 2.0      # seconds
+        self._hb_timeout = 6.0       # seconds
+        self._hb_task: Optional[asyncio.Task] = None
+
+        # RPC
+        self._pending_requests: Dict[str, asyncio.Future] = {}
+        self._request_handlers: Dict[str, Handler] = {}
+        self._handler_tasks: Set[asyncio.Task] = set()
+        self._default_timeout = 5.0
+
+    # --------------------------------------------------------------------- #
+    #  Public API – life-cycle
+    # --------------------------------------------------------------------- #
+    async def start(self) -> None:
+        """
+        Host ONLY: start listening for incoming connections.
+
+        Raises
+        ------
+        NetError
+            If invoked on a Client instance.
+        """
+        if not self.is_host:
+            raise NetError("Client must use connect(), not start()")
+        self._running = True
+        self._server = await asyncio.start_server(
+            self._on_accept, self.host_ip, self.port, limit=MAX_FRAME_SIZE
+        )
+        self._hb_task = asyncio.create_task(self._heartbeat_loop())
+        self.is_connected = True
+
+    async def connect(self, target_ip: str = "127.0.0.1", timeout: float = 10.0) -> None:
+        """
+        Client ONLY: connect to a remote host.
+
+        Raises
+        ------
+        NetError
+            If invoked on a Host instance or connection fails.
+        """
+        if self.is_host:
+            raise NetError("Host cannot connect()")
+        self.host_ip = target_ip
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(target_ip, self.port, limit=MAX_FRAME_SIZE),
+                timeout,
+            )
+        except Exception as e:
+            raise NetError(f"Connection failed: {e}") from e
+        self._running = True
+        self._register(reader, writer)
+        if self.codecs != [CODEC_JSON]:
+            await self.send({"type": MSG_HELLO, "codecs": self.codecs})
+        self._hb_task = asyncio.create_task(self._heartbeat_loop())
+        self.is_connected = True
+
+    async def close(self) -> None:
+        """
+        Idempotent shutdown: cancel every task, close streams and fail
+        pending requests with NetError.
+        """
+        if not self._running:
+            return
+        self._running = False
+        self.is_connected = False
+
+        tasks = [t for t in (self._hb_task, *self._handler_tasks) if t]
+        tasks += [p.task for p in self._peers.values() if p.task]
+        current = asyncio.current_task()
+        tasks = [t for t in tasks if t is not current]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._handler_tasks.clear()
+
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+        for peer in list(self._peers.values()):
+            await self._close_writer(peer.writer)
+        self._peers.clear()
+
+        self._fail_pending(NetError("Connection closed"))
+
+    # --------------------------------------------------------------------- #
+    #  Public API – messaging
+    # --------------------------------------------------------------------- #
+    async def send(self, data: Dict[str, Any], to_peer: Optional[int] = None) -> None:
+        """
+        Send a dictionary.
+
+        Host   -> broadcast if to_peer is None, else unicast to that peer id
+        Client -> send to the server
+        """
+        if to_peer is not None:
+            peer = self._peers.get(to_peer)
+            if peer is None:
+                raise NetError(f"Unknown peer id: {to_peer}")
+            targets = [peer]
+        else:
+            targets = list(self._peers.values())
+        encoded: Dict[str, bytes] = {}      # encode once per codec
+        for peer in targets:
+            raw = encoded.get(peer.codec.name)
+            if raw is None:
+                raw = encoded[peer.codec.name] = frame(peer.codec.encode(data), self.framing)
+            try:
+                peer.writer.write(raw)
+                await peer.writer.drain()
+            except (ConnectionError, OSError):
+                await self._drop(peer)
+
+    # --------------------------------------------------------------------- #
+    #  Public API – RPC
+    # --------------------------------------------------------------------- #
+    async def request(self,
+                      data: Dict[str, Any],
+                      timeout: Optional[float] = None,
+                      request_type: str = "rpc_request",
+                      to_peer: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Await an RPC call.
+
+        Raises
+        ------
+        ValueError
+            Host with multiple clients but no to_peer
+        TimeoutError
+            Response not received in time
+        NetError
+            Connection lost before the response arrived
+        """
+        if timeout is None:
+            timeout = self._default_timeout
+        if self.is_host and len(self._peers) > 1 and to_peer is None:
+            raise ValueError("Host with multiple clients must specify to_peer")
+
+        request_id = str(uuid.uuid4())
+        future = asyncio.get_running_loop().create_future()
+        self._pending_requests[request_id] = future
+        try:
+            await self.send(
+                {"type": request_type, "request_id": request_id, "payload": data},
+                to_peer=to_peer,
+            )
+            try:
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Request timeout after {timeout} seconds") from None
+        finally:
+            self._pending_requests.pop(request_id, None)
+
+    def register_handler(self, request_type: str, handler: Handler) -> None:
+        """
+        Register a handler for incoming RPC requests.
+
+        `handler(payload)` may return a dict or an awaitable resolving to one.
+        """
+        self._request_handlers[request_type] = handler
+
+    def set_default_timeout(self, timeout: float) -> None:
+        """Change the default RPC timeout (seconds)."""
+        self._default_timeout = timeout
+
+    def get_peer_count(self) -> int:
+        """Return the number of open connections."""
+        return len(self._peers)
+
+    # --------------------------------------------------------------------- #
+    #  Private – connections
+    # --------------------------------------------------------------------- #
+    async def _on_accept(self, reader: asyncio.StreamReader,
+                         writer: asyncio.StreamWriter) -> None:
+        peer = self._register(reader, writer)
+        log.info("客户端已连接: %s", writer.get_extra_info('peername'))
+        if self.on_peer_connected:
+            await _maybe_await(self.on_peer_connected(peer.peer_id))
+
+    def _register(self, reader: asyncio.StreamReader,
+                  writer: asyncio.StreamWriter) -> _Peer:
+        peer = _Peer(self._next_peer_id, reader, writer,
+                     asyncio.get_running_loop().time())
+        self._next_peer_id += 1
+        self._peers[peer.peer_id] = peer
+        peer.task = asyncio.create_task(self._recv_loop(peer))
+        return peer
+
+    async def _read_message(self, reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+        """Return the next message, or None on EOF."""
+        try:
+            if self.framing == FRAMING_LENGTH:
+                header = await reader.readexactly(FRAME_HEADER.size)
+                (length,) = FRAME_HEADER.unpack(header)
+                if length > MAX_FRAME_SIZE:
+                    raise NetError(f"Frame too large: {length} bytes")
+                return decode_body(await reader.readexactly(length))
+            while True:
+                line = await reader.readuntil(b"\n")
+                if len(line) > 1:
+                    return decode_body(line)
+        except asyncio.IncompleteReadError:
+            return None
+
+    async def _recv_loop(self, peer: _Peer) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while self._running:
+                msg = await self._read_message(peer.reader)
+                if msg is None:
+                    log.info("%s 断开连接", peer.info)
+                    break
+                peer.last_seen = loop.time()
+                await self._dispatch(msg, peer)
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            log.warning("%s 接收错误: %s", peer.info, e)
+        await self._drop(peer)
+
+    async def _drop(self, peer: _Peer) -> None:
+        """Forget a connection and notify the application."""
+        if self._peers.pop(peer.peer_id, None) is None:
+            return
+        if peer.task and peer.task is not asyncio.current_task():
+            peer.task.cancel()
+        await self._close_writer(peer.writer)
+        if not self.is_host:
+            self._running = False
+            self.is_connected = False
+            self._fail_pending(NetError("Connection lost while waiting for response"))
+        if not self._peers and self.on_disconnect:
+            await _maybe_await(self.on_disconnect())
+
+    @staticmethod
+    async def _close_writer(writer: asyncio.StreamWriter) -> None:
+        try:
+            writer.close()
+            await writer.wait_closed()
+        except Exception:
+            pass
+
+    def _fail_pending(self, exc: Exception) -> None:
+        for future in self._pending_requests.values():
+            if not future.done():
+                future.set_exception(exc)
+        self._pending_requests.clear()
+
+    # --------------------------------------------------------------------- #
+    #  Private – dispatch & RPC
+    # --------------------------------------------------------------------- #
+    async def _dispatch(self, msg: Dict[str, Any], peer: _Peer) -> None:
+        msg_type = msg.get("type", "")
+        request_id = msg.get("request_id")
+
+        if msg_type == MSG_HELLO:
+            chosen = negotiate(msg.get("codecs", []), self.codecs, self.framing)
+            if self.is_host:
+                await self.send({"type": MSG_HELLO_ACK, "codec": chosen}, to_peer=peer.peer_id)
+            peer.codec = get_codec(chosen)
+            return
+        if msg_type == MSG_HELLO_ACK:
+            peer.codec = get_codec(msg.get("codec", CODEC_JSON))
+            return
+        if msg_type == "rpc_response" and request_id:
+            future = self._pending_requests.get(request_id)
+            if future and not future.done():
+                future.set_result(msg.get("payload", {}))
+            return
+        if msg_type in self._request_handlers and request_id:
+            task = asyncio.create_task(
+                self._handle_rpc_request(msg_type, request_id, msg.get("payload", {}), peer)
+            )
+            self._handler_tasks.add(task)
+            task.add_done_callback(self._handler_tasks.discard)
+            return
+        if msg_type in ("ping", "pong"):
+            return                      # liveness already refreshed by reader
+        if self.on_message:
+            await _maybe_await(self.on_message(msg))
+
+    async def _handle_rpc_request(self, request_type: str, request_id: str,
+                                  payload: Dict[str, Any], peer: _Peer) -> None:
+        handler = self._request_handlers[request_type]
+        try:
+            response_payload = await _maybe_await(handler(payload))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            response_payload = {"error": str(e), "status": "error"}
+        if peer.peer_id in self._peers:
+            await self.send(
+                {"type": "rpc_response", "request_id": request_id, "payload": response_payload},
+                to_peer=peer.peer_id,
+            )
+
+    # --------------------------------------------------------------------- #
+    #  Private – heart-beating
+    # --------------------------------------------------------------------- #
+    async def _heartbeat_loop(self) -> None:
+        """Send periodic pings (host) / pongs (client) and enforce timeout."""
+        loop = asyncio.get_running_loop()
+        beat = {"type": "ping" if self.is_host else "pong"}
+        try:
+            while self._running:
+                await asyncio.sleep(self._hb_interval)
+                await self.send(beat)
+                now = loop.time()
+                for peer in list(self._peers.values()):
+                    if now - peer.last_seen > self._hb_timeout:
+                        log.warning("%s 心跳超时", peer.info)
+                        await self._drop(peer)
+        except asyncio.CancelledError:
+            pass
+
+
+async def _maybe_await(value: Any) -> Any:
+    """Await `value` if it is awaitable (lets callbacks be sync or async)."""
+    if inspect.isawaitable(value):
+        return await value
+    return value
@@ -9,15 +9,27 @@ NEW FEATURES
 ------------
 * Bidirectional RPC: request() / register_handler() style calls
 * Asynchronous Future mechanism with timeout & exception propagation
+* Pipelined calls: request_async() / request_many(), deadlines kept by one
+  shared scheduler thread
+* Optional handler thread pool with per-peer ordering and latency histograms
 * Directed requests for multi-client hosts (to_socket / request_to_peer)
 * Thread-safe, callbacks and RPC handlers coexist
 * Compatible with legacy heartbeat, disconnection detection and clean shutdown
+* Heartbeats driven by the shared timing wheel: one timer per peer, any
+  received frame counts as liveness, pings skipped while traffic flows
+* Selectable wire framing: newline-delimited JSON (legacy) or length-prefixed
+* Optional single-threaded selectors reactor for hosts with many clients
+* Codec handshake after connect: compact binary bodies, JSON fallback
+* Per-socket outbound queues: one writer per socket, coalesced writes,
+  bounded queues with a backpressure policy (a host evicts a peer whose
+  full queue holds a broadcast up for block_timeout), TCP_NODELAY control
 
 Author: <your-name>
 """
 
 from __future__ import annotations
 
+import logging
 import socket
 import threading
 import time
@@ -28,7 +40,18 @@ from concurrent.futures import Future
 # --------------------------------------------------------------------------- #
 #  Utility layer – replace with your own if needed
 # --------------------------------------------------------------------------- #
-from .utils import pack, unpack   # noqa: F401
+from .utils import (   # noqa: F401
+    pack, unpack, make_reader, frame, FRAMING_LINE,
+    Codec, JSON_CODEC, CODEC_JSON, MSG_HELLO, MSG_HELLO_ACK,
+    check_codecs, default_codecs, get_codec, negotiate,
+)
+from .reactor import HostReactor
+from .outbound import SendQueue, OutboundWriter, POLICY_BLOCK, DEFAULT_BLOCK_TIMEOUT
+from .timers import TimerHandle, get_scheduler
+from .dispatch import HandlerPool, LatencyHistogram, timed
+from src.log import get_logger
+
+log = get_logger("network")
 
 
 class NetError(Exception):
@@ -49,6 +72,8 @@ class Network:
     RPC:
         register_handler(request_type, handler)
         request(data, timeout=5, to_socket=?) -> dict
+        request_async(data, ...) -> Future
+        request_many([data, ...], ...) -> list
     """
 
     # --------------------------------------------------------------------- #
@@ -59,6 +84,15 @@ class Network:
         is_host: bool = False,
         host_ip: str = "0.0.0.0",
         port: int = 5555,
+        framing: str = FRAMING_LINE,
+        reactor: bool = False,
+        codecs: Optional[List[str]] = None,
+        nodelay: Optional[bool] = True,
+        send_queue_size: int = 1024,
+        backpressure: str = POLICY_BLOCK,
+        block_timeout: Optional[float] = DEFAULT_BLOCK_TIMEOUT,
+        handler_workers: int = 0,
+        max_in_flight_per_peer: int = 64,
     ) -> None:
         """
         Parameters
@@ -70,13 +104,65 @@ class Network:
             Local interface to bind (Host only)
         port : int
             TCP port to bind/connect
+        framing : str
+            "line"   -> newline-delimited JSON, compatible with old peers
+            "length" -> 4-byte length header + message body
+            Both peers must use the same mode.
+        reactor : bool
+            Host only: serve every client from one selectors-based thread
+            instead of one receive thread per client.
+        codecs : list[str], optional
+            Body codecs we accept, best first. Defaults to
+            ["compact1", "json"] with length framing and ["json"] otherwise.
+            The client offers this list in a "hello" right after connect();
+            the host answers with its pick. Peers that never answer keep JSON.
+            "compact1" bodies may contain a newline, so listing it with line
+            framing raises ValueError.
+        nodelay : bool or None
+            Set TCP_NODELAY on every connection. Small frames are already
+            coalesced by the send queue, so Nagle only adds latency.
+            None leaves the OS default.
+        send_queue_size : int
+            Frames a socket may have queued before `backpressure` applies.
+        backpressure : str
+            "block" (default), "drop_heartbeat" or "evict"; see outbound.py
+        block_timeout : float or None
+            Host only, policy "block": a broadcast waits at most this long
+            for room in a peer's full queue, then that peer is evicted as a
+            slow consumer, so one slow reader cannot stall sends to every
+            other peer. None waits indefinitely. A client has a single peer
+            and always waits.
+        handler_workers : int
+            0 -> RPC handlers run inline on the receive thread (default).
+            >0 -> handlers run on a pool of this many threads; requests from
+            one peer still run in arrival order unless the handler was
+            registered with concurrent=True.
+        max_in_flight_per_peer : int
+            Pool mode only: requests a peer may have queued or running;
+            further requests are answered with an error immediately.
         """
         self.is_host = is_host
         self.host_ip, self.port = host_ip, port
+        self.framing = framing
+        self.use_reactor = reactor
+        self.codecs = check_codecs(codecs, framing)
+        self._send_codecs: Dict[socket.socket, Codec] = {}   # per-socket negotiated codec
+
+        # Outbound: one SendQueue (+ writer thread unless reactor) per socket
+        self.nodelay = nodelay
+        self.send_queue_size = send_queue_size
+        self.backpressure = backpressure
+        self.block_timeout = block_timeout
+        self._queues: Dict[socket.socket, SendQueue] = {}
+        self._writers: Dict[socket.socket, OutboundWriter] = {}
 
         # Socket & threading
         self._main_sock: Optional[socket.socket] = None
-        self._peers: List[socket.socket] = []      # Host only: connected clients
+        self._peers: Dict[int, socket.socket] = {}      # Host only: peer id -> client socket
+        self._peer_ids: Dict[socket.socket, int] = {}   # Host only: client socket -> peer id
+        self._next_peer_id = 1
+        self._peers_lock = threading.Lock()
+        self._reactor: Optional[HostReactor] = None
         self._running = False
 
         # Callbacks – injected by application
@@ -84,16 +170,23 @@ class Network:
         self.on_disconnect: Optional[Callable[[], None]] = None
 
         # Heart-beating
-        self._last_seen: Dict[socket.socket, float] = {}  # sock -> timestamp
+        self._last_seen: Dict[socket.socket, float] = {}  # sock -> last frame received
+        self._last_sent: Dict[socket.socket, float] = {}  # sock -> last frame queued
+        self._last_ping: Dict[socket.socket, float] = {}  # sock -> last ping/pong queued
+        self._hb_timers: Dict[socket.socket, TimerHandle] = {}
         self._hb_interval = 2.0      # seconds
         self._hb_timeout = 6.0       # seconds
-        self._hb_thread: Optional[threading.Thread] = None
 
         # RPC
         self._pending_requests: Dict[str, Future] = {}
         self._request_handlers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {}
         self._rpc_lock = threading.Lock()
         self._default_timeout = 5.0
+        self._concurrent_handlers: set = set()
+        self._handler_latency: Dict[str, LatencyHistogram] = {}
+        self._handler_pool: Optional[HandlerPool] = (
+            HandlerPool(handler_workers, max_in_flight_per_peer) if handler_workers > 0 else None
+        )
 
         self.on_connected: Optional[Callable[[], None]] = None
         self.on_peer_connected: Optional[Callable[[int], None]] = None
@@ -149,6 +242,18 @@ class Network:
             return
         self._running = False
 
+        # Reactor owns the listening socket and every peer socket
+        if self._reactor:
+            self._reactor.stop()
+            self._reactor = None
+            self._main_sock = None
+
+        # Let writers flush what is already queued
+        for q in list(self._queues.values()):
+            q.close()
+        for w in list(self._writers.values()):
+            w.join(timeout=0.2)
+
         # Shutdown main socket
         if self._main_sock:
             try:
@@ -162,12 +267,15 @@ class Network:
             self._main_sock = None
 
         # Shutdown peer sockets
-        for s in self._peers[:]:
+        for s in list(self._peers.values()):
             try:
                 s.shutdown(socket.SHUT_RDWR)
             except Exception:
                 pass
 
+        if self._handler_pool:
+            self._handler_pool.shutdown()
+
         # Cancel pending RPC futures
         with self._rpc_lock:
             for rid, fut in list(self._pending_requests.items()):
@@ -175,25 +283,29 @@ class Network:
                     fut.set_exception(NetError("Connection closed"))
             self._pending_requests.clear()
 
-        # Wait for heartbeat thread
-        if self._hb_thread and self._hb_thread.is_alive() and \
-           self._hb_thread != threading.current_thread():
-            self._hb_thread.join(timeout=0.5)
+        # Stop heartbeat timers
+        for handle in list(self._hb_timers.values()):
+            handle.cancel()
+        self._hb_timers.clear()
 
         # Close peers
-        for s in self._peers:
+        for s in list(self._peers.values()):
             try:
                 s.close()
             except Exception:
                 pass
-        self._peers.clear()
+        with self._peers_lock:
+            self._peers.clear()
+            self._peer_ids.clear()
+        self._queues.clear()
+        self._writers.clear()
 
     # --------------------------------------------------------------------- #
     #  Public API – messaging
     # --------------------------------------------------------------------- #
     def send(self, data: Dict[str, Any], to_socket: Optional[socket.socket] = None) -> None:
         """
-        Send a dictionary (will be JSON-encoded).
+        Queue a dictionary for sending (encoded with the negotiated codec).
 
         Behaviour
         ---------
@@ -201,6 +313,9 @@ class Network:
                  else send to the specified client
         Client-> send to the single server peer
 
+        Returns once the frame is queued; the socket's writer flushes it.
+        A full queue blocks, drops or evicts according to `backpressure`.
+
         Parameters
         ----------
         data : dict
@@ -208,22 +323,21 @@ class Network:
         to_socket : socket, optional
             Host only: target client socket for unicast
         """
-        raw = pack(data)
+        heartbeat = data.get("type") in ("ping", "pong")
         if self.is_host:
             if to_socket:
-                try:
-                    to_socket.sendall(raw)
-                except Exception:
-                    self._remove_peer(to_socket)
+                self._send_raw(to_socket, self._pack(data, to_socket), heartbeat)
             else:
-                for s in self._peers[:]:
-                    try:
-                        s.sendall(raw)
-                    except Exception:
-                        self._remove_peer(s)
+                encoded: Dict[str, bytes] = {}      # encode once per codec
+                for s in list(self._peers.values()):
+                    codec = self._send_codecs.get(s, JSON_CODEC)
+                    raw = encoded.get(codec.name)
+                    if raw is None:
+                        raw = encoded[codec.name] = frame(codec.encode(data), self.framing)
+                    self._send_raw(s, raw, heartbeat)
         else:
             if self._main_sock:
-                self._main_sock.sendall(raw)
+                self._send_raw(self._main_sock, self._pack(data, self._main_sock), heartbeat)
 
     # --------------------------------------------------------------------- #
     #  Public API – RPC
@@ -235,7 +349,7 @@ class Network:
                 send_request: bool = True,
                 to_socket: Optional[socket.socket] = None) -> Dict[str, Any]:
         """
-        Perform a synchronous RPC call.
+        Perform a synchronous RPC call (request_async() + wait).
 
         Parameters
         ----------
@@ -262,34 +376,99 @@ class Network:
         NetError
             Network or serialization error
         """
-        if timeout is None:
-            timeout = self._default_timeout
+        future = self.request_async(data, timeout, request_type, to_socket,
+                                    send_request=send_request)
+        try:
+            return future.result()
+        except (TimeoutError, NetError):
+            raise
+        except Exception as e:
+            raise NetError(f"Request failed: {e}")
 
-        if self.is_host and len(self._peers) > 1 and to_socket is None:
-            raise ValueError("Host with multiple clients must specify to_socket")
+    def request_async(self,
+                      data: Dict[str, Any],
+                      timeout: Optional[float] = None,
+                      request_type: str = "rpc_request",
+                      to_socket: Optional[socket.socket] = None,
+                      callback: Optional[Callable[[Future], None]] = None,
+                      send_request: bool = True) -> Future:
+        """
+        Start an RPC call and return immediately.
 
-        request_id = str(uuid.uuid4())
-        future = Future()
+        Any number of calls may be in flight at once; the timeout is
+        enforced by the process-wide deadline scheduler, not by a waiting
+        thread.
 
-        with self._rpc_lock:
-            self._pending_requests[request_id] = future
+        Parameters
+        ----------
+        callback : callable(future), optional
+            Attached with Future.add_done_callback; runs on the receive
+            thread (response), the scheduler thread (timeout) or the
+            caller's thread (already failed).
 
+        Returns
+        -------
+        concurrent.futures.Future
+            Resolves to the remote handler's payload, or raises
+            TimeoutError / NetError.
 
-        try:
-            if send_request:
-                self.send(data, to_socket=to_socket)
+        Raises
+        ------
+        ValueError
+            Host with multiple clients but no to_socket
+        """
+        target = self._rpc_target(to_socket)
+        future, raw = self._prepare_request(data, timeout, request_type, target)
+        if callback:
+            future.add_done_callback(callback)
+        if send_request:
+            self._send_request_frames(target, raw, [future])
+        return future
+
+    def request_many(self,
+                     payloads: List[Dict[str, Any]],
+                     timeout: Optional[float] = None,
+                     request_type: str = "rpc_request",
+                     to_socket: Optional[socket.socket] = None,
+                     return_exceptions: bool = False) -> List[Any]:
+        """
+        Send several requests in one flush and gather their results.
+
+        All requests share one deadline (`timeout` from now) and are
+        written to the socket as a single coalesced frame batch.
+
+        Parameters
+        ----------
+        payloads : list[dict]
+            One payload per request, all for the same `request_type`
+        return_exceptions : bool
+            True  -> failed calls appear as exception objects in the result
+            False -> the first failure (in payload order) is raised
+
+        Returns
+        -------
+        list
+            Results in the same order as `payloads`
+        """
+        target = self._rpc_target(to_socket)
+        futures: List[Future] = []
+        frames: List[bytes] = []
+        for data in payloads:
+            future, raw = self._prepare_request(data, timeout, request_type, target)
+            futures.append(future)
+            frames.append(raw)
+        if frames:
+            self._send_request_frames(target, b"".join(frames), futures)
+
+        results: List[Any] = []
+        for future in futures:
             try:
-                return future.result(timeout=timeout)
-            except TimeoutError:
-                with self._rpc_lock:
-                    self._pending_requests.pop(request_id, None)
-                raise TimeoutError(f"Request timeout after {timeout} seconds")
-        except Exception as e:
-            with self._rpc_lock:
-                self._pending_requests.pop(request_id, None)
-            if isinstance(e, (TimeoutError, ValueError)):
-                raise
-            raise NetError(f"Request failed: {e}")
+                results.append(future.result())
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
 
     def request_to_peer(self,
                         data: Dict[str, Any],
@@ -302,7 +481,7 @@ class Network:
         Parameters
         ----------
         peer_index : int
-            Index inside self._peers list
+            Position among connected peers, in connection order
 
         Raises
         ------
@@ -315,11 +494,13 @@ class Network:
             raise NetError("Client cannot use request_to_peer()")
         if peer_index >= len(self._peers):
             raise ValueError(f"Peer index {peer_index} out of range (total: {len(self._peers)})")
-        return self.request(data, timeout, request_type, self._peers[peer_index])
+        sock = list(self._peers.values())[peer_index]
+        return self.request(data, timeout, request_type, to_socket=sock)
 
     def register_handler(self,
                          request_type: str,
-                         handler: Callable[[Dict[str, Any]], Dict[str, Any]]) -> None:
+                         handler: Callable[[Dict[str, Any]], Dict[str, Any]],
+                         concurrent: bool = False) -> None:
         """
         Register a handler for incoming RPC requests.
 
@@ -329,8 +510,29 @@ class Network:
             The "type" field value that maps to this handler
         handler : callable(payload: dict) -> dict
             Business logic; return value will be sent back as payload
+        concurrent : bool
+            Handler pool only: the handler is safe to run in parallel with
+            other requests from the same peer, so it skips the peer's
+            ordered lane.
         """
         self._request_handlers[request_type] = handler
+        self._handler_latency.setdefault(request_type, LatencyHistogram())
+        if concurrent:
+            self._concurrent_handlers.add(request_type)
+        else:
+            self._concurrent_handlers.discard(request_type)
+
+    def get_handler_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Latency histogram per registered request type.
+
+        Returns
+        -------
+        dict
+            request_type -> {"count", "mean", "max", "p50", "p90", "p99",
+            "buckets_ms"}; times in seconds
+        """
+        return {name: h.stats() for name, h in self._handler_latency.items()}
 
     def set_default_timeout(self, timeout: float) -> None:
         """
@@ -356,6 +558,36 @@ class Network:
             raise NetError("Only host can get peer count")
         return len(self._peers)
 
+    def get_send_stats(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Outbound queue counters per connection.
+
+        Returns
+        -------
+        dict
+            peer id -> SendQueue.stats() (Host), or {0: stats} for the
+            server connection (Client). Includes current/max queue depth,
+            dropped frames and flush latency in seconds.
+        """
+        if self.is_host:
+            return {pid: self._queues[s].stats()
+                    for pid, s in list(self._peers.items()) if s in self._queues}
+        q = self._queues.get(self._main_sock)
+        return {0: q.stats()} if q else {}
+
+    def get_peer_id(self, sock: socket.socket) -> Optional[int]:
+        """
+        Return the stable integer id of a connected client socket.
+
+        Ids are assigned on accept, never reused, and stay valid until the
+        peer disconnects.
+        """
+        return self._peer_ids.get(sock)
+
+    def get_peer_socket(self, peer_id: int) -> Optional[socket.socket]:
+        """Return the client socket for a peer id, or None if it is gone."""
+        return self._peers.get(peer_id)
+
     # --------------------------------------------------------------------- #
     #  Private – Host initialisation
     # --------------------------------------------------------------------- #
@@ -365,15 +597,17 @@ class Network:
         self._main_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._main_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self._main_sock.bind((self.host_ip, self.port))
-        self._main_sock.listen(5)
 
-        # Accept thread
-        acc_thread = threading.Thread(target=self._accept_loop, daemon=True)
-        acc_thread.start()
-
-        # Heart-beat thread
-        self._hb_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
-        self._hb_thread.start()
+        if self.use_reactor:
+            # Single thread: accept + receive + write for every client
+            self._main_sock.listen(socket.SOMAXCONN)
+            self._reactor = HostReactor(self, self._main_sock)
+            self._reactor.start()
+        else:
+            self._main_sock.listen(5)
+            # Accept thread
+            acc_thread = threading.Thread(target=self._accept_loop, daemon=True)
+            acc_thread.start()
 
         self.is_connected = True
         if self.on_connected:
@@ -383,7 +617,7 @@ class Network:
     #  Private – Client initialisation
     # --------------------------------------------------------------------- #
     def _start_client(self) -> None:
-        """Connect to remote host and spawn receiver & heartbeat threads."""
+        """Connect to remote host, spawn the receiver and arm the heartbeat."""
         self._running = True
         self._main_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._main_sock.settimeout(10)          # connect timeout
@@ -393,6 +627,8 @@ class Network:
             raise NetError(f"Connection failed: {e}") from e
         self._main_sock.settimeout(None)        # back to blocking
         self._server_socket = self._main_sock   # keep reference for heartbeat
+        self._open_outbound(self._main_sock)
+        self._arm_heartbeat(self._main_sock)
 
         # Receiver thread
         recv_thread = threading.Thread(
@@ -400,9 +636,9 @@ class Network:
         )
         recv_thread.start()
 
-        # Heart-beat thread
-        self._hb_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
-        self._hb_thread.start()
+        # Offer our codecs; until the host answers we keep sending JSON
+        if self.codecs != [CODEC_JSON]:
+            self.send({"type": MSG_HELLO, "codecs": self.codecs})
 
         self.is_connected = True
         if self.on_connected:
@@ -417,89 +653,137 @@ class Network:
         while self._running:
             try:
                 conn, addr = self._main_sock.accept()
-                self._peers.append(conn)
-                self._last_seen[conn] = time.time()
-                
-                print(f"客户端已连接: {addr}")
-                if hasattr(self, 'on_peer_connected') and self.on_peer_connected:
-                    self.on_peer_connected(len(self._peers))  # 传入客户端数量
+                self._add_peer(conn, addr)
                 
                 threading.Thread(
                     target=self._recv_loop, args=(conn, False), daemon=True
                 ).start()
             except Exception as e:
-                print(f"接受客户端连接时出错: {e}")
+                if self._running:
+                    log.warning("接受客户端连接时出错: %s", e)
 
 
     # --------------------------------------------------------------------- #
-    #  Private – remove dead peer (Host only)
+    #  Private – peer registry (Host only)
     # --------------------------------------------------------------------- #
+    def _add_peer(self, conn: socket.socket, addr: Any) -> int:
+        """Register a freshly accepted client and return its peer id."""
+        with self._peers_lock:
+            peer_id = self._next_peer_id
+            self._next_peer_id += 1
+            self._peers[peer_id] = conn
+            self._peer_ids[conn] = peer_id
+        self._open_outbound(conn)
+        self._arm_heartbeat(conn)
+
+        log.info("客户端已连接: %s", addr)
+        if hasattr(self, 'on_peer_connected') and self.on_peer_connected:
+            self.on_peer_connected(len(self._peers))  # 传入客户端数量
+        return peer_id
+
     def _remove_peer(self, sock: socket.socket) -> None:
         """Clean up a disconnected client socket."""
-        if sock in self._peers:
-            self._peers.remove(sock)
-        self._last_seen.pop(sock, None)
+        if self._reactor:
+            # The reactor thread owns the socket; it calls _forget_peer
+            self._reactor.drop(sock)
+            return
+        self._forget_peer(sock)
+
+    def _forget_peer(self, sock: socket.socket) -> None:
+        """Drop a client from the registry and close its socket."""
+        with self._peers_lock:
+            peer_id = self._peer_ids.pop(sock, None)
+            if peer_id is not None:
+                self._peers.pop(peer_id, None)
+        self._disarm_heartbeat(sock)
+        self._send_codecs.pop(sock, None)
+        self._close_outbound(sock)
+        try:
+            sock.shutdown(socket.SHUT_RDWR)   # wake a blocked receive loop
+        except OSError:
+            pass
         sock.close()
         # If no clients left, notify application
-        if self.is_host and not self._peers and self.on_disconnect:
+        if self.is_host and peer_id is not None and not self._peers and self.on_disconnect:
             self.on_disconnect()
 
+    # --------------------------------------------------------------------- #
+    #  Private – outbound queues (Host & Client)
+    # --------------------------------------------------------------------- #
+    def _open_outbound(self, sock: socket.socket) -> None:
+        """Create the socket's SendQueue and, in threaded mode, its writer."""
+        if self.nodelay is not None:
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(self.nodelay))
+            except OSError:
+                pass
+        queue = SendQueue(
+            max_frames=self.send_queue_size,
+            policy=self.backpressure,
+            on_evict=lambda: self._on_write_error(sock),
+            block_timeout=self.block_timeout if self.is_host else None,
+        )
+        self._queues[sock] = queue
+        if self._reactor is None:
+            writer = OutboundWriter(sock, queue, on_error=self._on_write_error)
+            self._writers[sock] = writer
+            writer.start()
+
+    def _close_outbound(self, sock: socket.socket) -> None:
+        queue = self._queues.pop(sock, None)
+        if queue:
+            queue.close()
+        self._writers.pop(sock, None)
+
+    def _on_write_error(self, sock: socket.socket) -> None:
+        """Writer failed or the peer was evicted as a slow consumer."""
+        if self.is_host:
+            self._remove_peer(sock)
+            return
+        try:
+            sock.shutdown(socket.SHUT_RDWR)   # receive loop notices and cleans up
+        except Exception:
+            pass
+
+    def _send_raw(self, sock: socket.socket, raw: bytes, heartbeat: bool = False) -> None:
+        """Queue already packed bytes for one socket."""
+        self._last_sent[sock] = time.monotonic()
+        if self._reactor:
+            self._reactor.write(sock, raw, heartbeat)
+            return
+        queue = self._queues.get(sock)
+        if queue is not None:
+            queue.put(raw, heartbeat)
+
     # --------------------------------------------------------------------- #
     #  Private – receiver loop (Host & Client)
     # --------------------------------------------------------------------- #
     
     def _recv_loop(self, sock: socket.socket, is_client_me: bool) -> None:
-        """Parse newline-delimited JSON and dispatch messages."""
-        buffer = ""
+        """Parse framed JSON (see self.framing) and dispatch messages."""
+        reader = make_reader(self.framing)
         peer_info = "Client" if is_client_me else f"Peer {sock.getpeername() if sock else '?'}"
         
         while self._running:
             try:
-                data = sock.recv(4096).decode("utf-8")
-                if not data: # peer shutdown
-                    print(f"[Network] {peer_info} 断开连接")
+                if not reader.recv_from(sock): # peer shutdown
+                    log.info("%s 断开连接", peer_info)
                     break
                 
-                buffer += data
-                while "\n" in buffer:
-                    line, buffer = buffer.split("\n", 1)
-                    msg = unpack(line)
-                    
-                    msg_type = msg.get("type", "unknown")
-                    if msg_type in ["ping", "pong"]:
-                        print(f"[Network RX] {peer_info} <- HEARTBEAT({msg_type})")
-                    else:
-                        print(f"[Network RX] {peer_info} <- {msg}")
-                    
-                    # RPC messages are processed first
-                    if self._handle_rpc_message(msg, sock):
-                        continue
-                    
-                    # Heart-beat packets – handled internally
-                    if msg.get("type") == "ping":
-                        self._last_seen[sock] = time.time()
-                        continue
-                    
-                    if msg.get("type") == "pong":
-                        self._last_seen[sock] = time.time()
-                        continue
-                    
-                    # Business packet – forward to application
-                    if self.on_message:
-                        print(f"[Network] 调用 on_message 回调，消息类型: {msg_type}")
-                        self.on_message(msg)
-                    else:
-                        print(f"[Network] 警告: on_message 回调未设置!")
+                for msg in reader.messages():
+                    self._dispatch(msg, sock, peer_info)
             
             except Exception as e:
-                print(f"[Network] {peer_info} 接收错误: {e}")
+                log.warning("%s 接收错误: %s", peer_info, e)
                 break
         
         # Peer lost – clean up
-        print(f"[Network] {peer_info} 连接已关闭，进行清理...")
+        log.info("%s 连接已关闭，进行清理...", peer_info)
         
         if is_client_me:
             self._running = False
+            self._disarm_heartbeat(sock)
+            self._close_outbound(sock)
             # Cancel pending RPCs on client side
             with self._rpc_lock:
                 for request_id, future in list(self._pending_requests.items()):
@@ -513,6 +797,54 @@ class Network:
             self._remove_peer(sock)
 
 
+    def _dispatch(self, msg: Dict[str, Any], sock: socket.socket, peer_info: str) -> None:
+        """Route one decoded message: RPC, heartbeat or application."""
+        msg_type = msg.get("type", "unknown")
+        self._last_seen[sock] = time.monotonic()     # any frame proves liveness
+        if log.isEnabledFor(logging.DEBUG):
+            if msg_type in ("ping", "pong"):
+                log.debug("RX %s <- HEARTBEAT(%s)", peer_info, msg_type)
+            else:
+                log.debug("RX %s <- %s", peer_info, msg)
+        
+        # Codec handshake
+        if msg_type == MSG_HELLO:
+            self._on_hello(msg, sock)
+            return
+        if msg_type == MSG_HELLO_ACK:
+            self._send_codecs[sock] = get_codec(msg.get("codec", CODEC_JSON))
+            return
+        
+        # RPC messages are processed first
+        if self._handle_rpc_message(msg, sock):
+            return
+        
+        # Heart-beat packets – handled internally
+        if msg_type in ("ping", "pong"):
+            return
+        
+        # Business packet – forward to application
+        if self.on_message:
+            log.debug("调用 on_message 回调，消息类型: %s", msg_type)
+            self.on_message(msg)
+        else:
+            log.warning("on_message 回调未设置! 丢弃消息类型: %s", msg_type)
+
+    # --------------------------------------------------------------------- #
+    #  Private – codec handshake
+    # --------------------------------------------------------------------- #
+    def _pack(self, data: Dict[str, Any], sock: Optional[socket.socket]) -> bytes:
+        """Encode with the codec negotiated for `sock` and frame the body."""
+        codec = self._send_codecs.get(sock, JSON_CODEC)
+        return frame(codec.encode(data), self.framing)
+
+    def _on_hello(self, msg: Dict[str, Any], sock: socket.socket) -> None:
+        """Host side: pick a codec, answer in JSON, then switch to it."""
+        chosen = negotiate(msg.get("codecs", []), self.codecs, self.framing)
+        if self.is_host:
+            self._send_raw(sock, self._pack({"type": MSG_HELLO_ACK, "codec": chosen}, sock))
+        self._send_codecs[sock] = get_codec(chosen)
+
     # --------------------------------------------------------------------- #
     #  Private – RPC internals
     # --------------------------------------------------------------------- #
@@ -529,17 +861,86 @@ class Network:
         elif msg_type in self._request_handlers:
             request_id = msg.get("request_id")
             if request_id:
-                self._handle_rpc_request(msg_type, request_id, msg.get("payload", {}), sock)
+                payload = msg.get("payload", {})
+                if self._handler_pool is None:
+                    self._handle_rpc_request(msg_type, request_id, payload, sock)
+                elif not self._handler_pool.submit(
+                    sock,
+                    lambda: self._handle_rpc_request(msg_type, request_id, payload, sock),
+                    ordered=msg_type not in self._concurrent_handlers,
+                ):
+                    self._reply(sock, {
+                        "type": "rpc_response",
+                        "request_id": request_id,
+                        "payload": {
+                            "error": "Too many requests in flight",
+                            "status": "error"
+                        }
+                    })
                 return True
         return False
 
+    def _rpc_target(self, to_socket: Optional[socket.socket]) -> Optional[socket.socket]:
+        """Socket an RPC goes to; validates the host's peer selection."""
+        if not self.is_host:
+            return self._main_sock
+        if to_socket is not None:
+            return to_socket
+        if len(self._peers) > 1:
+            raise ValueError("Host with multiple clients must specify to_socket")
+        return next(iter(self._peers.values()), None)
+
+    def _prepare_request(self,
+                         data: Dict[str, Any],
+                         timeout: Optional[float],
+                         request_type: str,
+                         target: Optional[socket.socket]):
+        """Register a pending future + deadline and return it with its frame."""
+        if timeout is None:
+            timeout = self._default_timeout
+        request_id = str(uuid.uuid4())
+        future: Future = Future()
+        with self._rpc_lock:
+            self._pending_requests[request_id] = future
+        timer = get_scheduler().call_later(
+            timeout, lambda: self._expire_request(request_id, timeout)
+        )
+        future.add_done_callback(lambda _f: timer.cancel())
+        msg = {"type": request_type, "request_id": request_id, "payload": data}
+        return future, self._pack(msg, target)
+
+    def _send_request_frames(self,
+                             target: Optional[socket.socket],
+                             raw: bytes,
+                             futures: List[Future]) -> None:
+        """Queue request frames; fail their futures if there is no connection."""
+        if target is None or target not in self._queues:
+            self._fail_requests(futures, NetError("Request failed: not connected"))
+            return
+        self._send_raw(target, raw)
+
+    def _fail_requests(self, futures: List[Future], exc: Exception) -> None:
+        with self._rpc_lock:
+            for rid, fut in list(self._pending_requests.items()):
+                if fut in futures:
+                    del self._pending_requests[rid]
+        for fut in futures:
+            if not fut.done():
+                fut.set_exception(exc)
+
+    def _expire_request(self, request_id: str, timeout: float) -> None:
+        """Deadline scheduler callback: time out a still-pending request."""
+        with self._rpc_lock:
+            future = self._pending_requests.pop(request_id, None)
+        if future and not future.done():
+            future.set_exception(TimeoutError(f"Request timeout after {timeout} seconds"))
+
     def _handle_rpc_response(self, request_id: str, payload: Dict[str, Any]) -> None:
         """Wake up waiting future with response payload."""
         with self._rpc_lock:
-            if request_id in self._pending_requests:
-                future = self._pending_requests[request_id]
-                if not future.done():
-                    future.set_result(payload)
+            future = self._pending_requests.pop(request_id, None)
+        if future and not future.done():
+            future.set_result(payload)
 
     def _handle_rpc_request(self,
                             request_type: str,
@@ -557,20 +958,18 @@ class Network:
                     "status": "error"
                 }
             }
-            try:
-                sock.sendall(pack(error_response))
-            except Exception:
-                pass
+            self._reply(sock, error_response)
             return
 
         try:
-            response_payload = handler(payload)
+            response_payload = timed(self._handler_latency[request_type],
+                                     lambda: handler(payload))
             response_msg = {
                 "type": "rpc_response",
                 "request_id": request_id,
                 "payload": response_payload
             }
-            sock.sendall(pack(response_msg))
+            self._reply(sock, response_msg)
         except Exception as e:
             error_response = {
                 "type": "rpc_response",
@@ -580,38 +979,77 @@ class Network:
                     "status": "error"
                 }
             }
-            try:
-                sock.sendall(pack(error_response))
-            except Exception:
-                pass
+            self._reply(sock, error_response)
+
+    def _reply(self, sock: socket.socket, msg: Dict[str, Any]) -> None:
+        """Send an RPC response back on the socket the request came from."""
+        self._send_raw(sock, self._pack(msg, sock))
 
     # --------------------------------------------------------------------- #
     #  Private – heart-beating (Host & Client)
     # --------------------------------------------------------------------- #
-    def _heartbeat_loop(self) -> None:
-        """Send periodic pings and enforce timeout."""
-        while self._running:
-            time.sleep(self._hb_interval)
-            now = time.time()
+    def _arm_heartbeat(self, sock: socket.socket) -> None:
+        """Start liveness tracking for a socket with one wheel timer."""
+        now = time.monotonic()
+        self._last_seen[sock] = now
+        self._last_sent[sock] = now
+        self._last_ping[sock] = now
+        self._hb_timers[sock] = get_scheduler().call_later(
+            self._hb_interval, lambda: self._heartbeat_due(sock))
+
+    def _disarm_heartbeat(self, sock: socket.socket) -> None:
+        handle = self._hb_timers.pop(sock, None)
+        if handle:
+            handle.cancel()
+        self._last_seen.pop(sock, None)
+        self._last_sent.pop(sock, None)
+        self._last_ping.pop(sock, None)
+
+    def _heartbeat_due(self, sock: socket.socket) -> None:
+        """
+        Scheduler callback for one socket: enforce the timeout, send a
+        ping/pong if needed and re-arm for whichever comes first.
 
+        A ping is skipped while other frames went out within the interval,
+        since the peer counts those as liveness. One is still sent every
+        hb_timeout / 2 so legacy peers, which only refresh on ping/pong,
+        keep the connection.
+        """
+        if not self._running or sock not in self._hb_timers:
+            return
+        now = time.monotonic()
+        if now - self._last_seen.get(sock, now) > self._hb_timeout:
+            log.warning("心跳超时，断开连接 (%.1fs 未收到数据)",
+                        now - self._last_seen.get(sock, now))
+            self._disarm_heartbeat(sock)
             if self.is_host:
-                # Broadcast ping & check client timeouts
-                self.send({"type": "ping"})
-                for s in self._peers[:]:
-                    if now - self._last_seen.get(s, 0) > self._hb_timeout:
-                        self._remove_peer(s)
+                self._remove_peer(sock)
             else:
-                # Send pong & check server timeout
-                self.send({"type": "pong"})
-                if now - self._last_seen.get(self._main_sock, 0) > self._hb_timeout:
-                    self.close()
-                    if self.on_disconnect:
-                        self.on_disconnect()
-                    break
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)   # receive loop cleans up
+                except Exception:
+                    pass
+            return
 
-            # Keep our own timestamp fresh
-            target = self._main_sock if not self.is_host else self._main_sock
-            self._last_seen[target] = now
+        last_ping = self._last_ping.get(sock, now)
+        if (now - self._last_sent.get(sock, now) >= self._hb_interval
+                or now - last_ping >= self._hb_timeout / 2):
+            queue = self._queues.get(sock)
+            # A full queue already has frames waiting; never block this thread
+            if queue is not None and queue.depth() < queue.max_frames:
+                msg = {"type": "ping" if self.is_host else "pong"}
+                self._send_raw(sock, self._pack(msg, sock), heartbeat=True)
+                self._last_ping[sock] = last_ping = now
+
+        next_due = min(
+            self._last_seen.get(sock, now) + self._hb_timeout,
+            self._last_sent.get(sock, now) + self._hb_interval,
+            last_ping + self._hb_timeout / 2,
+        )
+        if sock in self._hb_timers:
+            self._hb_timers[sock] = get_scheduler().call_at(
+                max(next_due, now + get_scheduler().tick),
+                lambda: self._heartbeat_due(sock))
 
 
 # ---------------  Typical Usage Patterns  -------------------------------------
@@ -669,4 +1107,29 @@ try:
     print("3+4=", ans["sum"])
 except Exception as e:
     print("RPC failed:", e)
+
+5. Length-prefixed framing (both peers must agree)
+----------------------------
+host = Network(is_host=True, port=5555, framing="length")
+client = Network(is_host=False, port=5555, framing="length")
+
+6. Host serving many clients from one thread
+----------------------------
+host = Network(is_host=True, port=5555, reactor=True)
+host.on_message = handle
+host.start()
+
+7. Many RPCs in flight
+----------------------------
+fut = client.request_async({"a": 1, "b": 2}, request_type="add")
+sums = client.request_many([{"a": i, "b": i} for i in range(100)], request_type="add")
+print(fut.result()["sum"], [r["sum"] for r in sums])
+
+8. Slow handlers off the receive thread
+----------------------------
+host = Network(is_host=True, port=5555, handler_workers=4)
+host.register_handler("save", save_handler)              # per-peer order kept
+host.register_handler("lookup", lookup_handler, concurrent=True)
+host.start()
+print(host.get_handler_stats()["save"]["p99"])
 """
\ No newline at end of file
@@ -0,0 +1,184 @@
+"""
+RPC handler execution
+---------------------
+By default `Network` runs RPC handlers inline on the receive thread, so a
+slow handler delays everything behind it on that socket – including the
+heartbeats that keep the connection alive. HandlerPool moves handlers to a
+thread pool while keeping the guarantees callers rely on:
+
+* requests from the same peer run one at a time, in arrival order
+  (a per-peer "lane"), unless the handler was registered concurrent-safe;
+* at most `max_in_flight` requests per peer are queued or running; extra
+  requests are rejected instead of piling up;
+* every handler's run time is recorded in a LatencyHistogram.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Hashable, List
+
+from src.log import get_logger
+
+log = get_logger("network.dispatch")
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (bucket bounds in milliseconds)."""
+
+    BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self) -> None:
+        self.counts: List[int] = [0] * (len(self.BOUNDS_MS) + 1)   # last = overflow
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        ms = seconds * 1000.0
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """Upper bucket bound (seconds) below which a fraction `q` of samples fall."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return (self.BOUNDS_MS[i] / 1000.0) if i < len(self.BOUNDS_MS) else self.max
+        return self.max
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(0.50),
+            "p90": self.percentile(0.90),
+            "p99": self.percentile(0.99),
+            "buckets_ms": dict(zip([*map(str, self.BOUNDS_MS), "inf"], self.counts)),
+        }
+
+
+class _Lane:
+    """Per-peer FIFO of ordered work plus the peer's in-flight count."""
+
+    __slots__ = ("queue", "running", "in_flight")
+
+    def __init__(self) -> None:
+        self.queue: Deque[Callable[[], None]] = deque()
+        self.running = False
+        self.in_flight = 0
+
+
+class HandlerPool:
+    """
+    Thread pool that preserves per-peer order for ordered work.
+
+    Parameters
+    ----------
+    max_workers : int
+        Pool threads shared by all peers.
+    max_in_flight : int
+        Per-peer cap on queued + running work items.
+    """
+
+    def __init__(self, max_workers: int = 4, max_in_flight: int = 64) -> None:
+        self.max_in_flight = max_in_flight
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="rpc-handler")
+        self._lanes: Dict[Hashable, _Lane] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable, fn: Callable[[], None], ordered: bool = True) -> bool:
+        """
+        Schedule `fn` for peer `key`. Return False if the peer is at its
+        in-flight limit (nothing is scheduled then).
+        """
+        with self._lock:
+            lane = self._lanes.get(key)
+            if lane is None:
+                lane = self._lanes[key] = _Lane()
+            if lane.in_flight >= self.max_in_flight:
+                return False
+            lane.in_flight += 1
+            if ordered:
+                lane.queue.append(fn)
+                if lane.running:
+                    return True
+                lane.running = True
+        try:
+            if ordered:
+                self._executor.submit(self._run_next, key, lane)
+            else:
+                self._executor.submit(self._run_one, key, lane, fn)
+        except RuntimeError:            # pool already shut down
+            # Undo the bookkeeping, or the lane keeps a phantom slot and a
+            # stuck `running` flag and never runs this peer's work again
+            with self._lock:
+                lane.in_flight -= 1
+                if ordered:
+                    lane.queue.remove(fn)
+                    lane.running = False
+                if not lane.in_flight and self._lanes.get(key) is lane:
+                    del self._lanes[key]
+            return False
+        return True
+
+    def in_flight(self, key: Hashable) -> int:
+        lane = self._lanes.get(key)
+        return lane.in_flight if lane else 0
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._lanes.clear()
+
+    def _run_next(self, key: Hashable, lane: _Lane) -> None:
+        """Run the lane's head item, then hand the lane back to the pool."""
+        with self._lock:
+            fn = lane.queue.popleft()
+        self._run_one(key, lane, fn)
+        with self._lock:
+            if not lane.queue:
+                lane.running = False
+                if not lane.in_flight and self._lanes.get(key) is lane:
+                    del self._lanes[key]
+                return
+        # Re-submit instead of looping so one busy peer cannot hog a worker
+        try:
+            self._executor.submit(self._run_next, key, lane)
+        except RuntimeError:
+            pass
+
+    def _run_one(self, key: Hashable, lane: _Lane, fn: Callable[[], None]) -> None:
+        try:
+            fn()
+        except Exception as e:
+            log.exception("RPC 处理线程异常: %s", e)
+        finally:
+            with self._lock:
+                lane.in_flight -= 1
+                if not lane.in_flight and not lane.running and self._lanes.get(key) is lane:
+                    del self._lanes[key]
+
+
+def timed(histogram: LatencyHistogram, fn: Callable[[], Any]) -> Any:
+    """Call `fn` and record its duration."""
+    start = time.perf_counter()
+    try:
+        return fn()
+    finally:
+        histogram.record(time.perf_counter() - start)
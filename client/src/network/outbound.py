@@ -0,0 +1,247 @@
+"""
+Per-socket outbound queues
+--------------------------
+Every socket gets one SendQueue. Any thread may `put()` packed frames;
+exactly one consumer takes them out:
+
+* threaded mode – an OutboundWriter thread per socket, so frames from the
+  UI, heartbeat and receive threads can no longer interleave and a slow
+  peer only stalls its own writer, not host broadcasts to everyone else;
+* reactor mode  – the HostReactor, whenever the socket is writable.
+
+The consumer takes everything queued (up to `max_batch_bytes`) and sends
+it as one write, coalescing small frames.
+
+When the queue is full the backpressure policy decides:
+    "block"          – the producer waits for room; with a block_timeout
+                       it waits at most that long, then evicts the peer
+    "drop_heartbeat" – heartbeat frames are dropped first (queued ones,
+                       then the new one); other frames wait for room
+    "evict"          – the peer is treated as a slow consumer and closed
+"""
+
+from __future__ import annotations
+
+import socket
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+POLICY_BLOCK = "block"
+POLICY_DROP_HEARTBEAT = "drop_heartbeat"
+POLICY_EVICT = "evict"
+POLICIES = (POLICY_BLOCK, POLICY_DROP_HEARTBEAT, POLICY_EVICT)
+DEFAULT_BLOCK_TIMEOUT = 2.0     # seconds a host broadcast waits on one full queue
+
+
+class SendQueue:
+    """
+    Bounded FIFO of packed frames for one socket.
+
+    Parameters
+    ----------
+    max_frames : int
+        Capacity before the backpressure policy kicks in.
+    policy : str
+        One of POLICIES.
+    max_batch_bytes : int
+        Upper bound for one coalesced write.
+    on_evict : callable, optional
+        Called (once, from the producer thread) when the peer is evicted.
+    block_timeout : float or None
+        Policy "block" only: seconds a producer may wait for room before
+        the peer is evicted as a slow consumer. None waits indefinitely.
+    """
+
+    def __init__(self,
+                 max_frames: int = 1024,
+                 policy: str = POLICY_BLOCK,
+                 max_batch_bytes: int = 64 * 1024,
+                 on_evict: Optional[Callable[[], None]] = None,
+                 block_timeout: Optional[float] = None) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+        self.max_frames = max_frames
+        self.policy = policy
+        self.max_batch_bytes = max_batch_bytes
+        self.on_evict = on_evict
+        self.block_timeout = block_timeout
+
+        # (raw, is_heartbeat, enqueue time)
+        self._frames: Deque[Tuple[bytes, bool, float]] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._evicted = False
+
+        # Counters
+        self.max_depth = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.batches = 0
+        self.dropped = 0
+        self.flush_latency_last = 0.0
+        self.flush_latency_max = 0.0
+        self._flush_latency_total = 0.0
+
+    # --------------------------------------------------------------------- #
+    #  Producer side
+    # --------------------------------------------------------------------- #
+    def put(self, raw: bytes, heartbeat: bool = False, may_block: bool = True) -> bool:
+        """
+        Enqueue one frame. Return False if it was dropped or the queue is
+        closed/evicted.
+
+        may_block=False is for the consumer thread itself (e.g. the reactor
+        answering an RPC): it must never wait on its own queue, so a full
+        queue under "block" simply grows past max_frames.
+        """
+        evicted_now = False
+        deadline = None
+        with self._cond:
+            while not self._closed and len(self._frames) >= self.max_frames:
+                if self.policy == POLICY_BLOCK and may_block and self.block_timeout is not None:
+                    now = time.monotonic()
+                    if deadline is None:
+                        deadline = now + self.block_timeout
+                    elif now >= deadline:
+                        # 等待超时：按慢消费者处理，不再拖住其他对端
+                        self._closed = self._evicted = evicted_now = True
+                        self._frames.clear()
+                        self._cond.notify_all()
+                        break
+                if self.policy == POLICY_EVICT:
+                    self._closed = self._evicted = evicted_now = True
+                    self._frames.clear()
+                    self._cond.notify_all()
+                elif self.policy == POLICY_DROP_HEARTBEAT and heartbeat:
+                    self.dropped += 1
+                    return False
+                elif self.policy == POLICY_DROP_HEARTBEAT and self._drop_one_heartbeat():
+                    pass
+                elif not may_block:
+                    break
+                else:
+                    wait = 0.5 if deadline is None else min(0.5, max(0.0, deadline - time.monotonic()))
+                    self._cond.wait(timeout=wait)
+            if not self._closed:
+                self._frames.append((raw, heartbeat, time.monotonic()))
+                depth = len(self._frames)
+                if depth > self.max_depth:
+                    self.max_depth = depth
+                self._cond.notify_all()
+                return True
+        if evicted_now and self.on_evict:
+            self.on_evict()
+        return False
+
+    def _drop_one_heartbeat(self) -> bool:
+        for i, (_, hb, _) in enumerate(self._frames):
+            if hb:
+                del self._frames[i]
+                self.dropped += 1
+                return True
+        return False
+
+    # --------------------------------------------------------------------- #
+    #  Consumer side
+    # --------------------------------------------------------------------- #
+    def take_batch(self, wait: bool = True, timeout: Optional[float] = None
+                   ) -> Optional[Tuple[bytes, float]]:
+        """
+        Remove queued frames and return (coalesced bytes, oldest enqueue time).
+
+        Returns None if nothing is queued (wait=False), on timeout, or when
+        the queue is closed and drained.
+        """
+        with self._cond:
+            if wait:
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while not self._frames and not self._closed:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+            if not self._frames:
+                return None
+            first_raw, _, oldest = self._frames.popleft()
+            parts = [first_raw]
+            size = len(first_raw)
+            while self._frames and size + len(self._frames[0][0]) <= self.max_batch_bytes:
+                raw = self._frames.popleft()[0]
+                parts.append(raw)
+                size += len(raw)
+            self._cond.notify_all()          # room for blocked producers
+        self.frames_sent += len(parts)
+        return (parts[0] if len(parts) == 1 else b"".join(parts)), oldest
+
+    def record_flush(self, nbytes: int, oldest: float) -> None:
+        """Consumer reports a completed write for the latency counters."""
+        latency = time.monotonic() - oldest
+        self.batches += 1
+        self.bytes_sent += nbytes
+        self.flush_latency_last = latency
+        self._flush_latency_total += latency
+        if latency > self.flush_latency_max:
+            self.flush_latency_max = latency
+
+    def close(self) -> None:
+        """Refuse new frames; the consumer still drains what is queued."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    # --------------------------------------------------------------------- #
+    #  Introspection
+    # --------------------------------------------------------------------- #
+    def depth(self) -> int:
+        return len(self._frames)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the counters (latencies in seconds)."""
+        return {
+            "depth": len(self._frames),
+            "max_depth": self.max_depth,
+            "frames_sent": self.frames_sent,
+            "bytes_sent": self.bytes_sent,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "evicted": self._evicted,
+            "flush_latency_last": self.flush_latency_last,
+            "flush_latency_max": self.flush_latency_max,
+            "flush_latency_avg": (self._flush_latency_total / self.batches
+                                  if self.batches else 0.0),
+        }
+
+
+class OutboundWriter:
+    """Daemon thread draining one SendQueue into a blocking socket."""
+
+    def __init__(self, sock: socket.socket, queue: SendQueue,
+                 on_error: Optional[Callable[[socket.socket], None]] = None) -> None:
+        self.sock = sock
+        self.queue = queue
+        self._on_error = on_error
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.take_batch()
+            if item is None:
+                return                       # closed and drained
+            raw, oldest = item
+            try:
+                self.sock.sendall(raw)
+            except Exception:
+                self.queue.close()
+                if self._on_error:
+                    self._on_error(self.sock)
+                return
+            self.queue.record_flush(len(raw), oldest)
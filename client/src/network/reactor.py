@@ -0,0 +1,273 @@
+"""
+Single-threaded selectors reactor for host mode
+-----------------------------------------------
+Replaces the accept thread + one `_recv_loop` thread per client with one
+thread that multiplexes every socket through `selectors.DefaultSelector`
+(epoll on Linux, kqueue on BSD/macOS).
+
+* Listening socket and all client sockets are non-blocking.
+* Each client keeps its own stream reader (same framing as the Network)
+  and the Network's SendQueue for that socket; only the reactor thread
+  ever writes to a socket, other threads enqueue and wake the selector.
+* Decoded messages go through `Network._dispatch`, so `on_message`,
+  `register_handler` and `send(to_socket=...)` behave exactly as in the
+  threaded host.
+"""
+
+from __future__ import annotations
+
+import selectors
+import socket
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from .outbound import SendQueue
+from .utils import make_reader
+from src.log import get_logger
+
+if TYPE_CHECKING:
+    from .core import Network
+
+log = get_logger("network.reactor")
+
+
+class _Conn:
+    """Per-client state owned by the reactor."""
+
+    __slots__ = ("sock", "reader", "queue", "pending", "pending_size",
+                 "pending_since", "writing", "info")
+
+    def __init__(self, sock: socket.socket, framing: str, info: str) -> None:
+        self.sock = sock
+        self.reader = make_reader(framing)
+        self.queue: Optional[SendQueue] = None
+        self.pending: Optional[memoryview] = None   # unsent tail of the current batch
+        self.pending_size = 0
+        self.pending_since = 0.0
+        self.writing = False       # EVENT_WRITE currently registered
+        self.info = info
+
+
+class HostReactor:
+    """
+    Event loop serving a host's listening socket and all of its clients.
+
+    Parameters
+    ----------
+    net : Network
+        Owning host instance; used for the peer registry and dispatch.
+    listen_sock : socket
+        Bound and listening server socket.
+    """
+
+    def __init__(self, net: "Network", listen_sock: socket.socket) -> None:
+        self._net = net
+        self._listen = listen_sock
+        self._listen.setblocking(False)
+
+        self._sel = selectors.DefaultSelector()
+        self._sel.register(self._listen, selectors.EVENT_READ, None)
+
+        # Self-pipe so other threads can interrupt select()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._sel.register(self._wake_r, selectors.EVENT_READ, None)
+
+        self._conns: Dict[socket.socket, _Conn] = {}
+        self._lock = threading.Lock()          # guards _conns and the lists below
+        self._want_write: List[_Conn] = []
+        self._to_drop: List[socket.socket] = []
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    # --------------------------------------------------------------------- #
+    #  Life-cycle
+    # --------------------------------------------------------------------- #
+    def start(self) -> None:
+        """Spawn the reactor thread."""
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the loop and close every socket it owns. Idempotent."""
+        if not self._running:
+            return
+        self._running = False
+        self._wake()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+    # --------------------------------------------------------------------- #
+    #  Thread-safe API used by Network
+    # --------------------------------------------------------------------- #
+    def write(self, sock: socket.socket, raw: bytes, heartbeat: bool = False) -> None:
+        """Queue bytes for a client; flushed by the reactor thread."""
+        conn = self._conns.get(sock)
+        if conn is None:
+            return
+        if conn.queue is None:              # still inside _add_peer callbacks
+            conn.queue = self._net._queues.get(sock)
+            if conn.queue is None:
+                return
+        in_loop = threading.current_thread() is self._thread
+        if not conn.queue.put(raw, heartbeat, may_block=not in_loop):
+            return
+        with self._lock:
+            self._want_write.append(conn)
+        if not in_loop:
+            self._wake()
+
+    def drop(self, sock: socket.socket) -> None:
+        """Ask the reactor to close a client."""
+        with self._lock:
+            self._to_drop.append(sock)
+        if threading.current_thread() is self._thread:
+            return
+        self._wake()
+
+    # --------------------------------------------------------------------- #
+    #  Event loop
+    # --------------------------------------------------------------------- #
+    def _run(self) -> None:
+        try:
+            while self._running:
+                for key, mask in self._sel.select(timeout=1.0):
+                    sock = key.fileobj
+                    if sock is self._listen:
+                        self._accept()
+                    elif sock is self._wake_r:
+                        self._drain_wake()
+                    else:
+                        conn = key.data
+                        if mask & selectors.EVENT_READ:
+                            self._read(conn)
+                        if mask & selectors.EVENT_WRITE and conn.sock in self._conns:
+                            self._flush(conn)
+                self._service_queues()
+        except Exception as e:
+            log.exception("事件循环异常: %s", e)
+        finally:
+            self._shutdown()
+
+    def _accept(self) -> None:
+        """Accept every pending connection (the listen socket is non-blocking)."""
+        while True:
+            try:
+                conn, addr = self._listen.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                log.warning("接受客户端连接时出错: %s", e)
+                return
+            conn.setblocking(False)
+            state = _Conn(conn, self._net.framing, f"Peer {addr}")
+            with self._lock:
+                self._conns[conn] = state
+            self._sel.register(conn, selectors.EVENT_READ, state)
+            self._net._add_peer(conn, addr)
+            state.queue = self._net._queues.get(conn)
+
+    def _read(self, conn: _Conn) -> None:
+        try:
+            n = conn.reader.recv_from(conn.sock)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            log.warning("%s 接收错误: %s", conn.info, e)
+            self._close(conn)
+            return
+        if not n:
+            log.info("%s 断开连接", conn.info)
+            self._close(conn)
+            return
+        try:
+            for msg in conn.reader.messages():
+                self._net._dispatch(msg, conn.sock, conn.info)
+        except Exception as e:
+            log.warning("%s 接收错误: %s", conn.info, e)
+            self._close(conn)
+
+    def _flush(self, conn: _Conn) -> None:
+        """Write queued batches until the queue is empty or the kernel is full."""
+        queue = conn.queue
+        while True:
+            if conn.pending is None:
+                item = queue.take_batch(wait=False) if queue else None
+                if item is None:
+                    break
+                raw, conn.pending_since = item
+                conn.pending = memoryview(raw)
+                conn.pending_size = len(raw)
+            try:
+                sent = conn.sock.send(conn.pending)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                self._close(conn)
+                return
+            if sent < len(conn.pending):
+                conn.pending = conn.pending[sent:]
+                break
+            conn.pending = None
+            queue.record_flush(conn.pending_size, conn.pending_since)
+        pending = conn.pending is not None
+        if pending != conn.writing:
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if pending else 0)
+            self._sel.modify(conn.sock, events, conn)
+            conn.writing = pending
+
+    def _service_queues(self) -> None:
+        with self._lock:
+            want, self._want_write = self._want_write, []
+            drop, self._to_drop = self._to_drop, []
+        for conn in want:
+            if conn.sock in self._conns and not conn.writing:
+                self._flush(conn)
+        for sock in drop:
+            conn = self._conns.get(sock)
+            if conn is not None:
+                self._close(conn)
+
+    def _close(self, conn: _Conn) -> None:
+        with self._lock:
+            if self._conns.pop(conn.sock, None) is None:
+                return
+        try:
+            self._sel.unregister(conn.sock)
+        except (KeyError, ValueError):
+            pass
+        log.info("%s 连接已关闭，进行清理...", conn.info)
+        self._net._forget_peer(conn.sock)
+
+    def _wake(self) -> None:
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass            # buffer full -> a wake-up is already pending
+
+    def _drain_wake(self) -> None:
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def _shutdown(self) -> None:
+        for conn in list(self._conns.values()):
+            try:
+                conn.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            try:
+                conn.sock.close()
+            except OSError:
+                pass
+        self._conns.clear()
+        for s in (self._listen, self._wake_r, self._wake_w):
+            try:
+                s.close()
+            except OSError:
+                pass
+        self._sel.close()
@@ -0,0 +1,224 @@
+"""
+Shared deadline scheduler
+-------------------------
+One daemon thread per process fires timeouts for every Network instance:
+RPC deadlines and per-peer heartbeat checks, instead of one blocked thread
+per outstanding RPC and one heartbeat thread per Network.
+
+    handle = get_scheduler().call_later(5.0, callback)
+    handle.cancel()
+
+Deadlines live in a hierarchical timing wheel (4 levels x 64 slots of
+10 ms ticks, about 46 h of range; anything further out waits in an
+overflow set). Scheduling and cancelling are O(1); a timer is moved at
+most once per level on its way down, so expiry is O(1) amortized no
+matter how many timers are pending. The thread sleeps until the next
+occupied level-0 slot or the next cascade boundary, never per tick.
+
+Callbacks run on the scheduler thread and must be short (resolve a
+future, enqueue a frame); anything heavier should be handed off.
+Timers fire at or up to one tick after their deadline.
+All times are `time.monotonic()`.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Callable, List, Optional, Set
+
+from src.log import get_logger
+
+log = get_logger("network.timers")
+
+WHEEL_BITS = 6
+WHEEL_SLOTS = 1 << WHEEL_BITS          # slots per level
+WHEEL_MASK = WHEEL_SLOTS - 1
+WHEEL_LEVELS = 4
+DEFAULT_TICK = 0.01                    # seconds
+
+
+class TimerHandle:
+    """Cancellable reference to a scheduled callback."""
+
+    __slots__ = ("deadline", "callback", "cancelled", "_tick", "_bucket", "_scheduler")
+
+    def __init__(self, deadline: float, callback: Callable[[], None],
+                 scheduler: "DeadlineScheduler") -> None:
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+        self._tick = 0
+        self._bucket: Optional[Set["TimerHandle"]] = None
+        self._scheduler = scheduler
+
+    def cancel(self) -> None:
+        """Prevent the callback from running (no-op if it already ran)."""
+        if self.cancelled:
+            return
+        self.cancelled = True
+        self.callback = None
+        self._scheduler._discard(self)
+
+
+class DeadlineScheduler:
+    """
+    Hierarchical timing wheel served by a single lazily started thread.
+
+    Parameters
+    ----------
+    tick : float
+        Wheel resolution in seconds.
+    """
+
+    def __init__(self, tick: float = DEFAULT_TICK) -> None:
+        self.tick = tick
+        self._wheels: List[List[Set[TimerHandle]]] = [
+            [set() for _ in range(WHEEL_SLOTS)] for _ in range(WHEEL_LEVELS)
+        ]
+        self._overflow: Set[TimerHandle] = set()
+        self._origin = time.monotonic()
+        self._current = 0                  # last processed tick
+        self._count = 0
+        self._wake_at: Optional[int] = None   # tick the thread sleeps until
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> TimerHandle:
+        """Run `callback` once, `delay` seconds from now."""
+        return self.call_at(time.monotonic() + delay, callback)
+
+    def call_at(self, deadline: float, callback: Callable[[], None]) -> TimerHandle:
+        """Run `callback` once at monotonic time `deadline`."""
+        handle = TimerHandle(deadline, callback, self)
+        with self._cond:
+            if self._count == 0:
+                # Nothing pending: jump the wheel to the present instead of
+                # walking through the idle ticks later
+                self._current = max(self._current, self._now_tick())
+            handle._tick = max(math.ceil((deadline - self._origin) / self.tick),
+                               self._current + 1)
+            self._place(handle)
+            self._count += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True,
+                                                name="net-deadlines")
+                self._thread.start()
+            elif self._wake_at is None or handle._tick < self._wake_at:
+                self._cond.notify()          # new earliest deadline
+        return handle
+
+    def pending(self) -> int:
+        """Number of scheduled, not yet fired or cancelled timers."""
+        return self._count
+
+    # --------------------------------------------------------------------- #
+    #  Wheel bookkeeping (caller holds self._cond)
+    # --------------------------------------------------------------------- #
+    def _now_tick(self) -> int:
+        return int((time.monotonic() - self._origin) / self.tick)
+
+    def _place(self, handle: TimerHandle) -> None:
+        """Put a handle in the lowest level whose range covers its tick."""
+        t = handle._tick
+        now = self._current
+        for level in range(WHEEL_LEVELS):
+            shift = level * WHEEL_BITS
+            if (t >> shift) - (now >> shift) < WHEEL_SLOTS:
+                bucket = self._wheels[level][(t >> shift) & WHEEL_MASK]
+                break
+        else:
+            bucket = self._overflow
+        bucket.add(handle)
+        handle._bucket = bucket
+
+    def _discard(self, handle: TimerHandle) -> None:
+        with self._cond:
+            bucket = handle._bucket
+            if bucket is not None:
+                bucket.discard(handle)
+                handle._bucket = None
+                self._count -= 1
+
+    def _advance(self, due: List[TimerHandle]) -> None:
+        """Process one tick: cascade higher levels, then collect level 0."""
+        self._current += 1
+        t = self._current
+        if t & WHEEL_MASK == 0:
+            # Highest boundary first so timers can fall through several levels
+            for level in range(WHEEL_LEVELS - 1, 0, -1):
+                shift = level * WHEEL_BITS
+                if t & ((1 << shift) - 1):
+                    continue
+                if level == WHEEL_LEVELS - 1 and self._overflow:
+                    moved, self._overflow = self._overflow, set()
+                    for handle in moved:
+                        self._place(handle)
+                slot = (t >> shift) & WHEEL_MASK
+                moved, self._wheels[level][slot] = self._wheels[level][slot], set()
+                for handle in moved:
+                    self._place(handle)
+        bucket = self._wheels[0][t & WHEEL_MASK]
+        if bucket:
+            self._wheels[0][t & WHEEL_MASK] = set()
+            for handle in bucket:
+                handle._bucket = None
+            self._count -= len(bucket)
+            due.extend(bucket)
+
+    def _next_event(self) -> Optional[int]:
+        """Tick of the next occupied level-0 slot or cascade boundary."""
+        if self._count == 0:
+            return None
+        t = self._current + 1
+        if t & WHEEL_MASK == 0:
+            return t                       # cascade due first
+        boundary = (t | WHEEL_MASK) + 1
+        while t < boundary:
+            if self._wheels[0][t & WHEEL_MASK]:
+                return t
+            t += 1
+        return boundary
+
+    def _run(self) -> None:
+        while True:
+            due: List[TimerHandle] = []
+            with self._cond:
+                while True:
+                    now = self._now_tick()
+                    if self._count == 0:
+                        self._current = max(self._current, now)
+                    while self._current < now and not due:
+                        self._advance(due)
+                    if due:
+                        break
+                    self._wake_at = self._next_event()
+                    if self._wake_at is None:
+                        self._cond.wait()
+                    else:
+                        self._cond.wait(max(0.0, self._origin + self._wake_at * self.tick
+                                            - time.monotonic()))
+                    self._wake_at = None
+            for handle in due:
+                callback = handle.callback
+                if handle.cancelled or callback is None:
+                    continue
+                handle.callback = None
+                try:
+                    callback()
+                except Exception as e:
+                    log.exception("回调异常: %s", e)
+
+
+_scheduler: Optional[DeadlineScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> DeadlineScheduler:
+    """Return the process-wide scheduler shared by all Network instances."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = DeadlineScheduler()
+        return _scheduler
@@ -1,5 +1,18 @@
 """序列化 / 协议辅助"""
 import json
+import struct
+from typing import Any, Dict, List, Optional, Sequence
+
+import src.game.constants as gconstants
+
+# Wire framing modes understood by Network
+FRAMING_LINE = "line"        # legacy: JSON + '\n'
+FRAMING_LENGTH = "length"    # 4-byte big-endian length header + JSON body
+FRAMING_MODES = (FRAMING_LINE, FRAMING_LENGTH)
+
+FRAME_HEADER = struct.Struct("!I")
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
 
 def pack(data: dict) -> bytes:
     """字典 → 字节流（带 \n 分隔符）"""
@@ -7,4 +20,430 @@ def pack(data: dict) -> bytes:
 
 def unpack(raw: str) -> dict:
     """字节流 → 字典"""
-    return json.loads(raw)
\ No newline at end of file
+    return json.loads(raw)
+
+
+def pack_frame(data: dict) -> bytes:
+    """字典 → 字节流（4 字节长度头 + JSON 正文）"""
+    body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+class LineReader:
+    """
+    Incremental reader for newline-delimited JSON.
+
+    Works on raw bytes, so a multi-byte UTF-8 character split across two
+    recv() calls is only decoded once its line is complete.
+
+    Receive path without per-recv allocations: the socket writes straight
+    into a preallocated bytearray via recv_into(), frames are located in
+    place and handed to the decoder as memoryview slices, and consumed
+    bytes are reclaimed by moving the unread tail to the front of the same
+    buffer. The buffer only grows (doubling) when a single pending frame
+    does not fit.
+
+    Parameters
+    ----------
+    initial_size : int
+        Starting buffer capacity in bytes.
+    min_read : int
+        Free space guaranteed before every recv_into().
+    """
+
+    def __init__(self, initial_size: int = 65536, min_read: int = 16384) -> None:
+        self._initial_size = max(initial_size, min_read)
+        self._min_read = min_read
+        self._buf = bytearray(self._initial_size)
+        self._view = memoryview(self._buf)
+        self._r = 0            # first byte not yet parsed
+        self._w = 0            # end of received data
+        self._need = 0         # bytes still missing for the frame at _r (if known)
+        self.compactions = 0
+        self.grows = 0
+
+    def recv_from(self, sock) -> int:
+        """Read once from `sock`; return number of bytes (0 -> peer closed)."""
+        self._reserve(max(self._min_read, self._need))
+        n = sock.recv_into(self._view[self._w:])
+        self._w += n
+        return n
+
+    def feed(self, data: bytes) -> None:
+        """Append already received bytes."""
+        n = len(data)
+        self._reserve(n)
+        self._view[self._w:self._w + n] = data
+        self._w += n
+
+    def buffered(self) -> int:
+        """Bytes received but not yet returned as messages."""
+        return self._w - self._r
+
+    def _reserve(self, free: int) -> None:
+        """Make room for `free` bytes after _w: compact in place, else grow."""
+        capacity = len(self._buf)
+        if capacity - self._w >= free:
+            return
+        pending = self._w - self._r
+        view = self._view
+        if capacity - pending >= free:
+            view[:pending] = view[self._r:self._w]      # memmove, same buffer
+            self.compactions += 1
+        else:
+            size = capacity * 2
+            while size - pending < free:
+                size *= 2
+            new = bytearray(size)
+            new[:pending] = view[self._r:self._w]
+            view.release()
+            self._buf = new
+            self._view = memoryview(new)
+            self.grows += 1
+        self._r = 0
+        self._w = pending
+
+    def _consumed(self, pos: int) -> None:
+        """Mark bytes before `pos` as parsed."""
+        self._r = pos
+        if pos == self._w:
+            # Empty: rewind for free, and give back a buffer that one huge
+            # frame blew up
+            self._r = self._w = 0
+            if len(self._buf) > 4 * self._initial_size:
+                self._view.release()
+                self._buf = bytearray(self._initial_size)
+                self._view = memoryview(self._buf)
+
+    def messages(self) -> List[Dict[str, Any]]:
+        """Pop every complete message currently buffered."""
+        buf = self._buf
+        view = self._view
+        end_of_data = self._w
+        out = []
+        pos = self._r
+        while True:
+            end = buf.find(b"\n", pos, end_of_data)
+            if end < 0:
+                break
+            if end > pos:
+                out.append(decode_body(view[pos:end]))
+            pos = end + 1
+        self._consumed(pos)
+        return out
+
+
+class FrameReader(LineReader):
+    """Incremental reader for length-prefixed frames (see pack_frame)."""
+
+    def messages(self) -> List[Dict[str, Any]]:
+        buf = self._buf
+        view = self._view
+        out = []
+        pos = self._r
+        size = self._w
+        hdr = FRAME_HEADER.size
+        self._need = 0
+        while size - pos >= hdr:
+            (length,) = FRAME_HEADER.unpack_from(buf, pos)
+            if length > MAX_FRAME_SIZE:
+                raise ValueError(f"Frame too large: {length} bytes")
+            start = pos + hdr
+            if size - start < length:
+                self._need = start + length - size   # grow once for big frames
+                break
+            out.append(decode_body(view[start:start + length]))
+            pos = start + length
+        self._consumed(pos)
+        return out
+
+
+def make_packer(framing: str):
+    """Return the pack function matching a framing mode."""
+    if framing == FRAMING_LINE:
+        return pack
+    if framing == FRAMING_LENGTH:
+        return pack_frame
+    raise ValueError(f"Unknown framing mode: {framing}")
+
+
+def make_reader(framing: str) -> LineReader:
+    """Return a fresh stream reader matching a framing mode."""
+    if framing == FRAMING_LINE:
+        return LineReader()
+    if framing == FRAMING_LENGTH:
+        return FrameReader()
+    raise ValueError(f"Unknown framing mode: {framing}")
+
+
+def frame(body: bytes, framing: str) -> bytes:
+    """Wrap an encoded message body for the given framing mode."""
+    if framing == FRAMING_LENGTH:
+        return FRAME_HEADER.pack(len(body)) + body
+    return body + b"\n"
+
+
+# --------------------------------------------------------------------------- #
+#  Codecs – message dict <-> body bytes
+# --------------------------------------------------------------------------- #
+CODEC_JSON = "json"
+CODEC_COMPACT = "compact1"
+
+# Handshake, sent as JSON right after connect()/accept:
+#   client -> {"type": "hello", "codecs": [preferred, ..., "json"]}
+#   host   -> {"type": "hello_ack", "codec": chosen}
+MSG_HELLO = "hello"
+MSG_HELLO_ACK = "hello_ack"
+
+
+class Codec:
+    """Interface: turn a message dict into a body and back."""
+
+    name = ""
+    line_safe = True            # bodies never contain 0x0A
+
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, raw) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class JsonCodec(Codec):
+    """UTF-8 JSON, the original wire format."""
+
+    name = CODEC_JSON
+
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+    def decode(self, raw) -> Dict[str, Any]:
+        if isinstance(raw, memoryview):
+            raw = str(raw, "utf-8")
+        return json.loads(raw)
+
+
+# Compact layout (one tag byte per value, msgpack-like):
+#   0x00-0x7F  int 0..127             0xC4  int, zig-zag varint
+#   0x80-0xBF  symbol 0..63           0xC5  float64
+#   0xC0       None                   0xC6  str, varint length + UTF-8
+#   0xC1       body magic (first byte only)   0xC7  list, varint count
+#   0xC2/0xC3  False/True             0xC8  dict, varint count, key/value pairs
+#                                     0xC9  symbol 64..255, 1-byte id
+# Dict keys are written as strings, converted the way JSON converts them,
+# so a message decodes the same whichever codec was negotiated.
+# Symbols are the keys, event types and card item strings that appear in
+# every game message. The table is APPEND ONLY: changing existing
+# positions requires a new codec name.
+COMPACT_MAGIC = 0xC1
+COMPACT_SYMBOLS = (
+    # message keys
+    "type", "card", "param", "player", "request_id", "payload", "message",
+    "sender_turn_end", "codecs", "codec", "status", "error",
+    "item_power", "pcarditem_type", "ncarditem_type", "card_effect",
+    # common values
+    "remote", "local", "ping", "pong", "rpc_request", "rpc_response",
+    MSG_HELLO, MSG_HELLO_ACK, "ok",
+    # game events
+    gconstants.EVENT_PLAYER_DAMAGE, gconstants.EVENT_PLAYER_HEAL,
+    gconstants.EVENT_GAME_START, gconstants.EVENT_GAME_END,
+    gconstants.EVENT_TURN_START, gconstants.EVENT_TURN_END,
+    gconstants.EVENT_CARD_DRAWN, gconstants.EVENT_CARD_PLAYED,
+    gconstants.EVENT_CARD_DISCARDED, gconstants.EVENT_REQUEST_CARD,
+    gconstants.EVENT_RETURN_CARD,
+    # card items
+    *gconstants.NCARDITEMLIST, *gconstants.PCARDITEMLIST, *gconstants.STATUS_LIST,
+)
+_SYMBOL_IDS = {sym: i for i, sym in enumerate(COMPACT_SYMBOLS)}
+_FLOAT = struct.Struct("!d")
+
+
+def _put_varint(out: bytearray, n: int) -> None:
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _get_varint(buf, pos: int):
+    shift = result = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _json_key(key: Any) -> str:
+    """Turn a non-str dict key into the string JSON would write for it."""
+    t = type(key)
+    if key is None or t is bool or t is int or t is float:
+        return json.dumps(key)
+    raise TypeError(f"Dict keys must be str, int, float, bool or None, not {t.__name__}")
+
+
+def _encode_value(v: Any, out: bytearray) -> None:
+    t = type(v)
+    if t is str:
+        sym = _SYMBOL_IDS.get(v)
+        if sym is None:
+            raw = v.encode("utf-8")
+            out.append(0xC6)
+            _put_varint(out, len(raw))
+            out += raw
+        elif sym < 64:
+            out.append(0x80 | sym)
+        else:
+            out.append(0xC9)
+            out.append(sym)
+    elif t is int:
+        if 0 <= v <= 0x7F:
+            out.append(v)
+        else:
+            out.append(0xC4)
+            _put_varint(out, (v << 1) if v >= 0 else ((-v << 1) - 1))
+    elif t is dict:
+        out.append(0xC8)
+        _put_varint(out, len(v))
+        for key, item in v.items():
+            _encode_value(key if type(key) is str else _json_key(key), out)
+            _encode_value(item, out)
+    elif v is None:
+        out.append(0xC0)
+    elif t is bool:
+        out.append(0xC3 if v else 0xC2)
+    elif t is list or t is tuple:
+        out.append(0xC7)
+        _put_varint(out, len(v))
+        for item in v:
+            _encode_value(item, out)
+    elif t is float:
+        out.append(0xC5)
+        out += _FLOAT.pack(v)
+    else:
+        raise TypeError(f"Type {t.__name__} is not supported by the compact codec")
+
+
+def _decode_value(buf, pos: int):
+    tag = buf[pos]
+    pos += 1
+    if tag < 0x80:
+        return tag, pos
+    if tag < 0xC0:
+        return COMPACT_SYMBOLS[tag & 0x3F], pos
+    if tag == 0xC8:
+        n, pos = _get_varint(buf, pos)
+        d = {}
+        for _ in range(n):
+            key, pos = _decode_value(buf, pos)
+            d[key], pos = _decode_value(buf, pos)
+        return d, pos
+    if tag == 0xC0:
+        return None, pos
+    if tag == 0xC6:
+        n, pos = _get_varint(buf, pos)
+        return str(buf[pos:pos + n], "utf-8"), pos + n
+    if tag == 0xC4:
+        z, pos = _get_varint(buf, pos)
+        return (z >> 1) if not z & 1 else -((z + 1) >> 1), pos
+    if tag == 0xC2 or tag == 0xC3:
+        return tag == 0xC3, pos
+    if tag == 0xC7:
+        n, pos = _get_varint(buf, pos)
+        items = []
+        for _ in range(n):
+            item, pos = _decode_value(buf, pos)
+            items.append(item)
+        return items, pos
+    if tag == 0xC9:
+        return COMPACT_SYMBOLS[buf[pos]], pos + 1
+    if tag == 0xC5:
+        return _FLOAT.unpack_from(buf, pos)[0], pos + 8
+    raise ValueError(f"Bad compact tag 0x{tag:02X} at {pos - 1}")
+
+
+class CompactCodec(Codec):
+    """
+    Binary codec: small ints inline, known strings as 1-byte symbols.
+
+    Bodies may contain 0x0A, so it is only offered with length framing.
+    """
+
+    name = CODEC_COMPACT
+    line_safe = False
+
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        out = bytearray((COMPACT_MAGIC,))
+        _encode_value(data, out)
+        return bytes(out)
+
+    def decode(self, raw) -> Dict[str, Any]:
+        if raw[0] != COMPACT_MAGIC:
+            raise ValueError("Not a compact body")
+        value, _ = _decode_value(raw, 1)
+        return value
+
+
+JSON_CODEC = JsonCodec()
+COMPACT_CODEC = CompactCodec()
+CODECS: Dict[str, Codec] = {c.name: c for c in (JSON_CODEC, COMPACT_CODEC)}
+
+
+def get_codec(name: str) -> Codec:
+    """Look up a codec by name (unknown names fall back to JSON)."""
+    return CODECS.get(name, JSON_CODEC)
+
+
+def default_codecs(framing: str) -> List[str]:
+    """Codec preference list usable with a framing mode, best first."""
+    if framing == FRAMING_LENGTH:
+        return [CODEC_COMPACT, CODEC_JSON]
+    return [CODEC_JSON]
+
+
+def check_codecs(codecs: Optional[Sequence[str]], framing: str) -> List[str]:
+    """
+    Validate a codec preference list for `framing`.
+
+    Returns `codecs` as a list, or default_codecs(framing) when empty.
+    Raises ValueError for a codec whose bodies may contain a newline
+    under line framing: the LineReader would split such a body.
+    """
+    if not codecs:
+        return default_codecs(framing)
+    if framing == FRAMING_LINE:
+        unsafe = [name for name in codecs if not get_codec(name).line_safe]
+        if unsafe:
+            raise ValueError(f"Codec {unsafe[0]} needs length framing")
+    return list(codecs)
+
+
+def negotiate(offered: Sequence[str], supported: Sequence[str],
+              framing: str = FRAMING_LENGTH) -> str:
+    """
+    Pick the first codec from `offered` that we also support; JSON otherwise.
+
+    With line framing, codecs that are not newline-safe are skipped even
+    if both sides list them.
+    """
+    for name in offered:
+        if name in supported and name in CODECS:
+            if framing == FRAMING_LINE and not CODECS[name].line_safe:
+                continue
+            return name
+    return CODEC_JSON
+
+
+def decode_body(raw) -> Dict[str, Any]:
+    """
+    Decode one message body of either codec.
+
+    Compact bodies start with COMPACT_MAGIC, JSON bodies with '{', so the
+    receiver never has to know which codec the sender switched to.
+    `raw` may be a memoryview into a reader's buffer; it is not kept.
+    """
+    if raw and raw[0] == COMPACT_MAGIC:
+        return COMPACT_CODEC.decode(raw)
+    return json.loads(str(raw, "utf-8"))
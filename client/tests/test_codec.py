@@ -0,0 +1,110 @@
+"""JSON and compact codecs must decode every message to the same value."""
+
+import random
+
+import pytest
+
+import src.game.constants as gconstants
+from src.network.utils import (
+    COMPACT_CODEC, COMPACT_SYMBOLS, JSON_CODEC, CODEC_COMPACT, CODEC_JSON,
+    FRAMING_LENGTH, FRAMING_LINE, check_codecs, decode_body, negotiate,
+)
+
+CARD = {"item_power": 2, "pcarditem_type": gconstants.PCARDITEMLIST[0],
+        "ncarditem_type": gconstants.NCARDITEMLIST[0], "card_effect": gconstants.STATUS_LIST[0]}
+
+MESSAGES = [
+    {"type": "ping"},
+    {"type": gconstants.EVENT_GAME_START, "seed": 2**63 - 1},
+    {"type": gconstants.EVENT_CARD_DRAWN, "player": "remote", "sender_turn_end": True,
+     "card": CARD, "index": 2},
+    {"type": gconstants.EVENT_CARD_PLAYED, "card": CARD, "param": None, "player": "remote"},
+    {"type": "rpc_request", "id": "a1b2", "data": {"hp": [20, -3, 0, 127, 128], "ratio": 0.25}},
+    {"名字": "中文 ✓", "empty": {}, "list": [], "nested": [[1, [2, [3]]], {"k": False}]},
+    {1: "int key", 2.5: "float key", None: "none key", "d": {False: 0}},
+]
+
+
+def roundtrip(codec, msg):
+    return codec.decode(codec.encode(msg))
+
+
+@pytest.mark.parametrize("msg", MESSAGES)
+def test_codecs_agree(msg):
+    assert roundtrip(COMPACT_CODEC, msg) == roundtrip(JSON_CODEC, msg)
+
+
+def test_non_str_keys_become_json_strings():
+    decoded = roundtrip(COMPACT_CODEC, {1: 0, True: 1, None: 2}) | roundtrip(COMPACT_CODEC, {1.5: 3})
+    assert decoded == {"1": 1, "null": 2, "1.5": 3}
+
+
+def test_unsupported_key_rejected():
+    with pytest.raises(TypeError):
+        COMPACT_CODEC.encode({(1, 2): 0})
+
+
+def test_decode_body_detects_codec():
+    msg = MESSAGES[2]
+    assert decode_body(COMPACT_CODEC.encode(msg)) == msg
+    assert decode_body(JSON_CODEC.encode(msg)) == msg
+    assert decode_body(memoryview(COMPACT_CODEC.encode(msg))) == msg
+
+
+def test_negotiate_prefers_offer_order():
+    assert negotiate([CODEC_COMPACT, CODEC_JSON], [CODEC_JSON, CODEC_COMPACT]) == CODEC_COMPACT
+    assert negotiate(["unknown"], [CODEC_COMPACT, CODEC_JSON]) == CODEC_JSON
+
+
+def test_compact_needs_length_framing():
+    # hp 10 编码为原始 0x0A 字节，按行分帧会把消息体截断
+    assert b"\n" in COMPACT_CODEC.encode({"type": gconstants.EVENT_CARD_PLAYED, "hp": 10})
+    assert b"\n" not in JSON_CODEC.encode({"s": "a\nb", "hp": 10})
+
+    assert check_codecs(None, FRAMING_LINE) == [CODEC_JSON]
+    assert check_codecs(None, FRAMING_LENGTH) == [CODEC_COMPACT, CODEC_JSON]
+    assert check_codecs([CODEC_COMPACT], FRAMING_LENGTH) == [CODEC_COMPACT]
+    with pytest.raises(ValueError):
+        check_codecs([CODEC_COMPACT, CODEC_JSON], FRAMING_LINE)
+
+
+def test_network_rejects_compact_with_line_framing():
+    from src.network.aio import AsyncNetwork
+    from src.network.core import Network
+
+    for cls in (Network, AsyncNetwork):
+        with pytest.raises(ValueError):
+            cls(is_host=True, framing=FRAMING_LINE, codecs=[CODEC_COMPACT, CODEC_JSON])
+        assert cls(is_host=True, framing=FRAMING_LENGTH, codecs=[CODEC_COMPACT]).codecs == [CODEC_COMPACT]
+
+
+def test_negotiate_skips_compact_under_line_framing():
+    both = [CODEC_COMPACT, CODEC_JSON]
+    assert negotiate(both, both, FRAMING_LINE) == CODEC_JSON
+    assert negotiate(both, both, FRAMING_LENGTH) == CODEC_COMPACT
+
+
+def _random_value(rng, depth=0):
+    kind = rng.randrange(8 if depth < 3 else 5)
+    if kind == 0:
+        return rng.choice([0, 1, 127, 128, -1, -128, 2**40, -2**40, rng.randrange(-10**6, 10**6)])
+    if kind == 1:
+        return rng.choice([rng.choice(COMPACT_SYMBOLS), "", "x" * rng.randrange(200), "é€😀"])
+    if kind == 2:
+        return rng.choice([None, True, False])
+    if kind == 3:
+        return rng.choice([0.0, -1.5, 1e300, rng.random()])
+    if kind == 4:
+        return rng.choice(COMPACT_SYMBOLS)
+    if kind == 5:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randrange(5))]
+    keys = [rng.choice([rng.choice(COMPACT_SYMBOLS), f"k{rng.randrange(50)}", rng.randrange(300)])
+            for _ in range(rng.randrange(5))]
+    return {key: _random_value(rng, depth + 1) for key in keys}
+
+
+def test_fuzz_codecs_agree():
+    rng = random.Random(7)
+    for _ in range(2000):
+        msg = {"type": rng.choice(COMPACT_SYMBOLS), "body": _random_value(rng)}
+        assert roundtrip(COMPACT_CODEC, msg) == roundtrip(JSON_CODEC, msg)
@@ -0,0 +1,44 @@
+"""HandlerPool: per-peer ordering and bookkeeping when the pool is closed."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.network.dispatch import HandlerPool
+
+
+def test_ordered_work_runs_in_submit_order():
+    pool = HandlerPool(max_workers=4, max_in_flight=1000)
+    seen, done = [], threading.Event()
+    for i in range(200):
+        assert pool.submit("peer", lambda i=i: seen.append(i))
+    assert pool.submit("peer", done.set)
+    assert done.wait(5)
+    pool.shutdown()
+    assert seen == list(range(200))
+
+
+def test_in_flight_limit():
+    pool = HandlerPool(max_workers=1, max_in_flight=2)
+    gate = threading.Event()
+    assert pool.submit("peer", gate.wait)
+    assert pool.submit("peer", lambda: None)
+    assert not pool.submit("peer", lambda: None)
+    assert pool.submit("other", lambda: None, ordered=False)
+    gate.set()
+    pool.shutdown()
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_submit_after_shutdown_leaves_no_phantom_work(ordered):
+    pool = HandlerPool(max_workers=1, max_in_flight=1)
+    pool._executor.shutdown()
+    assert not pool.submit("peer", lambda: None, ordered)
+    assert pool.in_flight("peer") == 0
+    # 换上新的线程池后，该 peer 的任务必须还能执行
+    pool._executor = ThreadPoolExecutor(max_workers=1)
+    ran = threading.Event()
+    assert pool.submit("peer", ran.set, ordered)
+    assert ran.wait(5)
+    pool.shutdown()
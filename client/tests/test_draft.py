@@ -0,0 +1,98 @@
+"""Seeded draft: both peers must compute the same candidate sets."""
+
+import random
+
+import src.game.constants as gconstants
+from src.game.card import CARD_CATALOG
+from src.game.draft import ROLE_GUEST, ROLE_HOST, CandidateStream, candidate_set
+from src.game.engine import GameEngine
+from src.game.player import Player
+from src.game.process import LOCAL_SEAT, REMOTE_SEAT, GameState
+
+SEED = 0x5EED_CAFE
+
+
+def test_candidate_set_is_deterministic():
+    for role in (ROLE_HOST, ROLE_GUEST):
+        for counter in range(50):
+            cards = candidate_set(SEED, role, counter)
+            assert len(cards) == gconstants.DRAFT_CANDIDATES
+            assert cards == candidate_set(SEED, role, counter)
+    other_seed = [candidate_set(SEED + 1, ROLE_HOST, c) for c in range(8)]
+    assert other_seed != [candidate_set(SEED, ROLE_HOST, c) for c in range(8)]
+
+
+def test_stream_lookahead_does_not_advance():
+    stream = CandidateStream(SEED, ROLE_HOST)
+    ahead = stream.at(stream.counter + 3)
+    assert stream.peek() == candidate_set(SEED, ROLE_HOST, 0)
+    for _ in range(3):
+        stream.advance()
+    assert stream.peek() == ahead
+
+
+def test_host_and_guest_engines_agree():
+    """Each machine numbers its own seat 0; roles map the seats to the stream."""
+    host = GameEngine(first_seat=0, rng=random.Random(1))
+    guest = GameEngine(first_seat=1, rng=random.Random(2))
+    host.seed_draft(SEED, (ROLE_HOST, ROLE_GUEST))
+    guest.seed_draft(SEED, (ROLE_GUEST, ROLE_HOST))
+    host.start()
+    guest.start()
+    rng = random.Random(3)
+    for _ in range(200):
+        # 主机的座位 i 就是客户端的座位 1 - i
+        assert host.candidates(0) == guest.candidates(1)
+        assert host.candidates(1) == guest.candidates(0)
+        picker = rng.randrange(2)
+        index = rng.randrange(gconstants.DRAFT_CANDIDATES)
+        host.give_index(picker, index)
+        guest.give_index(1 - picker, index)
+    assert [p.hand.ordered() for p in host.players] == [p.hand.ordered() for p in guest.players][::-1]
+
+
+def make_game_state(seed=None) -> GameState:
+    gs = GameState(Player(), Player(), None)
+    if seed is not None:
+        gs.engine.seed_draft(seed, (ROLE_GUEST, ROLE_HOST))
+    return gs
+
+
+def card_dict(card) -> dict:
+    return {"item_power": card.item_power, "pcarditem_type": card.pcarditem_type,
+            "ncarditem_type": card.ncarditem_type, "card_effect": card.card_effect}
+
+
+def test_unseeded_receiver_takes_the_card():
+    gs = make_game_state()
+    card = CARD_CATALOG[17]
+    msg = {"type": gconstants.EVENT_CARD_DRAWN, "index": 1, "card": card_dict(card)}
+    assert gs._on_card_drawn(msg)
+    assert gs.engine.players[LOCAL_SEAT].hand.ordered() == [card]
+
+
+def test_seeded_receiver_uses_index_and_falls_back_to_card():
+    gs = make_game_state(SEED)
+    offered = gs.engine.candidates(REMOTE_SEAT)
+    msg = {"type": gconstants.EVENT_CARD_DRAWN, "index": 2, "card": card_dict(offered[2])}
+    assert gs._on_card_drawn(msg)
+    assert gs.engine.players[LOCAL_SEAT].hand.ordered() == [offered[2]]
+
+    # 卡牌与序号不符：以卡牌为准，候选流照常前进
+    offered = gs.engine.candidates(REMOTE_SEAT)
+    other = next(c for c in CARD_CATALOG if c not in offered)
+    counter = gs.engine.draft[REMOTE_SEAT].counter
+    assert gs._on_card_drawn({"type": gconstants.EVENT_CARD_DRAWN, "index": 0, "card": card_dict(other)})
+    assert gs.engine.players[LOCAL_SEAT].hand.ordered()[-1] is other
+    assert gs.engine.draft[REMOTE_SEAT].counter == counter + 1
+
+
+def test_sent_pick_carries_card_and_index():
+    gs = make_game_state(SEED)
+    sent = []
+    gs.NetworkManager = type("Wire", (), {"send": staticmethod(sent.append)})()
+    gs.ui_draw_card_selection_callback = lambda cards: cards[1]
+    offered = gs.engine.candidates(LOCAL_SEAT)
+    gs.chooseCard()
+    assert sent[-1]["index"] == 1
+    assert sent[-1]["card"] == card_dict(offered[1])
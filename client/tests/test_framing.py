@@ -0,0 +1,132 @@
+"""LineReader / FrameReader: frames must survive any split of the byte stream."""
+
+import pytest
+
+from src.network.utils import (
+    COMPACT_CODEC, FRAME_HEADER, FRAMING_LENGTH, FRAMING_LINE, MAX_FRAME_SIZE,
+    FrameReader, LineReader, frame, pack, pack_frame,
+)
+
+MSGS = [{"type": "ping", "n": i} for i in range(5)] + [{"名字": "中文 ✓", "hp": 10}]
+READERS = [(LineReader, pack), (FrameReader, pack_frame)]
+
+
+class ChunkSocket:
+    """Hands out the scripted chunks, one (or part of one) per recv_into()."""
+
+    def __init__(self, chunks):
+        self.chunks = [bytes(c) for c in chunks if c]
+
+    def recv_into(self, view) -> int:
+        if not self.chunks:
+            return 0
+        chunk = self.chunks[0]
+        n = min(len(view), len(chunk))
+        view[:n] = chunk[:n]
+        if n < len(chunk):
+            self.chunks[0] = chunk[n:]
+        else:
+            self.chunks.pop(0)
+        return n
+
+
+def read_all(reader, chunks):
+    sock = ChunkSocket(chunks)
+    out = []
+    while reader.recv_from(sock):
+        out.extend(reader.messages())
+    return out
+
+
+def split(data: bytes, *cuts):
+    bounds = [0, *cuts, len(data)]
+    return [data[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+@pytest.mark.parametrize("reader_cls, packer", READERS)
+def test_frame_split_across_recv_calls(reader_cls, packer):
+    data = b"".join(packer(m) for m in MSGS)
+    assert read_all(reader_cls(), [data[i:i + 1] for i in range(len(data))]) == MSGS
+    assert read_all(reader_cls(), split(data, 3, 17, 40)) == MSGS
+
+
+@pytest.mark.parametrize("reader_cls, packer", READERS)
+def test_many_frames_in_one_chunk(reader_cls, packer):
+    msgs = [{"type": "card_played", "i": i} for i in range(500)]
+    reader = reader_cls()
+    reader.feed(b"".join(packer(m) for m in msgs))
+    assert reader.messages() == msgs
+    assert reader.buffered() == 0
+
+
+@pytest.mark.parametrize("reader_cls, packer", READERS)
+def test_utf8_character_split_at_chunk_boundary(reader_cls, packer):
+    data = packer({"名字": "中文"})
+    first = data.index("中".encode("utf-8")) + 1          # 切在三字节字符中间
+    reader = reader_cls()
+    reader.feed(data[:first])
+    assert reader.messages() == []
+    reader.feed(data[first:])
+    assert reader.messages() == [{"名字": "中文"}]
+
+
+@pytest.mark.parametrize("reader_cls, packer", READERS)
+def test_large_frame_grows_then_gives_memory_back(reader_cls, packer):
+    big = {"type": "state", "blob": "x" * 5000}
+    reader = reader_cls(initial_size=64, min_read=16)
+    data = packer(big) + packer(MSGS[0])
+    assert read_all(reader, split(data, 100, 3000)) == [big, MSGS[0]]
+    assert reader.grows >= 1
+    # 缓冲区清空后缩回初始大小
+    assert len(reader._buf) == 64
+    assert read_all(reader, [packer(m) for m in MSGS]) == MSGS
+
+
+def test_frame_reader_grows_once_when_length_is_known():
+    big = {"blob": "y" * 5000}
+    reader = FrameReader(initial_size=64, min_read=16)
+    assert read_all(reader, [pack_frame(big)]) == [big]
+    assert reader.grows == 1
+
+
+@pytest.mark.parametrize("reader_cls, packer", READERS)
+def test_partial_frame_is_compacted_in_place(reader_cls, packer):
+    reader = reader_cls(initial_size=64, min_read=16)
+    data = b"".join(packer({"i": i}) for i in range(40))
+    assert read_all(reader, [data[i:i + 50] for i in range(0, len(data), 50)]) == \
+        [{"i": i} for i in range(40)]
+    assert reader.compactions > 0
+    assert reader.grows == 0
+
+
+def test_partial_length_header():
+    data = pack_frame(MSGS[-1])
+    reader = FrameReader()
+    reader.feed(data[:2])
+    assert reader.messages() == []
+    assert reader.buffered() == 2
+    reader.feed(data[2:FRAME_HEADER.size])
+    assert reader.messages() == []
+    reader.feed(data[FRAME_HEADER.size:])
+    assert reader.messages() == [MSGS[-1]]
+    assert reader.buffered() == 0
+
+
+def test_compact_bodies_in_length_frames():
+    body = COMPACT_CODEC.encode(MSGS[-1])
+    assert b"\n" in body
+    data = frame(body, FRAMING_LENGTH) + frame(COMPACT_CODEC.encode(MSGS[0]), FRAMING_LENGTH)
+    assert read_all(FrameReader(), split(data, 5, 9)) == [MSGS[-1], MSGS[0]]
+
+
+def test_blank_lines_are_skipped():
+    reader = LineReader()
+    reader.feed(b"\n" + frame(pack(MSGS[0])[:-1], FRAMING_LINE) + b"\n")
+    assert reader.messages() == [MSGS[0]]
+
+
+def test_oversized_frame_rejected():
+    reader = FrameReader()
+    reader.feed(FRAME_HEADER.pack(MAX_FRAME_SIZE + 1))
+    with pytest.raises(ValueError):
+        reader.messages()
@@ -0,0 +1,46 @@
+"""Ring buffer dumps."""
+
+import io
+import logging
+
+import pytest
+
+from src.log import RingBufferHandler
+
+
+@pytest.fixture
+def ring():
+    out = io.StringIO()
+    handler = RingBufferHandler(capacity=100, stream=out)
+    logger = logging.getLogger("faircard-test.ring")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    yield logger, handler, out
+    logger.removeHandler(handler)
+
+
+def test_error_burst_dumps_each_record_once(ring):
+    logger, handler, out = ring
+    for i in range(50):
+        logger.info("info %d", i)
+    logger.error("first")
+    assert out.getvalue().count("info ") == 50
+
+    for i in range(20):
+        logger.error("burst %d", i)
+    text = out.getvalue()
+    assert text.count("info ") == 50
+    assert text.count("first") == 1
+    assert all(text.count(f"burst {i}\n") == 1 for i in range(20))
+
+
+def test_explicit_dump_writes_whole_ring(ring):
+    logger, handler, out = ring
+    for i in range(150):
+        logger.info("info %d", i)
+    logger.error("boom")
+    full = io.StringIO()
+    handler.dump(full)
+    assert full.getvalue().startswith("----- last 100 log records -----")
+    assert "boom" in full.getvalue()
@@ -0,0 +1,147 @@
+"""Journal write -> read -> replay, and engine snapshot/restore."""
+
+import random
+
+import pytest
+
+from src.game.engine import GameEngine
+from src.game.journal import JournalReader, MatchJournal
+from src.game.replay import ACTION_KINDS, Replay, ReplayMismatch, load_replay
+
+MAX_TURNS = 300
+
+
+def record_match(journal: MatchJournal, seed: int) -> GameEngine:
+    """Play one random match into `journal`; return the final engine."""
+    rng = random.Random(seed)
+    engine = GameEngine(first_seat=seed % 2, rng=rng)
+    players = engine.players
+
+    def settle_picks():
+        for seat in (0, 1):
+            while engine.pending[seat] > 0:
+                cards = engine.candidates()
+                journal.record_candidates(seat, cards, players)
+                journal.record_events(engine.give(seat, cards[int(rng.random() * len(cards))]), players)
+
+    journal.record_events(engine.start(), players)
+    settle_picks()
+    for _ in range(MAX_TURNS):
+        if engine.is_over():
+            break
+        seat = engine.turn
+        while not engine.is_over():
+            options = engine.playable_indices(seat)
+            if not options or rng.random() < 0.2:
+                break
+            journal.record_events(engine.play(seat, options[int(rng.random() * len(options))]), players)
+            settle_picks()
+        if not engine.is_over():
+            journal.record_events(engine.end_turn(seat), players)
+            settle_picks()
+    return engine
+
+
+def state(engine: GameEngine) -> tuple:
+    return tuple((p.health, p.cost, p.hand.ordered()) for p in engine.players), engine.turn, engine.winner
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    journal = MatchJournal(str(tmp_path / "match.fcj"), commit_interval=0)
+    final = record_match(journal, seed=3)
+    journal.close()
+    return str(journal.path), final
+
+
+def test_replay_reaches_final_state(journal_path):
+    path, final = journal_path
+    replay = load_replay(path)
+    engine = replay.seek(len(replay.records))
+    assert state(engine)[0] == state(final)[0]
+    assert engine.winner == final.winner
+
+
+@pytest.mark.parametrize("every", [1, 7, 32])
+def test_seek_matches_sequential_replay(journal_path, every):
+    path, _ = journal_path
+    with JournalReader(path) as reader:
+        records = list(reader)
+    seeking = Replay(records, snapshot_every=every)
+    rng = random.Random(every)
+    for position in [rng.randrange(len(records) + 1) for _ in range(40)] + [0, len(records)]:
+        fresh = Replay(records[:position], verify=False)
+        assert state(seeking.seek(position))[0] == state(fresh.seek(position))[0]
+
+
+def test_seek_turn(journal_path):
+    path, _ = journal_path
+    replay = load_replay(path)
+    assert replay.turns > 0
+    for turn in (0, replay.turns // 2, replay.turns):
+        assert replay.seek_turn(turn) is replay.engine
+        assert replay.position == replay.turn_starts[turn]
+    with pytest.raises(IndexError):
+        replay.seek_turn(replay.turns + 1)
+
+
+def test_torn_last_record_is_ignored(journal_path):
+    path, _ = journal_path
+    with JournalReader(path) as reader:
+        count = len(reader)
+    with open(path, "ab") as f:
+        f.write(b"\x01\x02\x03")
+    with JournalReader(path) as reader:
+        assert len(reader) == count
+
+
+def test_verify_detects_tampered_journal(journal_path):
+    path, _ = journal_path
+    with JournalReader(path) as reader:
+        records = list(reader)
+    # 每组记录结束时（下一条动作记录之前）核对生命值
+    last = next(i for i in range(1, len(records)) if records[i].kind in ACTION_KINDS) - 1
+    records[last].hp = (records[last].hp[0] + 1, records[last].hp[1])
+    with pytest.raises(ReplayMismatch):
+        Replay(records)
+
+
+def test_snapshot_restore_roundtrip():
+    engine = GameEngine(rng=random.Random(5))
+    engine.start()
+    for seat in (0, 1):
+        while engine.pending[seat] > 0:
+            engine.give(seat, engine.candidates()[0])
+    snapshot = engine.snapshot()
+    before = state(engine), tuple(engine.pending)
+    engine.end_turn(engine.turn)
+    engine.players[0].hand.clear()
+    engine.restore(snapshot)
+    assert (state(engine), tuple(engine.pending)) == before
+    # 快照可重复使用，恢复后的手牌不与快照共享
+    engine.players[1].hand.clear()
+    engine.restore(snapshot)
+    assert (state(engine), tuple(engine.pending)) == before
+
+
+def test_reader_iterates_the_mapping(journal_path):
+    reader = JournalReader(journal_path[0])
+    assert len(reader) > 0
+    assert [repr(r) for r in reader] == [repr(reader[i]) for i in range(len(reader))]
+    # 迭代到一半就关闭：未读完的迭代器不能让 mmap 无法关闭
+    records = iter(reader)
+    next(records)
+    reader.close()
+    with pytest.raises(StopIteration):
+        next(records)
+
+
+def test_journals_created_in_the_same_second_get_their_own_files(tmp_path, monkeypatch):
+    monkeypatch.setattr("time.strftime", lambda fmt: "20260101-000000")
+    journals = [MatchJournal.create(str(tmp_path), commit_interval=0) for _ in range(3)]
+    for journal in journals:
+        journal.close()
+    assert len({j.path for j in journals}) == 3
+    for journal in journals:
+        with JournalReader(journal.path) as reader:
+            assert len(reader) == 0
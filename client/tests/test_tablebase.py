@@ -0,0 +1,114 @@
+"""Endgame tablebase: stored damage is a guarantee, never an overestimate."""
+
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import src.game.constants as gconstants
+from src.game.card import CARD_CATALOG, CARD_COUNT
+from src.game.engine import GameEngine
+from src.game.tablebase import Tablebase, build_table, get_tablebase
+
+HAND = 2
+POSITIONS = 3000
+SEAT = 0
+
+
+@pytest.fixture(scope="module")
+def table(tmp_path_factory):
+    path = tmp_path_factory.mktemp("tablebase") / "endgame.fctb"
+    build_table(str(path), HAND)
+    table = Tablebase(str(path))
+    yield table
+    table.close()
+
+
+def position(card_ids, hp, opp_hp, cost) -> GameEngine:
+    engine = GameEngine(first_seat=SEAT)
+    me, other = engine.players[SEAT], engine.players[1 - SEAT]
+    for card_id in card_ids:
+        me.hand.append(CARD_CATALOG[card_id])
+    me.health, me.cost, other.health = hp, cost, opp_hp
+    engine.turn = SEAT
+    return engine
+
+
+def best_damage(engine: GameEngine) -> int:
+    """Most damage SEAT can deal this turn under the real rules.
+
+    Cards the opponent would give for a card-draw card are never given,
+    as in the table.
+    """
+    other = engine.players[1 - SEAT]
+    start = other.health
+    best = 0
+
+    def search():
+        nonlocal best
+        best = max(best, start - max(other.health, 0))
+        if engine.winner is not None:
+            return
+        for index in engine.playable_indices(SEAT):
+            snapshot = engine.snapshot()
+            engine.play(SEAT, index)
+            search()
+            engine.restore(snapshot)
+            engine.winner = None
+
+    search()
+    return best
+
+
+def random_positions(table, seed):
+    rng = random.Random(seed)
+    for _ in range(POSITIONS):
+        yield ([rng.randrange(CARD_COUNT) for _ in range(rng.randint(1, table.hand))],
+               rng.randint(1, table.max_hp), rng.randint(1, table.max_opp_hp),
+               rng.randint(0, table.max_cost))
+
+
+def has_discard(card_ids) -> bool:
+    return any(CARD_CATALOG[i].ncarditem_type == gconstants.NCARDITEM_CARD_DISCARD
+               for i in card_ids)
+
+
+def test_damage_never_exceeds_a_real_line(table):
+    exact = 0
+    for card_ids, hp, opp_hp, cost in random_positions(table, 1):
+        result = table.lookup(card_ids, hp, opp_hp, cost)
+        brute = min(best_damage(position(card_ids, hp, opp_hp, cost)), opp_hp)
+        assert result.damage <= brute, (card_ids, hp, opp_hp, cost)
+        if not has_discard(card_ids):
+            # 无弃牌时表中的值是精确的
+            assert result.damage == brute, (card_ids, hp, opp_hp, cost)
+            exact += 1
+    assert exact > POSITIONS // 2
+
+
+def test_lethal_line_wins(table):
+    lethal = 0
+    for card_ids, hp, opp_hp, cost in random_positions(table, 2):
+        result = table.lookup(card_ids, hp, opp_hp, cost)
+        if not result.lethal:
+            continue
+        lethal += 1
+        engine = position(card_ids, hp, opp_hp, cost)
+        assert engine.can_play(SEAT, result.card)
+        engine.play(SEAT, engine.players[SEAT].hand.ordered().index(result.card))
+        # 先出推荐的牌，剩下的牌仍能斩杀
+        assert engine.winner == SEAT or best_damage(engine) >= engine.players[1 - SEAT].health
+    assert lethal > 0
+
+
+def test_lookup_engine_matches_lookup(table):
+    engine = position([3, 7], 5, 4, 2)
+    result = table.lookup_engine(engine, SEAT)
+    assert repr(result) == repr(table.lookup([7, 3], 5, 4, 2))
+    engine.players[SEAT].hand.append(CARD_CATALOG[0])
+    assert table.lookup_engine(engine, SEAT) is None
+
+
+def test_missing_table(tmp_path):
+    assert get_tablebase(str(tmp_path / "missing.fctb")) is None